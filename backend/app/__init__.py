@@ -1,15 +1,44 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime, timezone
+from typing import Any
 
-from flask import Flask, jsonify
+from flask import Flask, Response, g, jsonify, request
 from psycopg import OperationalError
 
-from .commitments import commitments_for_company, load_commitments
+from .backends import can_connect, check_backend_settings, list_companies_from_db
+from .batch import InvalidBatch, evaluate_batch, parse_batch
+from .cache import CheckinResultCache
+from .columnar import LazySpendEngine
+from .commitments import (
+    CommitmentCatalog,
+    DatabaseCommitmentCatalog,
+    commitment_catalog,
+)
 from .config import Settings
-from .db import can_connect
-from .evaluation import evaluate_commitment, summarize_evaluated_commitment
-from .repository import list_companies_from_db
+from .db import init_pool, pool_stats
+from .evaluation import evaluate_commitment, evaluate_commitments
+from .http_cache import (
+    billing_data_token,
+    checkin_phase,
+    install_compression,
+    not_modified,
+    strong_etag,
+)
+from .invalidation import BillingChangeListener, apply_billing_change
+from .listing import InvalidCursor, list_commitments_page, parse_listing_query
+from .metrics import (
+    MetricsRegistry,
+    current_timings,
+    end_request_timings,
+    start_request_timings,
+)
+from .optimizer import optimize_commitment, parse_optimizer_query
+from .portfolio import PORTFOLIO_LEVELS, iter_portfolio_ndjson
+from .profiling import install_profiling
+from .series import DEFAULT_SERIES_POINTS, MAX_SERIES_POINTS, commitment_series
+from .sqlite_repository import is_sqlite_url
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +46,102 @@ logger = logging.getLogger(__name__)
 def create_app() -> Flask:
     app = Flask(__name__)
     settings = Settings()
+    check_backend_settings(settings)
     app.config["SETTINGS"] = settings
+    app.extensions["db_pool"] = init_pool(settings)
+    spend_engine = (
+        LazySpendEngine(settings) if settings.spend_engine == "columnar" else None
+    )
+    app.extensions["spend_engine"] = spend_engine
+    result_cache = (
+        CheckinResultCache(
+            settings.result_cache_max_entries, settings.result_cache_ttl_seconds
+        )
+        if settings.result_cache_max_entries > 0
+        else None
+    )
+    app.extensions["result_cache"] = result_cache
+
+    # Besides invalidating caches, the listener's version names the billing
+    # data in ETags, so it runs even with no cache or engine to invalidate.
+    listener = None
+    if (
+        settings.billing_change_listener
+        and settings.database_url
+        and not is_sqlite_url(settings.database_url)
+    ):
+        listener = BillingChangeListener(
+            settings.database_url,
+            lambda change: apply_billing_change(change, result_cache, spend_engine),
+        )
+        listener.start()
+        app.extensions["billing_change_listener"] = listener
+
+    if settings.metrics_enabled:
+        install_metrics(app, result_cache)
+    if settings.compression_min_bytes > 0:
+        install_compression(app, settings.compression_min_bytes)
+    if settings.profiling_token:
+        install_profiling(app, settings.profiling_token)
+
+    stored = settings.commitments_source == "database"
+
+    def current_catalog() -> CommitmentCatalog | DatabaseCommitmentCatalog:
+        if not stored:
+            return commitment_catalog(settings.commitments_path)
+        # One per request, so its version and counts are queried at most once.
+        if "catalog" not in g:
+            g.catalog = DatabaseCommitmentCatalog(settings.database_url)
+        return g.catalog
+
+    def evaluation_options() -> dict[str, Any]:
+        return {
+            "use_rollups": settings.spend_rollups,
+            "engine": spend_engine.get() if spend_engine else None,
+            "cache": result_cache,
+            "cents": settings.money_storage == "cents",
+            "stored": stored,
+        }
+
+    def check_not_modified(
+        catalog: CommitmentCatalog | DatabaseCommitmentCatalog,
+        commitments: list[dict[str, Any]],
+    ) -> Response | None:
+        """Tag this response with an ETag; return a 304 if the client has it.
+
+        Runs before any evaluation. Without a known billing data version the
+        response goes out untagged.
+        """
+        data_version = billing_data_token(settings, spend_engine, listener)
+        if data_version is None:
+            return None
+        now = datetime.now(timezone.utc)
+        g.etag = strong_etag(
+            request.full_path,
+            catalog.version,
+            data_version,
+            checkin_phase(commitments, now, settings.etag_time_bucket_seconds),
+        )
+        return not_modified(g.etag)
+
+    @app.errorhandler(OperationalError)
+    def database_unavailable(_exc: OperationalError) -> tuple[object, int]:
+        # Routes handle evaluation failures themselves; this covers catalog
+        # lookups against the commitments tables.
+        logger.error(
+            "Database connection failed while serving %s", request.path, exc_info=_exc
+        )
+        return (
+            jsonify({"error": "Database unavailable. Verify DATABASE_URL and retry."}),
+            503,
+        )
+
+    @app.after_request
+    def add_etag(response: Response) -> Response:
+        etag = g.pop("etag", None)
+        if etag is not None and response.status_code == 200:
+            response.set_etag(etag)
+        return response
 
     @app.get("/api/health")
     def health() -> tuple[object, int]:
@@ -28,17 +152,20 @@ def create_app() -> Flask:
                     "service": "contract-commitment-analyzer-api",
                     "database_url_configured": bool(settings.database_url),
                     "database_reachable": can_connect(settings),
+                    "database_pool": pool_stats(),
+                    "result_cache": result_cache.stats() if result_cache else None,
                 }
             ),
             200,
         )
 
     @app.get("/api/companies")
-    def list_companies() -> tuple[object, int]:
-        commitments = load_commitments()
-        commitment_companies = {
-            item["company"] for item in commitments if item.get("company")
-        }
+    def list_companies() -> Response | tuple[object, int]:
+        catalog = current_catalog()
+        cached = check_not_modified(catalog, [])
+        if cached is not None:
+            return cached
+        commitment_companies = catalog.companies()
         try:
             db_companies = set(list_companies_from_db(settings.database_url))
         except Exception:
@@ -47,17 +174,30 @@ def create_app() -> Flask:
         return jsonify({"companies": companies}), 200
 
     @app.get("/api/companies/<company>/commitments")
-    def list_company_commitments(company: str) -> tuple[object, int]:
-        commitments = load_commitments()
-        matching_commitments = commitments_for_company(commitments, company)
+    def list_company_commitments(company: str) -> Response | tuple[object, int]:
+        catalog = current_catalog()
+        matching_commitments = catalog.for_company(company)
         if not matching_commitments:
             return jsonify({"error": f"Company '{company}' not found"}), 404
+        try:
+            query = parse_listing_query(request.args)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        cached = check_not_modified(catalog, matching_commitments)
+        if cached is not None:
+            return cached
+
+        def evaluate(commitments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            return evaluate_commitments(
+                commitments, settings.database_url, **evaluation_options()
+            )
 
         try:
-            evaluated = [
-                evaluate_commitment(item, settings.database_url)
-                for item in matching_commitments
-            ]
+            page, next_cursor = list_commitments_page(
+                matching_commitments, query, evaluate, datetime.now(timezone.utc)
+            )
+        except InvalidCursor as exc:
+            return jsonify({"error": str(exc)}), 400
         except OperationalError:
             logger.exception(
                 "Database connection failed while evaluating commitments for %s",
@@ -77,23 +217,74 @@ def create_app() -> Flask:
             jsonify(
                 {
                     "company": company,
-                    "commitments": [
-                        summarize_evaluated_commitment(item) for item in evaluated
-                    ],
+                    "commitments": page,
+                    "next_cursor": next_cursor,
                 }
             ),
             200,
         )
 
+    @app.get("/api/portfolio/commitments")
+    def portfolio_commitments() -> Response | tuple[object, int]:
+        level = request.args.get("level", "commitment")
+        if level not in PORTFOLIO_LEVELS:
+            return (
+                jsonify(
+                    {"error": f"level must be one of: {', '.join(PORTFOLIO_LEVELS)}"}
+                ),
+                400,
+            )
+
+        catalog = current_catalog()
+
+        def evaluate(commitments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            return evaluate_commitments(
+                commitments, settings.database_url, **evaluation_options()
+            )
+
+        return Response(
+            iter_portfolio_ndjson(
+                catalog, evaluate, level=level, batch_size=settings.portfolio_batch_size
+            ),
+            mimetype="application/x-ndjson",
+        )
+
+    @app.post("/api/evaluate")
+    def evaluate_items() -> tuple[object, int]:
+        try:
+            items = parse_batch(request.get_json(silent=True))
+        except InvalidBatch as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        def evaluate(commitments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            # Inline commitments are not in the catalog tables, so every item
+            # goes through the batched window query: one spend query in all.
+            options = {**evaluation_options(), "stored": False}
+            return evaluate_commitments(commitments, settings.database_url, **options)
+
+        try:
+            results = evaluate_batch(items, current_catalog().get_many, evaluate)
+        except OperationalError:
+            logger.exception("Database connection failed while evaluating a batch")
+            return (
+                jsonify(
+                    {"error": "Database unavailable. Verify DATABASE_URL and retry."}
+                ),
+                503,
+            )
+        except Exception as exc:
+            logger.exception("Unexpected batch evaluation failure")
+            return jsonify({"error": f"Failed to evaluate commitments: {exc}"}), 500
+
+        return jsonify({"results": results}), 200
+
     @app.get("/api/companies/<company>/commitments/<int:commitment_id>")
-    def get_commitment_detail(company: str, commitment_id: int) -> tuple[object, int]:
-        commitments = load_commitments()
-        matching = [
-            item
-            for item in commitments_for_company(commitments, company)
-            if item.get("id") == commitment_id
-        ]
-        if not matching:
+    def get_commitment_detail(
+        company: str, commitment_id: int
+    ) -> Response | tuple[object, int]:
+        catalog = current_catalog()
+        commitment = catalog.get(company, commitment_id)
+        if commitment is None:
             return (
                 jsonify(
                     {
@@ -105,9 +296,14 @@ def create_app() -> Flask:
                 ),
                 404,
             )
+        cached = check_not_modified(catalog, [commitment])
+        if cached is not None:
+            return cached
 
         try:
-            evaluated = evaluate_commitment(matching[0], settings.database_url)
+            evaluated = evaluate_commitment(
+                commitment, settings.database_url, **evaluation_options()
+            )
         except OperationalError:
             logger.exception(
                 "Database connection failed for commitment detail %s/%s",
@@ -130,5 +326,172 @@ def create_app() -> Flask:
 
         return jsonify({"company": company, "commitment": evaluated}), 200
 
+    @app.get("/api/companies/<company>/commitments/<int:commitment_id>/series")
+    def get_commitment_series(
+        company: str, commitment_id: int
+    ) -> Response | tuple[object, int]:
+        try:
+            points = int(request.args.get("points", DEFAULT_SERIES_POINTS))
+        except ValueError:
+            points = 0
+        if not 1 <= points <= MAX_SERIES_POINTS:
+            message = f"points must be an integer from 1 to {MAX_SERIES_POINTS}"
+            return jsonify({"error": message}), 400
+        raw_checkin = request.args.get("checkin")
+        if raw_checkin is not None and not raw_checkin.isdigit():
+            return jsonify({"error": "checkin must be a checkin index"}), 400
+        checkin_index = int(raw_checkin) if raw_checkin is not None else None
+
+        catalog = current_catalog()
+        commitment = catalog.get(company, commitment_id)
+        if commitment is None:
+            return (
+                jsonify(
+                    {
+                        "error": (
+                            f"Commitment '{commitment_id}' not found "
+                            f"for company '{company}'"
+                        )
+                    }
+                ),
+                404,
+            )
+        cached = check_not_modified(catalog, [commitment])
+        if cached is not None:
+            return cached
+
+        options = evaluation_options()
+        try:
+            series = commitment_series(
+                commitment,
+                settings.database_url,
+                points=points,
+                checkin_index=checkin_index,
+                engine=options["engine"],
+                cents=options["cents"],
+            )
+        except IndexError:
+            return (
+                jsonify(
+                    {
+                        "error": (
+                            f"Checkin '{checkin_index}' not found "
+                            f"for commitment '{commitment_id}'"
+                        )
+                    }
+                ),
+                404,
+            )
+        except OperationalError:
+            logger.exception(
+                "Database connection failed for commitment series %s/%s",
+                company,
+                commitment_id,
+            )
+            return (
+                jsonify(
+                    {"error": "Database unavailable. Verify DATABASE_URL and retry."}
+                ),
+                503,
+            )
+        except Exception as exc:
+            logger.exception(
+                "Unexpected commitment series failure for %s/%s",
+                company,
+                commitment_id,
+            )
+            return jsonify({"error": f"Failed to build spend series: {exc}"}), 500
+
+        return jsonify({"company": company, "series": series}), 200
+
+    @app.get("/api/companies/<company>/services/<service>/optimize")
+    def optimize_service_commitment(
+        company: str, service: str
+    ) -> tuple[object, int]:
+        try:
+            query = parse_optimizer_query(request.args, datetime.now(timezone.utc))
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        options = evaluation_options()
+        try:
+            result = optimize_commitment(
+                company,
+                service,
+                query,
+                settings.database_url,
+                engine=options["engine"],
+                use_rollups=options["use_rollups"],
+                cents=options["cents"],
+            )
+        except OperationalError:
+            logger.exception(
+                "Database connection failed while optimizing %s/%s", company, service
+            )
+            return (
+                jsonify(
+                    {"error": "Database unavailable. Verify DATABASE_URL and retry."}
+                ),
+                503,
+            )
+        except Exception as exc:
+            logger.exception("Unexpected optimizer failure for %s/%s", company, service)
+            return jsonify({"error": f"Failed to optimize commitment: {exc}"}), 500
+
+        if result is None:
+            return (
+                jsonify(
+                    {
+                        "error": (
+                            f"No billing data for service '{service}' "
+                            f"of company '{company}'"
+                        )
+                    }
+                ),
+                404,
+            )
+        return jsonify(result), 200
+
     return app
 
+
+def install_metrics(app: Flask, result_cache: CheckinResultCache | None) -> None:
+    """Time every request, add ``Server-Timing`` and serve ``/api/metrics``.
+
+    Only installed when ``METRICS_ENABLED`` is set; otherwise requests and
+    database connections run without any instrumentation hooks.
+    """
+    registry = MetricsRegistry()
+    app.extensions["metrics"] = registry
+
+    @app.before_request
+    def start_timing() -> None:
+        g.metrics_token = start_request_timings()
+
+    @app.after_request
+    def record_timing(response: Response) -> Response:
+        token = g.pop("metrics_token", None)
+        timings = current_timings()
+        if token is None or timings is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        registry.observe(request.method, route, response.status_code, timings)
+        response.headers["Server-Timing"] = timings.server_timing()
+        end_request_timings(token)
+        return response
+
+    @app.teardown_request
+    def reset_timing(_exc: BaseException | None) -> None:
+        token = g.pop("metrics_token", None)
+        if token is not None:
+            end_request_timings(token)
+
+    @app.get("/api/metrics")
+    def metrics() -> Response:
+        body = registry.render(
+            {
+                "db_pool": pool_stats(),
+                "result_cache": result_cache.stats() if result_cache else None,
+            }
+        )
+        return Response(body, content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+from typing import Any, Awaitable, Callable
+
+from psycopg import OperationalError
+from psycopg_pool import AsyncConnectionPool
+
+from .async_evaluation import create_async_pool, evaluate_commitments_async
+from .backends import check_backend_settings
+from .cache import CheckinResultCache
+from .columnar import LazySpendEngine
+from .commitments import (
+    CommitmentCatalog,
+    DatabaseCommitmentCatalog,
+    commitment_catalog,
+)
+from .config import Settings
+from .evaluation import evaluate_commitments, summarize_evaluated_commitment
+from .sqlite_repository import is_sqlite_url
+
+logger = logging.getLogger(__name__)
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+COMMITMENTS_ROUTE = re.compile(
+    r"^/api/companies/(?P<company>[^/]+)/commitments(?:/(?P<commitment_id>\d+))?/?$"
+)
+DATABASE_UNAVAILABLE = {"error": "Database unavailable. Verify DATABASE_URL and retry."}
+
+
+class AsyncCommitmentsApp:
+    """Minimal ASGI app serving the commitment routes with async evaluation.
+
+    A company's commitments are evaluated concurrently on an
+    ``AsyncConnectionPool``; responses and error mapping match the Flask
+    routes, and commitments come from the same ``COMMITMENTS_SOURCE``. Other
+    paths return 404 and stay on the Flask app. With ``SPEND_ENGINE=columnar``
+    the in-memory engine answers instead, and a ``sqlite:///`` database is read
+    through the synchronous repository; both run in a worker thread so they do
+    not block the event loop.
+    """
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self.settings = settings or Settings()
+        check_backend_settings(self.settings)
+        self.pool: AsyncConnectionPool | None = create_async_pool(self.settings)
+        self.cache = (
+            CheckinResultCache(
+                self.settings.result_cache_max_entries,
+                self.settings.result_cache_ttl_seconds,
+            )
+            if self.settings.result_cache_max_entries > 0
+            else None
+        )
+        self.spend_engine = (
+            LazySpendEngine(self.settings)
+            if self.settings.spend_engine == "columnar"
+            else None
+        )
+        self.stored = self.settings.commitments_source == "database"
+        self._pool_lock = asyncio.Lock()
+        self._pool_opened = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        if scope["method"] != "GET":
+            status, payload = 405, {"error": "Method not allowed"}
+        else:
+            status, payload = await self.dispatch(scope["path"])
+        body = json.dumps(payload).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self._open_pool()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.pool is not None and self._pool_opened:
+                    await self.pool.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _open_pool(self) -> None:
+        if self.pool is None or self._pool_opened:
+            return
+        async with self._pool_lock:
+            if not self._pool_opened:
+                await self.pool.open(wait=False)
+                self._pool_opened = True
+
+    async def dispatch(self, path: str) -> tuple[int, dict[str, Any]]:
+        match = COMMITMENTS_ROUTE.match(path)
+        if match is None:
+            return 404, {"error": "Not found"}
+
+        company = match["company"]
+        commitment_id = match["commitment_id"]
+        try:
+            key = None if commitment_id is None else int(commitment_id)
+            if self.stored:
+                # The database catalog blocks on psycopg; keep it off the loop.
+                commitments = await asyncio.to_thread(self.lookup, company, key)
+            else:
+                commitments = self.lookup(company, key)
+            if not commitments:
+                if commitment_id is None:
+                    return 404, {"error": f"Company '{company}' not found"}
+                return 404, {
+                    "error": (
+                        f"Commitment '{commitment_id}' not found "
+                        f"for company '{company}'"
+                    )
+                }
+            evaluated = await self.evaluate(commitments)
+        except OperationalError:
+            logger.exception(
+                "Database connection failed while evaluating commitments for %s",
+                company,
+            )
+            return 503, DATABASE_UNAVAILABLE
+        except Exception as exc:
+            logger.exception("Unexpected commitment evaluation failure for %s", company)
+            return 500, {"error": f"Failed to evaluate commitments: {exc}"}
+
+        if commitment_id is not None:
+            return 200, {"company": company, "commitment": evaluated[0]}
+        return 200, {
+            "company": company,
+            "commitments": [summarize_evaluated_commitment(item) for item in evaluated],
+        }
+
+    def current_catalog(self) -> CommitmentCatalog | DatabaseCommitmentCatalog:
+        if self.stored:
+            return DatabaseCommitmentCatalog(self.settings.database_url)
+        return commitment_catalog(self.settings.commitments_path)
+
+    def lookup(self, company: str, commitment_id: int | None) -> list[dict[str, Any]]:
+        """The company's commitments, or just ``commitment_id`` when given."""
+        catalog = self.current_catalog()
+        if commitment_id is None:
+            return catalog.for_company(company)
+        commitment = catalog.get(company, commitment_id)
+        return [] if commitment is None else [commitment]
+
+    async def evaluate(self, commitments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if self.spend_engine is not None or is_sqlite_url(self.settings.database_url):
+            return await asyncio.to_thread(self._evaluate_in_thread, commitments)
+        if self.pool is None:
+            raise RuntimeError("DATABASE_URL is not set.")
+        await self._open_pool()
+        return await evaluate_commitments_async(
+            commitments,
+            self.pool,
+            concurrency=self.settings.async_evaluation_concurrency,
+            use_rollups=self.settings.spend_rollups,
+            cache=self.cache,
+            cents=self.settings.money_storage == "cents",
+        )
+
+    def _evaluate_in_thread(
+        self, commitments: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        return evaluate_commitments(
+            commitments,
+            self.settings.database_url,
+            engine=self.spend_engine.get() if self.spend_engine else None,
+            use_rollups=self.settings.spend_rollups,
+            cache=self.cache,
+            cents=self.settings.money_storage == "cents",
+        )
+
+
+def create_asgi_app(settings: Settings | None = None) -> AsyncCommitmentsApp:
+    return AsyncCommitmentsApp(settings)
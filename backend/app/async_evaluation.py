@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+from psycopg import AsyncConnection
+from psycopg.errors import UndefinedTable
+from psycopg_pool import AsyncConnectionPool
+
+from .cache import CheckinKey, CheckinResultCache, cached_window_sums_async
+from .config import Settings
+from .evaluation import build_evaluated_commitment, commitment_windows
+from .repository import (
+    BILLING_DATA_VERSION_SQL,
+    COMPANY_WINDOWS_CENTS_SQL,
+    COMPANY_WINDOWS_SPEND_SQL,
+    ROLLUP_WINDOWS_CENTS_SQL,
+    ROLLUP_WINDOWS_SPEND_SQL,
+    company_windows_cents,
+    company_windows_params,
+    company_windows_totals,
+    rollup_windows_cents,
+    rollup_windows_params,
+    rollup_windows_totals,
+)
+from .sqlite_repository import is_sqlite_url
+
+
+def create_async_pool(settings: Settings) -> AsyncConnectionPool | None:
+    """Build an unopened async pool sized like the synchronous one.
+
+    There is no pool without a database URL or for the SQLite backend.
+    """
+    if not settings.database_url or is_sqlite_url(settings.database_url):
+        return None
+    return AsyncConnectionPool(
+        settings.database_url,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        timeout=settings.db_pool_timeout,
+        max_lifetime=settings.db_pool_max_lifetime,
+        name="contract-commitment-analyzer-async",
+        open=False,
+    )
+
+
+async def fetch_billing_data_version_async(conn: AsyncConnection) -> int | None:
+    """Async ``fetch_optional_billing_data_version``: ``None`` without the table."""
+    try:
+        async with conn.transaction():
+            async with conn.cursor() as cur:
+                await cur.execute(BILLING_DATA_VERSION_SQL)
+                row = await cur.fetchone()
+    except UndefinedTable:
+        return None
+    return int(row[0]) if row else 0
+
+
+async def sum_spend_for_company_windows_async(
+    conn: AsyncConnection,
+    windows: list[CheckinKey],
+    use_rollups: bool = False,
+    cents: bool = False,
+) -> list[Decimal] | list[int]:
+    """Async twin of the repository's batched window sums.
+
+    ``cents`` reads integer-cent storage and returns ``int`` cents.
+    """
+    if not windows:
+        return []
+
+    if use_rollups:
+        rollup_totals = rollup_windows_cents if cents else rollup_windows_totals
+        params = rollup_windows_params(windows)
+        if params is None:
+            return rollup_totals(len(windows), [])
+        async with conn.cursor() as cur:
+            await cur.execute(
+                ROLLUP_WINDOWS_CENTS_SQL if cents else ROLLUP_WINDOWS_SPEND_SQL,
+                params,
+            )
+            rows = await cur.fetchall()
+        return rollup_totals(len(windows), rows)
+
+    async with conn.cursor() as cur:
+        await cur.execute(
+            COMPANY_WINDOWS_CENTS_SQL if cents else COMPANY_WINDOWS_SPEND_SQL,
+            company_windows_params(windows),
+        )
+        rows = await cur.fetchall()
+    return company_windows_cents(rows) if cents else company_windows_totals(rows)
+
+
+async def evaluate_commitments_async(
+    commitments: list[dict[str, Any]],
+    pool: AsyncConnectionPool,
+    now: datetime | None = None,
+    *,
+    concurrency: int = 8,
+    use_rollups: bool = False,
+    cache: CheckinResultCache | None = None,
+    cents: bool = False,
+) -> list[dict[str, Any]]:
+    """Evaluate commitments concurrently, at most ``concurrency`` at a time.
+
+    Each commitment borrows its own pooled connection and sums all of its
+    checkins in one query, so latency tracks the slowest commitment rather
+    than the sum of all of them. Results keep the order of ``commitments``.
+    """
+    now = now or datetime.now(timezone.utc)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    version = None
+    if cache is not None:
+        async with pool.connection() as conn:
+            version = await fetch_billing_data_version_async(conn)
+
+    async def sum_windows(windows: list[CheckinKey]) -> list[Decimal] | list[int]:
+        async with semaphore:
+            async with pool.connection() as conn:
+                return await sum_spend_for_company_windows_async(
+                    conn, windows, use_rollups, cents
+                )
+
+    if cache is not None and version is not None:
+        sum_windows = cached_window_sums_async(sum_windows, cache, version, now)
+
+    async def evaluate_one(commitment: dict[str, Any]) -> dict[str, Any]:
+        windows = [
+            (commitment["company"], *window)
+            for window in commitment_windows(commitment)
+        ]
+        totals = await sum_windows(windows) if windows else []
+        return build_evaluated_commitment(commitment, totals, now, cents=cents)
+
+    return list(await asyncio.gather(*(evaluate_one(item) for item in commitments)))
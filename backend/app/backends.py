@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Iterator, Protocol, Sequence
+
+import psycopg
+from psycopg.errors import Error as PsycopgError
+
+from .config import Settings
+from .db import connection
+from .repository import (
+    fetch_optional_billing_data_version,
+    has_spend_series,
+    iter_spend_event_cents,
+    list_companies,
+    spend_series,
+    sum_spend_cents_for_company_windows,
+    sum_spend_cents_for_company_windows_from_rollups,
+    sum_spend_for_company_windows,
+    sum_spend_for_company_windows_from_rollups,
+    sum_spend_for_period,
+    sum_spend_for_stored_checkins,
+)
+from .sqlite_repository import SqliteSpendRepository, is_sqlite_url, sqlite_connection
+
+
+class SpendRepository(Protocol):
+    """Billing queries every storage backend answers.
+
+    Evaluation, the series builder and the columnar engine's loader reach the
+    database only through this interface, via ``open_repository``.
+    ``ColumnarSpendEngine`` implements the two batched sums too, so evaluation
+    treats engines and repositories alike.
+    """
+
+    def list_companies(self) -> list[str]: ...
+
+    def has_series(self, company: str, service: str) -> bool:
+        """Whether any billing event exists for ``company``/``service``."""
+        ...
+
+    def billing_data_version(self) -> int | None:
+        """The loader's data version, or ``None`` if the schema has none."""
+        ...
+
+    def sum_spend_for_period(
+        self, company: str, service: str, period_start: datetime, period_end: datetime
+    ) -> Decimal: ...
+
+    def sum_spend_for_company_windows(
+        self, windows: Sequence[tuple[str, str, datetime, datetime]]
+    ) -> list[Decimal]: ...
+
+    def sum_cents_for_company_windows(
+        self, windows: Sequence[tuple[str, str, datetime, datetime]]
+    ) -> list[int]: ...
+
+    def spend_series(
+        self,
+        company: str,
+        service: str,
+        period_start: datetime,
+        period_end: datetime,
+        step: timedelta,
+        cents: bool = False,
+    ) -> list[tuple[datetime, Decimal | int, Decimal | int]]:
+        """Per-bucket and cumulative spend in ``step``-wide buckets."""
+        ...
+
+    def sum_spend_for_stored_checkins(
+        self, commitments: Sequence[tuple[str, int]], cents: bool = False
+    ) -> dict[tuple[str, int, int], Decimal | int]:
+        """Spend per checkin of catalog-table commitments, keyed by checkin."""
+        ...
+
+    def iter_spend_event_cents(
+        self, cents: bool = False
+    ) -> Iterator[tuple[str, str, int, int]]:
+        """Every event as ``(company, service, epoch_seconds, cents)``."""
+        ...
+
+
+class PostgresSpendRepository:
+    """``SpendRepository`` over a psycopg connection, optionally using rollups."""
+
+    def __init__(self, conn: psycopg.Connection, use_rollups: bool = False) -> None:
+        self.conn = conn
+        self.use_rollups = use_rollups
+
+    def list_companies(self) -> list[str]:
+        return list_companies(self.conn)
+
+    def has_series(self, company: str, service: str) -> bool:
+        return has_spend_series(self.conn, company, service)
+
+    def billing_data_version(self) -> int | None:
+        return fetch_optional_billing_data_version(self.conn)
+
+    def sum_spend_for_period(
+        self, company: str, service: str, period_start: datetime, period_end: datetime
+    ) -> Decimal:
+        return sum_spend_for_period(
+            self.conn, company, service, period_start, period_end
+        )
+
+    def sum_spend_for_company_windows(
+        self, windows: Sequence[tuple[str, str, datetime, datetime]]
+    ) -> list[Decimal]:
+        if self.use_rollups:
+            return sum_spend_for_company_windows_from_rollups(self.conn, windows)
+        return sum_spend_for_company_windows(self.conn, windows)
+
+    def sum_cents_for_company_windows(
+        self, windows: Sequence[tuple[str, str, datetime, datetime]]
+    ) -> list[int]:
+        if self.use_rollups:
+            return sum_spend_cents_for_company_windows_from_rollups(self.conn, windows)
+        return sum_spend_cents_for_company_windows(self.conn, windows)
+
+    def spend_series(
+        self,
+        company: str,
+        service: str,
+        period_start: datetime,
+        period_end: datetime,
+        step: timedelta,
+        cents: bool = False,
+    ) -> list[tuple[datetime, Decimal | int, Decimal | int]]:
+        return spend_series(
+            self.conn, company, service, period_start, period_end, step, cents=cents
+        )
+
+    def sum_spend_for_stored_checkins(
+        self, commitments: Sequence[tuple[str, int]], cents: bool = False
+    ) -> dict[tuple[str, int, int], Decimal | int]:
+        return sum_spend_for_stored_checkins(self.conn, commitments, cents=cents)
+
+    def iter_spend_event_cents(
+        self, cents: bool = False
+    ) -> Iterator[tuple[str, str, int, int]]:
+        return iter_spend_event_cents(self.conn, cents=cents)
+
+
+@contextmanager
+def open_repository(
+    db_url: str, use_rollups: bool = False
+) -> Iterator[SpendRepository]:
+    """Open the backend ``db_url`` names: ``sqlite:///<path>`` or PostgreSQL.
+
+    SQLite has no rollup table; its primary-key range scans already serve
+    the batched sums, so ``use_rollups`` only applies to PostgreSQL.
+    """
+    if not db_url:
+        raise RuntimeError("DATABASE_URL is not set.")
+    if is_sqlite_url(db_url):
+        with sqlite_connection(db_url) as sqlite_conn:
+            yield SqliteSpendRepository(sqlite_conn)
+        return
+    with connection(db_url) as conn:
+        yield PostgresSpendRepository(conn, use_rollups=use_rollups)
+
+
+def list_companies_from_db(db_url: str) -> list[str]:
+    if not db_url:
+        return []
+
+    with open_repository(db_url) as repository:
+        return repository.list_companies()
+
+
+def check_backend_settings(settings: Settings) -> None:
+    """Reject settings the configured backend cannot serve, at startup."""
+    sqlite = is_sqlite_url(settings.database_url)
+    if sqlite and settings.commitments_source == "database":
+        raise RuntimeError(
+            "COMMITMENTS_SOURCE=database needs a PostgreSQL DATABASE_URL; "
+            "the SQLite backend has no commitments tables."
+        )
+
+
+def can_connect(settings: Settings) -> bool:
+    """Return whether a database connection can be established."""
+    if not settings.database_url:
+        return False
+
+    try:
+        with open_repository(settings.database_url):
+            return True
+    except (PsycopgError, sqlite3.Error):
+        return False
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable
+
+from .commitments import (
+    DATE_FMT,
+    MAX_COMMITTED_AMOUNT,
+    parse_checkin_datetime,
+    prepare_commitment,
+)
+
+
+MAX_BATCH_ITEMS = 500
+MAX_BATCH_CHECKINS = 20_000
+
+
+class InvalidBatch(ValueError):
+    """The request body is not a valid batch of evaluation items."""
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    """One item of a batch: a stored ``(company, id)`` or an inline commitment."""
+
+    company: str
+    commitment_id: Any = None
+    commitment: dict[str, Any] | None = None
+
+    @property
+    def source(self) -> str:
+        return "inline" if self.commitment is not None else "stored"
+
+
+def required_text(value: Any, label: str) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise InvalidBatch(f"{label} must be a non-empty string")
+    return value.strip()
+
+
+def parse_inline_checkin(checkin: Any, label: str) -> dict[str, Any]:
+    if not isinstance(checkin, dict):
+        raise InvalidBatch(f"{label} must be an object")
+    bounds = []
+    for field in ("start", "end"):
+        value = checkin.get(field)
+        try:
+            bounds.append(parse_checkin_datetime(value))
+        except (TypeError, ValueError):
+            raise InvalidBatch(
+                f"{label}.{field} must be a UTC datetime in {DATE_FMT!r} format"
+            ) from None
+    if bounds[0] >= bounds[1]:
+        raise InvalidBatch(f"{label} must end after it starts")
+
+    amount = checkin.get("amount")
+    try:
+        committed = Decimal(str(amount))
+    except InvalidOperation:
+        committed = None
+    if isinstance(amount, bool) or committed is None or not committed.is_finite():
+        raise InvalidBatch(f"{label}.amount must be a number")
+    if committed < 0:
+        raise InvalidBatch(f"{label}.amount must not be negative")
+    if committed > MAX_COMMITTED_AMOUNT:
+        raise InvalidBatch(f"{label}.amount must be at most {MAX_COMMITTED_AMOUNT}")
+    return {"start": checkin["start"], "end": checkin["end"], "amount": amount}
+
+
+def parse_inline_commitment(item: dict[str, Any], label: str) -> dict[str, Any]:
+    """Validate a what-if commitment and prepare it like a catalog entry."""
+    checkins = item.get("checkins")
+    if not isinstance(checkins, list):
+        raise InvalidBatch(f"{label}.checkins must be a list")
+    name = item.get("name", "What-if commitment")
+    return prepare_commitment(
+        {
+            "id": item.get("id"),
+            "name": required_text(name, f"{label}.name"),
+            "company": required_text(item.get("company"), f"{label}.company"),
+            "service": required_text(item.get("service"), f"{label}.service"),
+            "checkins": [
+                parse_inline_checkin(checkin, f"{label}.checkins[{index}]")
+                for index, checkin in enumerate(checkins)
+            ],
+        }
+    )
+
+
+def parse_batch(payload: Any) -> list[BatchItem]:
+    """Parse ``{"items": [...]}`` into batch items, raising ``InvalidBatch``.
+
+    An item with ``checkins`` is an inline commitment; any other item names a
+    stored commitment by ``company`` and integer ``id``.
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get("items"), list):
+        raise InvalidBatch('Request body must be a JSON object with an "items" list')
+    raw_items = payload["items"]
+    if not 1 <= len(raw_items) <= MAX_BATCH_ITEMS:
+        raise InvalidBatch(f"items must hold from 1 to {MAX_BATCH_ITEMS} entries")
+
+    items: list[BatchItem] = []
+    checkin_count = 0
+    for position, raw in enumerate(raw_items):
+        label = f"items[{position}]"
+        if not isinstance(raw, dict):
+            raise InvalidBatch(f"{label} must be an object")
+        if "checkins" in raw:
+            commitment = parse_inline_commitment(raw, label)
+            checkin_count += len(commitment["checkins"])
+            items.append(BatchItem(commitment["company"], commitment=commitment))
+            continue
+        commitment_id = raw.get("id")
+        if isinstance(commitment_id, bool) or not isinstance(commitment_id, int):
+            raise InvalidBatch(f"{label}.id must be an integer commitment id")
+        company = required_text(raw.get("company"), f"{label}.company")
+        items.append(BatchItem(company, commitment_id))
+
+    if checkin_count > MAX_BATCH_CHECKINS:
+        raise InvalidBatch(
+            f"Inline commitments may define at most {MAX_BATCH_CHECKINS} checkins"
+        )
+    return items
+
+
+def evaluate_batch(
+    items: list[BatchItem],
+    lookup: Callable[[list[tuple[str, Any]]], dict[tuple[str, Any], dict[str, Any]]],
+    evaluate: Callable[[list[dict[str, Any]]], list[dict[str, Any]]],
+) -> list[dict[str, Any]]:
+    """Evaluate every item with one ``lookup`` and one ``evaluate`` call.
+
+    Results follow the order of ``items``. A stored commitment that does not
+    exist gets an error result instead of failing the whole batch.
+    """
+    stored_keys = [
+        (item.company, item.commitment_id) for item in items if item.commitment is None
+    ]
+    found = lookup(stored_keys) if stored_keys else {}
+    commitments: list[dict[str, Any]] = []
+    positions: list[int] = []
+    results: list[dict[str, Any]] = []
+    for position, item in enumerate(items):
+        commitment = item.commitment or found.get((item.company, item.commitment_id))
+        result: dict[str, Any] = {"index": position, "source": item.source}
+        if commitment is None:
+            result["error"] = (
+                f"Commitment '{item.commitment_id}' not found "
+                f"for company '{item.company}'"
+            )
+        else:
+            commitments.append(commitment)
+            positions.append(position)
+        results.append(result)
+
+    evaluated = evaluate(commitments) if commitments else []
+    for position, commitment in zip(positions, evaluated):
+        results[position]["commitment"] = commitment
+    return results
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Hashable
+
+
+CheckinKey = tuple[str, str, datetime, datetime]
+
+
+class CheckinResultCache:
+    """Bounded LRU cache of per-checkin spend totals with a TTL.
+
+    Entries are tagged with the billing data version they were computed
+    against; a lookup with any other version is a miss, so a loader run
+    invalidates everything without the cache having to be told. When it is
+    told what a load changed, ``advance`` carries the untouched entries over
+    to the new version instead.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[int, float, Decimal]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CheckinKey, version: int) -> Decimal | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version or entry[1] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: CheckinKey, version: int, value: Decimal) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate: Callable[[CheckinKey], bool]) -> int:
+        """Drop entries whose key matches ``predicate``; return how many."""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def advance(
+        self, version: int, changed: Callable[[CheckinKey], bool] | None
+    ) -> int:
+        """Carry entries from ``version - 1`` to ``version`` unless ``changed``.
+
+        Called when a load that bumped the data version to ``version`` reports
+        which windows it touched; ``changed=None`` means it touched everything.
+        Entries from any older version are dropped, since a load in between
+        went unreported. Returns how many entries were dropped.
+        """
+        with self._lock:
+            dropped = 0
+            for key, entry in list(self._entries.items()):
+                if entry[0] == version:
+                    continue
+                if entry[0] == version - 1 and changed is not None and not changed(key):
+                    self._entries[key] = (version, *entry[1:])
+                    continue
+                del self._entries[key]
+                dropped += 1
+            return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def cached_totals(
+    cache: CheckinResultCache, version: int, now: datetime, windows: list[CheckinKey]
+) -> tuple[list[Decimal | None], list[int]]:
+    """Look ``windows`` up in ``cache``; return the totals and the missing indexes.
+
+    Only windows that ended at or before ``now`` are looked up; current and
+    future windows are always missing.
+    """
+    totals: list[Decimal | None] = [None] * len(windows)
+    missing: list[int] = []
+    for idx, window in enumerate(windows):
+        if window[3] <= now:
+            totals[idx] = cache.get(window, version)
+        if totals[idx] is None:
+            missing.append(idx)
+    return totals, missing
+
+
+def store_totals(
+    cache: CheckinResultCache,
+    version: int,
+    now: datetime,
+    windows: list[CheckinKey],
+    totals: list[Decimal | None],
+    missing: list[int],
+    fresh: list[Decimal],
+) -> list[Decimal]:
+    """Fill the ``missing`` totals with ``fresh`` sums and cache the past ones."""
+    for idx, value in zip(missing, fresh):
+        totals[idx] = value
+        if windows[idx][3] <= now:
+            cache.put(windows[idx], version, value)
+    return totals  # type: ignore[return-value]
+
+
+def cached_window_sums(
+    sum_windows: Callable[[list[CheckinKey]], list[Decimal]],
+    cache: CheckinResultCache,
+    version: int,
+    now: datetime,
+) -> Callable[[list[CheckinKey]], list[Decimal]]:
+    """Wrap a batched window summer so past checkins are served from ``cache``.
+
+    Only windows that ended at or before ``now`` are cached; current and
+    future windows are always recomputed.
+    """
+
+    def sum_with_cache(windows: list[CheckinKey]) -> list[Decimal]:
+        totals, missing = cached_totals(cache, version, now, windows)
+        fresh = sum_windows([windows[idx] for idx in missing]) if missing else []
+        return store_totals(cache, version, now, windows, totals, missing, fresh)
+
+    return sum_with_cache
+
+
+def cached_window_sums_async(
+    sum_windows: Callable[[list[CheckinKey]], Awaitable[list[Decimal]]],
+    cache: CheckinResultCache,
+    version: int,
+    now: datetime,
+) -> Callable[[list[CheckinKey]], Awaitable[list[Decimal]]]:
+    """``cached_window_sums`` for a coroutine summer, as used by the ASGI app."""
+
+    async def sum_with_cache(windows: list[CheckinKey]) -> list[Decimal]:
+        totals, missing = cached_totals(cache, version, now, windows)
+        fresh = await sum_windows([windows[idx] for idx in missing]) if missing else []
+        return store_totals(cache, version, now, windows, totals, missing, fresh)
+
+    return sum_with_cache
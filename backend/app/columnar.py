@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import csv
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy installed
+    np = None
+
+from .backends import open_repository
+from .config import Settings
+from .snapshot import Snapshot, open_snapshot
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError(
+            "The columnar spend engine requires numpy. Install it with "
+            "`pip install numpy` or set SPEND_ENGINE=sql."
+        )
+
+
+def to_epoch_seconds(value: datetime) -> int:
+    """Round up so ``ts >= to_epoch_seconds(start)`` matches ``event_time >= start``."""
+    return math.ceil(value.timestamp())
+
+
+def parse_cents(value: str) -> int:
+    return int(Decimal(value).quantize(Decimal("0.01")).scaleb(2))
+
+
+@dataclass(frozen=True)
+class SpendSeries:
+    """Sorted event timestamps and costs for one (company, aws_service)."""
+
+    timestamps: Any
+    cents: Any
+    cumulative: Any
+
+    @classmethod
+    def build(cls, timestamps: Any, cents: Any) -> SpendSeries:
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = np.ascontiguousarray(timestamps[order], dtype=np.int64)
+        cents = np.ascontiguousarray(cents[order], dtype=np.int64)
+        cumulative = np.zeros(len(cents) + 1, dtype=np.int64)
+        np.cumsum(cents, out=cumulative[1:])
+        return cls(timestamps=timestamps, cents=cents, cumulative=cumulative)
+
+    def sum_cents(self, starts: Any, ends: Any) -> Any:
+        """Vectorised ``[start, end)`` sums for arrays of epoch-second bounds."""
+        left = np.searchsorted(self.timestamps, starts, side="left")
+        right = np.searchsorted(self.timestamps, ends, side="left")
+        return self.cumulative[right] - self.cumulative[left]
+
+
+class ColumnarSpendEngine:
+    """In-memory spend index answering checkin windows with prefix sums.
+
+    Each (company, aws_service) series holds sorted int64 epoch seconds and
+    integer cents with a cumulative sum, so a window costs two binary
+    searches and a subtraction.
+    """
+
+    def __init__(self, series: dict[tuple[str, str], SpendSeries]) -> None:
+        require_numpy()
+        self.series = series
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[tuple[str, str, int, int]]
+    ) -> ColumnarSpendEngine:
+        """Build from ``(company, aws_service, epoch_seconds, cents)`` rows."""
+        require_numpy()
+        columns: dict[tuple[str, str], tuple[list[int], list[int]]] = {}
+        for company, aws_service, timestamp, cents in rows:
+            timestamps, costs = columns.setdefault((company, aws_service), ([], []))
+            timestamps.append(timestamp)
+            costs.append(cents)
+        return cls(
+            {
+                key: SpendSeries.build(
+                    np.array(timestamps, dtype=np.int64),
+                    np.array(costs, dtype=np.int64),
+                )
+                for key, (timestamps, costs) in columns.items()
+            }
+        )
+
+    @classmethod
+    def from_csv(cls, csv_path: Path) -> ColumnarSpendEngine:
+        """Build directly from a billing CSV in the loader's format."""
+
+        def rows() -> Iterable[tuple[str, str, int, int]]:
+            with csv_path.open(newline="", encoding="utf-8") as handle:
+                for row in csv.DictReader(handle):
+                    event_time = datetime.strptime(
+                        row["datetime"], "%Y-%m-%d %H:%M:%S"
+                    ).replace(tzinfo=timezone.utc)
+                    yield (
+                        row["company"].strip(),
+                        row["aws_service"].strip(),
+                        to_epoch_seconds(event_time),
+                        parse_cents(row["gross_cost"]),
+                    )
+
+        return cls.from_rows(rows())
+
+    @classmethod
+    def from_database(cls, db_url: str, cents: bool = False) -> ColumnarSpendEngine:
+        """Build from ``billing_events`` of whichever backend ``db_url`` names.
+
+        ``cents`` reads ``gross_cost_cents`` from PostgreSQL integer-cent
+        storage; PostgreSQL rows stream through a server-side cursor.
+        """
+        with open_repository(db_url) as repository:
+            return cls.from_rows(repository.iter_spend_event_cents(cents=cents))
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> ColumnarSpendEngine:
+        """Serve a mapped snapshot in place; nothing is copied or re-sorted."""
+        return cls(
+            {
+                key: SpendSeries(timestamps, cents, cumulative)
+                for key, (timestamps, cents, cumulative) in snapshot.series.items()
+            }
+        )
+
+    def has_series(self, company: str, service: str) -> bool:
+        return (company, service) in self.series
+
+    def sum_cents_for_company_windows(
+        self, windows: Sequence[tuple[str, str, datetime, datetime]]
+    ) -> list[int]:
+        """Sum ``(company, service, start, end)`` windows, vectorised per series."""
+        totals = [0] * len(windows)
+        positions_by_series: dict[tuple[str, str], list[int]] = {}
+        for position, window in enumerate(windows):
+            positions_by_series.setdefault((window[0], window[1]), []).append(position)
+
+        for key, positions in positions_by_series.items():
+            series = self.series.get(key)
+            if series is None:
+                continue
+            starts = np.array(
+                [to_epoch_seconds(windows[idx][2]) for idx in positions], dtype=np.int64
+            )
+            ends = np.array(
+                [to_epoch_seconds(windows[idx][3]) for idx in positions], dtype=np.int64
+            )
+            for idx, cents in zip(positions, series.sum_cents(starts, ends).tolist()):
+                totals[idx] = cents
+        return totals
+
+    def sum_cents_for_windows(
+        self, company: str, windows: Sequence[tuple[str, datetime, datetime]]
+    ) -> list[int]:
+        return self.sum_cents_for_company_windows(
+            [(company, *window) for window in windows]
+        )
+
+    def sum_spend_for_company_windows(
+        self, windows: Sequence[tuple[str, str, datetime, datetime]]
+    ) -> list[Decimal]:
+        """Drop-in for ``repository.sum_spend_for_company_windows``."""
+        return [
+            Decimal(cents).scaleb(-2)
+            for cents in self.sum_cents_for_company_windows(windows)
+        ]
+
+    def sum_spend_for_windows(
+        self, company: str, windows: Sequence[tuple[str, datetime, datetime]]
+    ) -> list[Decimal]:
+        return self.sum_spend_for_company_windows(
+            [(company, *window) for window in windows]
+        )
+
+
+class LazySpendEngine:
+    """Build the columnar engine on first use and share it across requests.
+
+    The engine is a snapshot: restart the process (or call ``reset``) after
+    reloading billing data. ``SPEND_ENGINE_SNAPSHOT`` takes precedence over
+    ``SPEND_ENGINE_CSV``, which takes precedence over the database.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self._settings = settings
+        self._engine: ColumnarSpendEngine | None = None
+        self._version: str | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ColumnarSpendEngine:
+        engine = self._engine
+        if engine is not None:
+            return engine
+        with self._lock:
+            if self._engine is None:
+                if self._settings.spend_engine_snapshot:
+                    snapshot = open_snapshot(Path(self._settings.spend_engine_snapshot))
+                    self._version = f"snapshot:{snapshot.signature}"
+                    self._engine = ColumnarSpendEngine.from_snapshot(snapshot)
+                elif self._settings.spend_engine_csv:
+                    csv_path = Path(self._settings.spend_engine_csv)
+                    stat = csv_path.stat()
+                    self._version = f"csv:{stat.st_mtime_ns}-{stat.st_size}"
+                    self._engine = ColumnarSpendEngine.from_csv(csv_path)
+                else:
+                    if not self._settings.database_url:
+                        raise RuntimeError("DATABASE_URL is not set.")
+                    with open_repository(self._settings.database_url) as repository:
+                        version = repository.billing_data_version()
+                    self._version = None if version is None else f"db:{version}"
+                    self._engine = ColumnarSpendEngine.from_database(
+                        self._settings.database_url,
+                        cents=self._settings.money_storage == "cents",
+                    )
+            return self._engine
+
+    @property
+    def reads_database(self) -> bool:
+        return not (
+            self._settings.spend_engine_snapshot or self._settings.spend_engine_csv
+        )
+
+    def version(self) -> str | None:
+        """Name the billing data the snapshot was built from, building it if needed.
+
+        The version is read before the snapshot, so a concurrent load can only
+        make it older than the data, never newer. It is ``None`` for a database
+        without a ``billing_data_version`` table.
+        """
+        self.get()
+        return self._version
+
+    def reset(self) -> None:
+        with self._lock:
+            self._engine = None
@@ -1,12 +1,29 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import threading
+from datetime import datetime, timezone
+from decimal import Decimal
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
+from .db import connection
+from .repository import (
+    count_commitments,
+    fetch_commitment_rows,
+    fetch_commitment_rows_for_companies,
+    fetch_commitment_rows_for_keys,
+    fetch_commitments_version,
+    list_commitment_companies,
+)
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 COMMITMENTS_PATH = PROJECT_ROOT / "data" / "spend_commitments.json"
+DATE_FMT = "%Y-%m-%d %H:%M:%S"
+# The largest amount whose cents still fit the int64 cents columns.
+MAX_COMMITTED_AMOUNT = Decimal(2**63 - 1).scaleb(-2)
 
 
 def load_commitments() -> list[dict[str, Any]]:
@@ -20,3 +37,238 @@ def commitments_for_company(
 ) -> list[dict[str, Any]]:
     return [item for item in commitments if item.get("company") == company]
 
+
+def parse_checkin_datetime(value: str) -> datetime:
+    return datetime.strptime(value, DATE_FMT).replace(tzinfo=timezone.utc)
+
+
+def checkin_bounds(checkin: dict[str, Any]) -> tuple[datetime, datetime]:
+    """Return a checkin's ``[start, end)`` datetimes, parsing only if needed."""
+    if "start_at" in checkin:
+        return checkin["start_at"], checkin["end_at"]
+    return parse_checkin_datetime(checkin["start"]), parse_checkin_datetime(
+        checkin["end"]
+    )
+
+
+def checkin_committed_amount(checkin: dict[str, Any]) -> Decimal:
+    parsed = checkin.get("committed_amount")
+    if parsed is not None:
+        return parsed
+    return Decimal(str(checkin["amount"])).quantize(Decimal("0.01"))
+
+
+def checkin_committed_cents(checkin: dict[str, Any]) -> int:
+    parsed = checkin.get("committed_cents")
+    if parsed is not None:
+        return parsed
+    return int(checkin_committed_amount(checkin).scaleb(2))
+
+
+def prepare_commitment(commitment: dict[str, Any]) -> dict[str, Any]:
+    """Copy a raw commitment with checkin datetimes and amounts parsed."""
+    checkins = []
+    for checkin in commitment.get("checkins", []):
+        start_at, end_at = checkin_bounds(checkin)
+        committed_amount = checkin_committed_amount(checkin)
+        checkins.append(
+            {
+                **checkin,
+                "start_at": start_at,
+                "end_at": end_at,
+                "committed_amount": committed_amount,
+                "committed_cents": int(committed_amount.scaleb(2)),
+            }
+        )
+    return {**commitment, "checkins": checkins}
+
+
+def content_version(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+class CommitmentCatalog:
+    """Commitments indexed by company and by ``(company, id)``.
+
+    ``version`` is a content hash of the source, so it only changes when the
+    commitments do and agrees across processes serving the same file.
+    """
+
+    def __init__(
+        self, commitments: list[dict[str, Any]], version: str | None = None
+    ) -> None:
+        if version is None:
+            canonical = json.dumps(commitments, sort_keys=True, default=str)
+            version = content_version(canonical.encode("utf-8"))
+        self.version = version
+        self.commitments = [prepare_commitment(item) for item in commitments]
+        self._by_company: dict[str, list[dict[str, Any]]] = {}
+        self._by_id: dict[tuple[str, Any], dict[str, Any]] = {}
+        for item in self.commitments:
+            company = item.get("company")
+            if not company:
+                continue
+            self._by_company.setdefault(company, []).append(item)
+            self._by_id.setdefault((company, item.get("id")), item)
+
+    def __len__(self) -> int:
+        return len(self.commitments)
+
+    def companies(self) -> set[str]:
+        return set(self._by_company)
+
+    def for_company(self, company: str) -> list[dict[str, Any]]:
+        return self._by_company.get(company, [])
+
+    def for_companies(self, companies: list[str]) -> dict[str, list[dict[str, Any]]]:
+        return {company: self.for_company(company) for company in companies}
+
+    def get(self, company: str, commitment_id: Any) -> dict[str, Any] | None:
+        return self._by_id.get((company, commitment_id))
+
+    def get_many(
+        self, keys: list[tuple[str, Any]]
+    ) -> dict[tuple[str, Any], dict[str, Any]]:
+        """The commitments found among ``(company, id)`` keys, keyed the same way."""
+        return {key: self._by_id[key] for key in keys if key in self._by_id}
+
+
+def commitments_from_rows(company: str, rows: list[tuple]) -> list[dict[str, Any]]:
+    """Group ``fetch_commitment_rows`` output into prepared commitments."""
+    commitments: list[dict[str, Any]] = []
+    for commitment_id, name, service, start_at, end_at, amount in rows:
+        if not commitments or commitments[-1]["id"] != commitment_id:
+            commitments.append(
+                {
+                    "id": commitment_id,
+                    "name": name,
+                    "company": company,
+                    "service": service,
+                    "checkins": [],
+                }
+            )
+        if start_at is None:
+            continue
+        start_at = start_at.astimezone(timezone.utc)
+        end_at = end_at.astimezone(timezone.utc)
+        commitments[-1]["checkins"].append(
+            {
+                "start": start_at.strftime(DATE_FMT),
+                "end": end_at.strftime(DATE_FMT),
+                "amount": amount,
+                "start_at": start_at,
+                "end_at": end_at,
+                "committed_amount": amount,
+            }
+        )
+    return [prepare_commitment(item) for item in commitments]
+
+
+def commitments_by_company(rows: list[tuple]) -> dict[str, list[dict[str, Any]]]:
+    """Group company-first commitment rows into each company's commitments."""
+    rows_by_company: dict[str, list[tuple]] = {}
+    for company, *row in rows:
+        rows_by_company.setdefault(company, []).append(tuple(row))
+    return {
+        company: commitments_from_rows(company, company_rows)
+        for company, company_rows in rows_by_company.items()
+    }
+
+
+class DatabaseCommitmentCatalog:
+    """``CommitmentCatalog`` interface over the ``commitments`` tables.
+
+    Nothing is loaded up front: each lookup is a primary-key range query, so
+    memory and per-request cost do not grow with the size of the catalog.
+    Create one per request: ``version``, the commitment count and the company
+    list are each queried on first use and then kept for the instance.
+    """
+
+    def __init__(self, db_url: str) -> None:
+        self.db_url = db_url
+        self._count: int | None = None
+        self._companies: set[str] | None = None
+
+    @cached_property
+    def version(self) -> str:
+        with connection(self.db_url) as conn:
+            return f"db:{fetch_commitments_version(conn)}"
+
+    def __len__(self) -> int:
+        if self._count is None:
+            with connection(self.db_url) as conn:
+                self._count = count_commitments(conn)
+        return self._count
+
+    def companies(self) -> set[str]:
+        if self._companies is None:
+            with connection(self.db_url) as conn:
+                self._companies = set(list_commitment_companies(conn))
+        return set(self._companies)
+
+    def for_company(self, company: str) -> list[dict[str, Any]]:
+        with connection(self.db_url) as conn:
+            rows = fetch_commitment_rows(conn, company)
+        return commitments_from_rows(company, rows)
+
+    def for_companies(self, companies: list[str]) -> dict[str, list[dict[str, Any]]]:
+        """``for_company`` for many companies with one query."""
+        if not companies:
+            return {}
+        with connection(self.db_url) as conn:
+            rows = fetch_commitment_rows_for_companies(conn, companies)
+        found = commitments_by_company(rows)
+        return {company: found.get(company, []) for company in companies}
+
+    def get(self, company: str, commitment_id: Any) -> dict[str, Any] | None:
+        if not isinstance(commitment_id, int):
+            return None
+        with connection(self.db_url) as conn:
+            rows = fetch_commitment_rows(conn, company, commitment_id)
+        commitments = commitments_from_rows(company, rows)
+        return commitments[0] if commitments else None
+
+    def get_many(
+        self, keys: list[tuple[str, Any]]
+    ) -> dict[tuple[str, Any], dict[str, Any]]:
+        """Look up many ``(company, id)`` keys with one query."""
+        wanted = [key for key in keys if isinstance(key[1], int)]
+        if not wanted:
+            return {}
+        with connection(self.db_url) as conn:
+            rows = fetch_commitment_rows_for_keys(conn, wanted)
+        return {
+            (company, item["id"]): item
+            for company, items in commitments_by_company(rows).items()
+            for item in items
+        }
+
+
+_catalog_lock = threading.Lock()
+_catalog_cache: dict[Path, tuple[tuple[int, int], CommitmentCatalog]] = {}
+
+
+def commitment_catalog(path: Path | str | None = None) -> CommitmentCatalog:
+    """Return the catalog for ``path``, re-reading it only when it changes.
+
+    The file is reloaded when its mtime or size differs from the cached copy,
+    so steady-state requests cost one ``stat`` call.
+    """
+    path = Path(path) if path else COMMITMENTS_PATH
+    stat = path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _catalog_cache.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with _catalog_lock:
+        cached = _catalog_cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        raw = path.read_bytes()
+        payload = json.loads(raw)
+        catalog = CommitmentCatalog(
+            payload.get("commitments", []), version=content_version(raw)
+        )
+        _catalog_cache[path] = (signature, catalog)
+        return catalog
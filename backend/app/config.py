@@ -11,11 +11,40 @@ BACKEND_ROOT = Path(__file__).resolve().parents[1]
 load_dotenv(BACKEND_ROOT / ".env")
 
 
+def env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
 @dataclass(frozen=True)
 class Settings:
     """Environment-driven application settings."""
 
     database_url: str = os.getenv("DATABASE_URL", "")
+    commitments_path: str = os.getenv("COMMITMENTS_PATH", "")
+    commitments_source: str = os.getenv("COMMITMENTS_SOURCE", "file")
     flask_env: str = os.getenv("FLASK_ENV", "development")
     flask_run_port: int = int(os.getenv("FLASK_RUN_PORT", "8000"))
-
+    db_pool_min_size: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    db_pool_max_size: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+    db_pool_max_lifetime: float = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+    spend_rollups: bool = env_flag("SPEND_ROLLUPS")
+    spend_engine: str = os.getenv("SPEND_ENGINE", "sql")
+    spend_engine_csv: str = os.getenv("SPEND_ENGINE_CSV", "")
+    spend_engine_snapshot: str = os.getenv("SPEND_ENGINE_SNAPSHOT", "")
+    money_storage: str = os.getenv("MONEY_STORAGE", "numeric")
+    result_cache_max_entries: int = int(
+        os.getenv("RESULT_CACHE_MAX_ENTRIES", "100000")
+    )
+    result_cache_ttl_seconds: float = float(
+        os.getenv("RESULT_CACHE_TTL_SECONDS", "86400")
+    )
+    portfolio_batch_size: int = int(os.getenv("PORTFOLIO_BATCH_SIZE", "500"))
+    async_evaluation_concurrency: int = int(
+        os.getenv("ASYNC_EVALUATION_CONCURRENCY", "8")
+    )
+    metrics_enabled: bool = env_flag("METRICS_ENABLED")
+    billing_change_listener: bool = env_flag("BILLING_CHANGE_LISTENER")
+    profiling_token: str = os.getenv("PROFILING_TOKEN", "")
+    etag_time_bucket_seconds: int = int(os.getenv("ETAG_TIME_BUCKET_SECONDS", "60"))
+    compression_min_bytes: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
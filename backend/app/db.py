@@ -1,19 +1,98 @@
 from __future__ import annotations
 
+import atexit
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
 import psycopg
-from psycopg.errors import Error as PsycopgError
+from psycopg_pool import ConnectionPool
 
 from .config import Settings
+from .metrics import instrumented, record_pool_wait
+from .sqlite_repository import is_sqlite_url
+
+
+_pool: ConnectionPool | None = None
+
+
+def init_pool(settings: Settings) -> ConnectionPool | None:
+    """Create the process-wide connection pool, replacing any existing one.
+
+    The pool opens in the background so the app can start while the database
+    is still unreachable; borrowers wait up to ``db_pool_timeout`` seconds.
+    """
+    global _pool
+    close_pool()
+    if not settings.database_url or is_sqlite_url(settings.database_url):
+        return None
+
+    _pool = ConnectionPool(
+        settings.database_url,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        timeout=settings.db_pool_timeout,
+        max_lifetime=settings.db_pool_max_lifetime,
+        name="contract-commitment-analyzer",
+        open=False,
+    )
+    _pool.open(wait=False)
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+atexit.register(close_pool)
+
+
+@contextmanager
+def connection(db_url: str) -> Iterator[psycopg.Connection]:
+    """Borrow a pooled connection for ``db_url``, or open a dedicated one.
+
+    Scripts and tests that never call ``init_pool`` keep the old
+    connect-per-call behaviour. Statements are timed for the request being
+    served when metrics are enabled.
+    """
+    if _pool is not None and _pool.conninfo == db_url:
+        started = time.perf_counter()
+        with _pool.connection() as conn:
+            record_pool_wait(time.perf_counter() - started)
+            with instrumented(conn):
+                yield conn
+        return
+
+    with psycopg.connect(db_url) as conn:
+        with instrumented(conn):
+            yield conn
 
 
-def can_connect(settings: Settings) -> bool:
-    """Return whether a database connection can be established."""
-    if not settings.database_url:
-        return False
+def pool_stats() -> dict[str, Any] | None:
+    """Return wait-time and utilisation counters for the shared pool."""
+    if _pool is None:
+        return None
 
-    try:
-        with psycopg.connect(settings.database_url):
-            return True
-    except PsycopgError:
-        return False
+    stats = _pool.get_stats()
+    size = stats.get("pool_size", 0)
+    available = stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+    return {
+        "min_size": stats.get("pool_min", 0),
+        "max_size": stats.get("pool_max", 0),
+        "size": size,
+        "available": available,
+        "in_use": size - available,
+        "requests_waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_errors": stats.get("requests_errors", 0),
+        "wait_ms_total": wait_ms,
+        "wait_ms_avg": round(wait_ms / requests, 3) if requests else 0.0,
+        "connections_errors": stats.get("connections_errors", 0),
+    }
 
@@ -2,24 +2,29 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable
 
-import psycopg
+from .backends import SpendRepository, open_repository
+from .cache import CheckinResultCache, cached_window_sums
+from .commitments import (
+    checkin_bounds,
+    checkin_committed_amount,
+    checkin_committed_cents,
+)
 
-from .repository import sum_spend_for_period
-
-
-DATE_FMT = "%Y-%m-%d %H:%M:%S"
-
-
-def parse_checkin_datetime(value: str) -> datetime:
-    return datetime.strptime(value, DATE_FMT).replace(tzinfo=timezone.utc)
+if TYPE_CHECKING:
+    from .columnar import ColumnarSpendEngine
 
 
 def decimal_to_float(value: Decimal) -> float:
     return float(value.quantize(Decimal("0.01")))
 
 
+def cents_to_float(value: int) -> float:
+    # Correctly rounded, so identical to decimal_to_float of the same amount.
+    return value / 100
+
+
 def checkin_status(start: datetime, end: datetime, now: datetime) -> str:
     if end <= now:
         return "past"
@@ -28,51 +33,66 @@ def checkin_status(start: datetime, end: datetime, now: datetime) -> str:
     return "current"
 
 
-def evaluate_commitment(
-    commitment: dict[str, Any], db_url: str, now: datetime | None = None
+def commitment_windows(
+    commitment: dict[str, Any],
+) -> list[tuple[str, datetime, datetime]]:
+    service = commitment["service"]
+    return [
+        (service, *checkin_bounds(checkin))
+        for checkin in commitment.get("checkins", [])
+    ]
+
+
+def build_evaluated_commitment(
+    commitment: dict[str, Any],
+    actual_amounts: list[Decimal] | list[int],
+    now: datetime,
+    *,
+    cents: bool = False,
 ) -> dict[str, Any]:
-    if not db_url:
-        raise RuntimeError("DATABASE_URL is not set.")
+    """Combine a commitment with the actual spend of each of its checkins.
 
+    With ``cents`` the actual amounts are integer cents and all arithmetic
+    stays integral; the output is identical to the ``Decimal`` path.
+    """
     company = commitment["company"]
     service = commitment["service"]
     checkins = commitment.get("checkins", [])
-    now = now or datetime.now(timezone.utc)
+    zero: Any = 0 if cents else Decimal("0.00")
+    committed_of = checkin_committed_cents if cents else checkin_committed_amount
+    to_float = cents_to_float if cents else decimal_to_float
 
-    total_committed = Decimal("0")
-    total_actual = Decimal("0")
-    total_shortfall = Decimal("0")
+    total_committed = zero
+    total_actual = zero
+    total_shortfall = zero
     all_met = True
     evaluated_checkins: list[dict[str, Any]] = []
 
-    with psycopg.connect(db_url) as conn:
-        for checkin in checkins:
-            start = parse_checkin_datetime(checkin["start"])
-            end = parse_checkin_datetime(checkin["end"])
-            committed_amount = Decimal(str(checkin["amount"])).quantize(Decimal("0.01"))
-            actual_amount = sum_spend_for_period(conn, company, service, start, end)
-
-            shortfall = max(committed_amount - actual_amount, Decimal("0.00"))
-            surplus = max(actual_amount - committed_amount, Decimal("0.00"))
-            met = shortfall == Decimal("0.00")
-
-            total_committed += committed_amount
-            total_actual += actual_amount
-            total_shortfall += shortfall
-            all_met = all_met and met
-
-            evaluated_checkins.append(
-                {
-                    "start": checkin["start"],
-                    "end": checkin["end"],
-                    "status": checkin_status(start, end, now),
-                    "committed_amount": decimal_to_float(committed_amount),
-                    "actual_amount": decimal_to_float(actual_amount),
-                    "shortfall": decimal_to_float(shortfall),
-                    "surplus": decimal_to_float(surplus),
-                    "met": met,
-                }
-            )
+    for checkin, actual_amount in zip(checkins, actual_amounts):
+        start, end = checkin_bounds(checkin)
+        committed_amount = committed_of(checkin)
+
+        shortfall = max(committed_amount - actual_amount, zero)
+        surplus = max(actual_amount - committed_amount, zero)
+        met = shortfall == zero
+
+        total_committed += committed_amount
+        total_actual += actual_amount
+        total_shortfall += shortfall
+        all_met = all_met and met
+
+        evaluated_checkins.append(
+            {
+                "start": checkin["start"],
+                "end": checkin["end"],
+                "status": checkin_status(start, end, now),
+                "committed_amount": to_float(committed_amount),
+                "actual_amount": to_float(actual_amount),
+                "shortfall": to_float(shortfall),
+                "surplus": to_float(surplus),
+                "met": met,
+            }
+        )
 
     return {
         "id": commitment["id"],
@@ -80,13 +100,142 @@ def evaluate_commitment(
         "company": company,
         "service": service,
         "met": all_met,
-        "total_committed": decimal_to_float(total_committed),
-        "total_actual": decimal_to_float(total_actual),
-        "total_shortfall": decimal_to_float(total_shortfall),
+        "total_committed": to_float(total_committed),
+        "total_actual": to_float(total_actual),
+        "total_shortfall": to_float(total_shortfall),
         "checkins": evaluated_checkins,
     }
 
 
+def spend_by_commitment(
+    commitments: list[dict[str, Any]],
+    windows_by_commitment: list[list[tuple[str, datetime, datetime]]],
+    sum_windows: Callable[[list[tuple[str, str, datetime, datetime]]], list[Any]],
+) -> list[list[Any]]:
+    """Sum every checkin window of every commitment with one ``sum_windows`` call."""
+    windows = [
+        (item["company"], *window)
+        for item, item_windows in zip(commitments, windows_by_commitment)
+        for window in item_windows
+    ]
+    totals = iter(sum_windows(windows) if windows else [])
+    return [
+        [next(totals) for _ in item_windows] for item_windows in windows_by_commitment
+    ]
+
+
+def stored_checkin_spend(
+    repository: SpendRepository, commitments: list[dict[str, Any]], cents: bool
+) -> list[list[Any]]:
+    """Per-checkin spend for catalog-table commitments from one SQL join."""
+    totals = repository.sum_spend_for_stored_checkins(
+        [(item["company"], item["id"]) for item in commitments], cents=cents
+    )
+    zero: Any = 0 if cents else Decimal("0.00")
+    return [
+        [
+            totals.get((item["company"], item["id"], index), zero)
+            for index in range(len(item.get("checkins", [])))
+        ]
+        for item in commitments
+    ]
+
+
+def evaluate_commitments(
+    commitments: list[dict[str, Any]],
+    db_url: str,
+    now: datetime | None = None,
+    *,
+    use_rollups: bool = False,
+    engine: ColumnarSpendEngine | None = None,
+    cache: CheckinResultCache | None = None,
+    cents: bool = False,
+    stored: bool = False,
+) -> list[dict[str, Any]]:
+    """Evaluate commitments, possibly for several companies, with one spend query.
+
+    Every checkin window of every commitment is summed by a single batched
+    repository call, so round trips do not grow with the number of checkins
+    or companies.
+    With ``use_rollups`` the sums are read from ``billing_rollups``; with an
+    ``engine`` they come from its in-memory prefix sums and no database
+    connection is opened. With a ``cache``, past checkins computed against the
+    current billing data version are not queried again. ``cents`` selects
+    integer-cent storage (``gross_cost_cents``) and integer arithmetic.
+    ``stored`` commitments come from the ``commitments`` tables; without an
+    engine or rollups their checkins are joined to billing events in SQL,
+    which bypasses the result cache. Spend is read through
+    ``open_repository``, so a ``sqlite:///`` ``db_url`` reads the embedded
+    SQLite backend instead of PostgreSQL.
+    """
+    if engine is None and not db_url:
+        raise RuntimeError("DATABASE_URL is not set.")
+
+    now = now or datetime.now(timezone.utc)
+    windows_by_commitment = [commitment_windows(item) for item in commitments]
+
+    if engine is not None:
+        actuals_by_commitment = spend_by_commitment(
+            commitments,
+            windows_by_commitment,
+            engine.sum_cents_for_company_windows
+            if cents
+            else engine.sum_spend_for_company_windows,
+        )
+    elif any(windows_by_commitment):
+        with open_repository(db_url, use_rollups=use_rollups) as repository:
+            if stored and not use_rollups:
+                actuals_by_commitment = stored_checkin_spend(
+                    repository, commitments, cents
+                )
+            else:
+                sum_windows = (
+                    repository.sum_cents_for_company_windows
+                    if cents
+                    else repository.sum_spend_for_company_windows
+                )
+                # Without a billing_data_version table there is nothing to key
+                # cached results on, so they are not cached.
+                version = (
+                    repository.billing_data_version() if cache is not None else None
+                )
+                if cache is not None and version is not None:
+                    sum_windows = cached_window_sums(sum_windows, cache, version, now)
+                actuals_by_commitment = spend_by_commitment(
+                    commitments, windows_by_commitment, sum_windows
+                )
+    else:
+        actuals_by_commitment = [[] for _ in commitments]
+
+    return [
+        build_evaluated_commitment(item, actuals, now, cents=cents)
+        for item, actuals in zip(commitments, actuals_by_commitment)
+    ]
+
+
+def evaluate_commitment(
+    commitment: dict[str, Any],
+    db_url: str,
+    now: datetime | None = None,
+    *,
+    use_rollups: bool = False,
+    engine: ColumnarSpendEngine | None = None,
+    cache: CheckinResultCache | None = None,
+    cents: bool = False,
+    stored: bool = False,
+) -> dict[str, Any]:
+    return evaluate_commitments(
+        [commitment],
+        db_url,
+        now,
+        use_rollups=use_rollups,
+        engine=engine,
+        cache=cache,
+        cents=cents,
+        stored=stored,
+    )[0]
+
+
 def summarize_evaluated_commitment(evaluated: dict[str, Any]) -> dict[str, Any]:
     return {
         "id": evaluated["id"],
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli installed
+    brotli = None
+
+from .backends import open_repository
+from .commitments import checkin_bounds
+from .config import Settings
+
+if TYPE_CHECKING:
+    from .columnar import LazySpendEngine
+    from .invalidation import BillingChangeListener
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain"}
+
+
+def gzip_compress(data: bytes) -> bytes:
+    # mtime=0 keeps the output, and so the tagged representation, deterministic.
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def available_encodings() -> dict[str, Callable[[bytes], bytes]]:
+    """Supported content codings, most preferred first."""
+    encodings: dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        encodings["br"] = lambda data: brotli.compress(data, quality=5)
+    encodings["gzip"] = gzip_compress
+    return encodings
+
+
+def strong_etag(*parts: Any) -> str:
+    """Opaque strong validator for a representation identified by ``parts``."""
+    joined = "\x1f".join(str(part) for part in parts)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()[:32]
+
+
+def billing_data_token(
+    settings: Settings,
+    spend_engine: LazySpendEngine | None,
+    listener: BillingChangeListener | None = None,
+) -> str | None:
+    """Name the billing data responses are computed from, or ``None`` if unknown.
+
+    With the columnar engine that is the snapshot it serves, not the live table.
+    A connected ``listener`` already tracks the database version, so only
+    without one does this cost a query. Any failure returns ``None`` so the
+    request falls through to evaluation and reports the error there.
+    """
+    try:
+        if spend_engine is not None:
+            return spend_engine.version()
+        if listener is not None and listener.version is not None:
+            return f"db:{listener.version}"
+        if not settings.database_url:
+            return None
+        with open_repository(settings.database_url) as repository:
+            version = repository.billing_data_version()
+        return None if version is None else f"db:{version}"
+    except Exception:
+        logger.debug("Billing data version unavailable; skipping ETag", exc_info=True)
+        return None
+
+
+def checkin_phase(
+    commitments: list[dict[str, Any]], now: datetime, bucket_seconds: int
+) -> str:
+    """The part of an evaluation that depends on the clock.
+
+    Checkin statuses change only when a boundary passes, so the count of
+    passed boundaries covers them. Spend for a current checkin can grow
+    without a loader run, so while any checkin is current the phase also
+    includes the ``bucket_seconds`` time bucket.
+    """
+    passed = 0
+    current = False
+    for commitment in commitments:
+        for checkin in commitment.get("checkins", []):
+            start, end = checkin_bounds(checkin)
+            passed += (start <= now) + (end <= now)
+            current = current or start <= now < end
+    if current and bucket_seconds > 0:
+        return f"{passed}:{int(now.timestamp()) // bucket_seconds}"
+    return str(passed)
+
+
+def not_modified(etag: str) -> Response | None:
+    """A 304 if ``If-None-Match`` names ``etag`` or one of its encoded variants."""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    variants = [etag] + [f"{etag}-{name}" for name in ("br", "gzip")]
+    for variant in variants:
+        if if_none_match.star_tag or if_none_match.contains_weak(variant):
+            response = Response(status=304)
+            response.set_etag(variant)
+            response.vary.add("Accept-Encoding")
+            return response
+    return None
+
+
+def negotiate_encoding() -> str | None:
+    best, best_quality = None, 0.0
+    for name in available_encodings():
+        quality = request.accept_encodings[name]
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def install_compression(app: Flask, min_bytes: int) -> None:
+    """Compress JSON and text responses of at least ``min_bytes`` when negotiated.
+
+    Streamed responses (the NDJSON portfolio) are left alone. A compressed
+    response's ETag gets a ``-<coding>`` suffix, since it is a different
+    representation of the same resource.
+    """
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+        data = response.get_data()
+        if len(data) < min_bytes:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+        response.set_data(available_encodings()[encoding](data))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak=weak)
+        return response
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import cached_property
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable
+
+import psycopg
+
+from .cache import CheckinKey, CheckinResultCache
+from .repository import fetch_optional_billing_data_version
+
+if TYPE_CHECKING:
+    from .columnar import LazySpendEngine
+
+logger = logging.getLogger(__name__)
+
+# Must match load_billing_data.py, which sends the notifications.
+BILLING_CHANGES_CHANNEL = "billing_data_changed"
+
+# (company, aws_service, start, end); ``None`` company or service matches any.
+ChangeScope = tuple[str | None, str | None, datetime, datetime]
+ScopeSeries = tuple[str | None, str | None]
+
+
+@dataclass(frozen=True)
+class BillingChange:
+    """One committed load: the version it produced and the windows it touched.
+
+    ``scopes`` of ``None`` means the load may have changed anything.
+    """
+
+    version: int
+    scopes: tuple[ChangeScope, ...] | None
+
+    @cached_property
+    def _spans(self) -> dict[ScopeSeries, tuple[list[datetime], list[datetime]]]:
+        """Scopes merged into sorted, disjoint (starts, ends) per (company, service).
+
+        ``touches`` runs once per cached entry under the cache lock, so it
+        looks up at most four series and bisects instead of scanning scopes.
+        """
+        grouped: dict[ScopeSeries, list[tuple[datetime, datetime]]] = {}
+        for company, service, start, end in self.scopes or ():
+            grouped.setdefault((company, service), []).append((start, end))
+        spans = {}
+        for series, intervals in grouped.items():
+            starts: list[datetime] = []
+            ends: list[datetime] = []
+            for start, end in sorted(intervals):
+                if ends and start <= ends[-1]:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            spans[series] = (starts, ends)
+        return spans
+
+    def touches(self, key: CheckinKey) -> bool:
+        if self.scopes is None:
+            return True
+        company, service, start, end = key
+        for series in (
+            (company, service),
+            (company, None),
+            (None, service),
+            (None, None),
+        ):
+            span = self._spans.get(series)
+            if span is None:
+                continue
+            starts, ends = span
+            # The first merged interval ending after ``start`` is the only
+            # one that can overlap [start, end).
+            index = bisect_right(ends, start)
+            if index < len(starts) and starts[index] < end:
+                return True
+        return False
+
+
+def parse_billing_change(payload: str) -> BillingChange:
+    """Decode a notification payload; raises ``ValueError`` if it is malformed."""
+    try:
+        message = json.loads(payload)
+        version = int(message["version"])
+        raw_scopes = message.get("scopes")
+        scopes = (
+            None
+            if raw_scopes is None
+            else tuple(
+                (
+                    company,
+                    service,
+                    datetime.fromisoformat(start),
+                    datetime.fromisoformat(end),
+                )
+                for company, service, start, end in raw_scopes
+            )
+        )
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid billing change notification: {payload!r}") from exc
+    return BillingChange(version=version, scopes=scopes)
+
+
+def apply_billing_change(
+    change: BillingChange,
+    result_cache: CheckinResultCache | None,
+    spend_engine: LazySpendEngine | None,
+) -> None:
+    """Drop only what ``change`` touched from this process's caches.
+
+    The columnar engine is rebuilt on next use if it reads the database;
+    engines built from a CSV or snapshot file do not follow the database.
+    """
+    if result_cache is not None:
+        dropped = result_cache.advance(
+            change.version, None if change.scopes is None else change.touches
+        )
+        logger.info(
+            "Billing data version %s: dropped %s cached checkin result(s)",
+            change.version,
+            dropped,
+        )
+    if spend_engine is not None and spend_engine.reads_database:
+        spend_engine.reset()
+
+
+class BillingChangeListener:
+    """Background thread that ``LISTEN``s for loader notifications.
+
+    It holds one dedicated autocommit connection outside the pool and
+    reconnects after ``retry_seconds`` if it drops. Notifications sent while
+    it is disconnected are lost, which is safe: the cache then misses on the
+    new version instead of carrying entries over.
+
+    While connected, ``version`` tracks the billing data version without a
+    query per request: it is read once after ``LISTEN`` on every (re)connect,
+    then taken from each notification. It is ``None`` while disconnected.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        on_change: Callable[[BillingChange], None],
+        retry_seconds: float = 5.0,
+        poll_seconds: float = 1.0,
+    ) -> None:
+        self.db_url = db_url
+        self.on_change = on_change
+        self.retry_seconds = retry_seconds
+        self.poll_seconds = poll_seconds
+        self.connected = threading.Event()
+        self.version: int | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="billing-change-listener", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def handle(self, payload: str) -> None:
+        try:
+            change = parse_billing_change(payload)
+        except ValueError:
+            logger.warning(
+                "Ignoring malformed billing change notification", exc_info=True
+            )
+            return
+        self.version = change.version
+        self.on_change(change)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self.db_url, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {BILLING_CHANGES_CHANNEL}")
+                    # Read after LISTEN, so no load can land between the two.
+                    self.version = fetch_optional_billing_data_version(conn)
+                    self.connected.set()
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=self.poll_seconds):
+                            self.handle(notify.payload)
+            except psycopg.Error:
+                logger.warning(
+                    "Billing change listener disconnected; retrying in %ss",
+                    self.retry_seconds,
+                    exc_info=True,
+                )
+            except Exception:
+                logger.exception("Billing change listener failed to apply a change")
+            finally:
+                self.version = None
+                self.connected.clear()
+            self._stop.wait(self.retry_seconds)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import bisect
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Mapping
+
+from .commitments import checkin_bounds
+from .evaluation import summarize_evaluated_commitment
+
+
+MAX_PAGE_SIZE = 500
+SUMMARY_FIELDS = (
+    "id",
+    "name",
+    "service",
+    "met",
+    "checkin_count",
+    "total_committed",
+    "total_actual",
+    "total_shortfall",
+)
+# Summary fields answerable from the catalog alone, without evaluating spend.
+CATALOG_FIELDS = frozenset({"id", "name", "service", "checkin_count"})
+BOOLEAN_VALUES = {"true": True, "1": True, "false": False, "0": False}
+
+
+class InvalidCursor(ValueError):
+    """The page cursor is malformed or does not fit this company's ids."""
+
+
+@dataclass(frozen=True)
+class ListingQuery:
+    """One page request against a company's commitments, ordered by id."""
+
+    limit: int | None = None
+    after: Any = None
+    service: str | None = None
+    met: bool | None = None
+    has_current_checkin: bool | None = None
+    fields: tuple[str, ...] = SUMMARY_FIELDS
+
+    @property
+    def needs_evaluation(self) -> bool:
+        return self.met is not None or not CATALOG_FIELDS.issuperset(self.fields)
+
+
+def encode_cursor(last_id: Any) -> str:
+    raw = json.dumps({"after": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return payload["after"]
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursor("cursor is not a valid page cursor") from exc
+
+
+def parse_flag(args: Mapping[str, str], name: str) -> bool | None:
+    raw = args.get(name)
+    if raw is None:
+        return None
+    value = BOOLEAN_VALUES.get(raw.strip().lower())
+    if value is None:
+        raise ValueError(f"{name} must be true or false")
+    return value
+
+
+def parse_listing_query(args: Mapping[str, str]) -> ListingQuery:
+    """Build a ``ListingQuery`` from request args; raises ``ValueError`` if invalid."""
+    limit = None
+    raw_limit = args.get("limit")
+    if raw_limit is not None:
+        if not raw_limit.isdigit() or not 1 <= int(raw_limit) <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be an integer from 1 to {MAX_PAGE_SIZE}")
+        limit = int(raw_limit)
+
+    fields = SUMMARY_FIELDS
+    raw_fields = args.get("fields")
+    if raw_fields is not None:
+        fields = tuple(name.strip() for name in raw_fields.split(",") if name.strip())
+        unknown = [name for name in fields if name not in SUMMARY_FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"fields must be drawn from: {', '.join(SUMMARY_FIELDS)}")
+
+    cursor = args.get("cursor")
+    return ListingQuery(
+        limit=limit,
+        after=decode_cursor(cursor) if cursor else None,
+        service=args.get("service") or None,
+        met=parse_flag(args, "met"),
+        has_current_checkin=parse_flag(args, "has_current_checkin"),
+        fields=fields,
+    )
+
+
+def has_current_checkin(commitment: dict[str, Any], now: datetime) -> bool:
+    for checkin in commitment.get("checkins", []):
+        start, end = checkin_bounds(checkin)
+        if start <= now < end:
+            return True
+    return False
+
+
+def catalog_summary(commitment: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": commitment["id"],
+        "name": commitment["name"],
+        "service": commitment["service"],
+        "checkin_count": len(commitment.get("checkins", [])),
+    }
+
+
+def list_commitments_page(
+    commitments: list[dict[str, Any]],
+    query: ListingQuery,
+    evaluate: Callable[[list[dict[str, Any]]], list[dict[str, Any]]],
+    now: datetime,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Return one page of commitment summaries and the cursor for the next page.
+
+    Catalog filters run first. Only commitments that may land on the page are
+    evaluated: with a ``met`` filter, candidates are evaluated a page's worth
+    at a time until the page fills, and the cursor resumes after the last one
+    examined. Without ``met`` or spend fields, nothing is evaluated at all.
+    """
+    ordered = sorted(commitments, key=lambda item: item["id"])
+    if query.after is not None:
+        ids = [item["id"] for item in ordered]
+        try:
+            ordered = ordered[bisect.bisect_right(ids, query.after) :]
+        except TypeError as exc:
+            raise InvalidCursor("cursor is not a valid page cursor") from exc
+    candidates = [
+        item
+        for item in ordered
+        if (query.service is None or item.get("service") == query.service)
+        and (
+            query.has_current_checkin is None
+            or has_current_checkin(item, now) == query.has_current_checkin
+        )
+    ]
+
+    summaries: list[dict[str, Any]] = []
+    examined = 0
+    if not query.needs_evaluation:
+        examined = len(candidates) if query.limit is None else query.limit
+        summaries = [catalog_summary(item) for item in candidates[:examined]]
+    else:
+        while examined < len(candidates) and (
+            query.limit is None or len(summaries) < query.limit
+        ):
+            wanted = len(candidates) if query.limit is None else query.limit
+            batch = candidates[examined : examined + wanted - len(summaries)]
+            examined += len(batch)
+            for evaluated in evaluate(batch):
+                if query.met is None or evaluated["met"] == query.met:
+                    summaries.append(summarize_evaluated_commitment(evaluated))
+
+    next_cursor = None
+    if examined < len(candidates):
+        next_cursor = encode_cursor(candidates[examined - 1]["id"])
+    page = [{name: item[name] for name in query.fields} for item in summaries]
+    return page, next_cursor
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Mapping
+
+import psycopg
+
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Stats keys that only ever grow; every other numeric stat is a gauge.
+COUNTER_STATS = frozenset(
+    {
+        "requests",
+        "requests_queued",
+        "requests_errors",
+        "wait_ms_total",
+        "connections_errors",
+        "hits",
+        "misses",
+    }
+)
+
+
+@dataclass
+class RequestTimings:
+    """Database work attributed to the request currently being served."""
+
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        parts = [
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_queries} queries"'
+        ]
+        if self.pool_wait_seconds:
+            parts.append(f"pool;dur={self.pool_wait_seconds * 1000:.2f}")
+        parts.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current.get()
+
+
+def start_request_timings() -> object:
+    """Begin attributing queries to a new request; returns a reset token."""
+    return _current.set(RequestTimings())
+
+
+def end_request_timings(token: object) -> None:
+    _current.reset(token)  # type: ignore[arg-type]
+
+
+class TimedCursor(psycopg.Cursor):
+    """Cursor that charges each statement to the active request, if any."""
+
+    def execute(self, query, params=None, **kwargs):  # type: ignore[no-untyped-def]
+        timings = _current.get()
+        if timings is None:
+            return super().execute(query, params, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, params, **kwargs)
+        finally:
+            timings.db_queries += 1
+            timings.db_seconds += time.perf_counter() - started
+
+    def executemany(self, query, params_seq, **kwargs):  # type: ignore[no-untyped-def]
+        timings = _current.get()
+        if timings is None:
+            return super().executemany(query, params_seq, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, params_seq, **kwargs)
+        finally:
+            timings.db_queries += 1
+            timings.db_seconds += time.perf_counter() - started
+
+
+@contextmanager
+def instrumented(conn: psycopg.Connection) -> Iterator[psycopg.Connection]:
+    """Time statements run on ``conn`` while a request is being measured.
+
+    Outside a measured request the connection is yielded untouched, so scripts
+    and apps with metrics disabled pay nothing.
+    """
+    if _current.get() is None:
+        yield conn
+        return
+
+    previous = conn.cursor_factory
+    conn.cursor_factory = TimedCursor
+    try:
+        yield conn
+    finally:
+        conn.cursor_factory = previous
+
+
+def record_pool_wait(seconds: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.pool_wait_seconds += seconds
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        running = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((bound, running))
+        result.append((math.inf, self.count))
+        return result
+
+
+class MetricsRegistry:
+    """Per-route request latency and database counters for one process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.db_queries: dict[tuple[str, str], int] = {}
+        self.db_seconds: dict[tuple[str, str], float] = {}
+        self.pool_wait_seconds: dict[tuple[str, str], float] = {}
+
+    def observe(
+        self, method: str, route: str, status: int, timings: RequestTimings
+    ) -> None:
+        key = (method, route)
+        elapsed = timings.elapsed()
+        with self._lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.observe(elapsed)
+            status_key = (method, route, status)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            self.db_queries[key] = self.db_queries.get(key, 0) + timings.db_queries
+            self.db_seconds[key] = self.db_seconds.get(key, 0.0) + timings.db_seconds
+            self.pool_wait_seconds[key] = (
+                self.pool_wait_seconds.get(key, 0.0) + timings.pool_wait_seconds
+            )
+
+    def render(self, stats_groups: Mapping[str, Mapping[str, Any] | None]) -> str:
+        """Render Prometheus text exposition, appending ``stats_groups``.
+
+        Each group is a flat stats dict (e.g. pool or cache stats); its numeric
+        values become ``commitments_<group>_<key>`` gauges, except the
+        ``COUNTER_STATS`` keys, which become counters ending in ``_total``.
+        """
+        lines: list[str] = []
+        with self._lock:
+            lines += [
+                "# HELP commitments_http_request_duration_seconds "
+                "Request latency by route.",
+                "# TYPE commitments_http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self.latency.items()):
+                labels = f'method="{method}",route="{escape_label(route)}"'
+                for bound, count in histogram.cumulative():
+                    le = "+Inf" if math.isinf(bound) else repr(bound)
+                    lines.append(
+                        "commitments_http_request_duration_seconds_bucket"
+                        f'{{{labels},le="{le}"}} {count}'
+                    )
+                lines.append(
+                    f"commitments_http_request_duration_seconds_sum{{{labels}}} "
+                    f"{histogram.total:.6f}"
+                )
+                lines.append(
+                    f"commitments_http_request_duration_seconds_count{{{labels}}} "
+                    f"{histogram.count}"
+                )
+
+            lines += [
+                "# HELP commitments_http_requests_total Requests by route and status.",
+                "# TYPE commitments_http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(
+                    "commitments_http_requests_total"
+                    f'{{method="{method}",route="{escape_label(route)}",'
+                    f'status="{status}"}} {count}'
+                )
+
+            for name, help_text, values in (
+                (
+                    "commitments_db_queries_total",
+                    "Database statements executed while serving requests.",
+                    self.db_queries,
+                ),
+                (
+                    "commitments_db_query_seconds_total",
+                    "Time spent executing database statements.",
+                    self.db_seconds,
+                ),
+                (
+                    "commitments_db_pool_wait_seconds_total",
+                    "Time spent waiting for a pooled connection.",
+                    self.pool_wait_seconds,
+                ),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (method, route), value in sorted(values.items()):
+                    lines.append(
+                        f'{name}{{method="{method}",route="{escape_label(route)}"}} '
+                        f"{value:g}"
+                    )
+
+        for group, stats in stats_groups.items():
+            if not stats:
+                continue
+            for key, value in sorted(stats.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"commitments_{group}_{key}"
+                kind = "gauge"
+                if key in COUNTER_STATS:
+                    kind = "counter"
+                    name = name if name.endswith("_total") else f"{name}_total"
+                lines += [f"# TYPE {name} {kind}", f"{name} {value:g}"]
+
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
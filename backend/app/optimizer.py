@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import TYPE_CHECKING, Any, Mapping
+
+from .backends import open_repository
+from .columnar import np
+from .commitments import DATE_FMT, MAX_COMMITTED_AMOUNT
+from .evaluation import cents_to_float
+
+if TYPE_CHECKING:
+    from .columnar import ColumnarSpendEngine
+
+
+DEFAULT_CANDIDATES = 1000
+MAX_CANDIDATES = 10_000
+# Weekly periods start every day, so the span bounds the windows summed.
+MAX_HISTORY_DAYS = 5 * 366
+DEFAULT_TARGET_MET_RATIO = 0.9
+
+
+@dataclass(frozen=True)
+class Cadence:
+    """A checkin length in whole months or days, and how many fit in a year."""
+
+    name: str
+    months: int = 0
+    days: int = 0
+    periods_per_year: float = 0.0
+
+
+CADENCES = {
+    cadence.name: cadence
+    for cadence in (
+        Cadence("week", days=7, periods_per_year=365.2425 / 7),
+        Cadence("month", months=1, periods_per_year=12),
+        Cadence("quarter", months=3, periods_per_year=4),
+        Cadence("half_year", months=6, periods_per_year=2),
+        Cadence("year", months=12, periods_per_year=1),
+    )
+}
+
+
+@dataclass(frozen=True)
+class OptimizerQuery:
+    start: datetime
+    end: datetime
+    cadences: tuple[str, ...] = tuple(CADENCES)
+    target_met_ratio: float = DEFAULT_TARGET_MET_RATIO
+    candidates: int = DEFAULT_CANDIDATES
+    annual_amount_cents: int | None = None
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def parse_date(value: str, label: str) -> datetime:
+    for fmt in (DATE_FMT, "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    raise ValueError(f"{label} must be a UTC date as YYYY-MM-DD or {DATE_FMT!r}")
+
+
+def parse_optimizer_query(args: Mapping[str, str], now: datetime) -> OptimizerQuery:
+    """Parse optimizer query parameters, raising ``ValueError`` with a message."""
+    if not args.get("start"):
+        raise ValueError("start is required")
+    start = parse_date(args["start"], "start")
+    end = parse_date(args["end"], "end") if args.get("end") else now
+    if start >= end:
+        raise ValueError("end must be after start")
+    if end - start > timedelta(days=MAX_HISTORY_DAYS):
+        raise ValueError(f"start must be at most {MAX_HISTORY_DAYS} days before end")
+
+    cadences = tuple(
+        name.strip() for name in args.get("cadence", "").split(",") if name.strip()
+    ) or tuple(CADENCES)
+    unknown = [name for name in cadences if name not in CADENCES]
+    if unknown:
+        raise ValueError(f"cadence must be among: {', '.join(CADENCES)}")
+
+    try:
+        target = float(args.get("target", DEFAULT_TARGET_MET_RATIO))
+    except ValueError:
+        target = -1.0
+    if not 0 < target <= 1:
+        raise ValueError("target must be a fraction greater than 0 and at most 1")
+
+    try:
+        candidates = int(args.get("candidates", DEFAULT_CANDIDATES))
+    except ValueError:
+        candidates = 0
+    if not 2 <= candidates <= MAX_CANDIDATES:
+        raise ValueError(f"candidates must be an integer from 2 to {MAX_CANDIDATES}")
+
+    annual_amount_cents = None
+    if args.get("annual_amount"):
+        try:
+            annual_amount = Decimal(args["annual_amount"])
+            # Past the bound, quantize raises InvalidOperation (not a ValueError).
+            if not 0 <= annual_amount <= MAX_COMMITTED_AMOUNT:
+                raise InvalidOperation
+            annual_amount_cents = int(
+                annual_amount.quantize(Decimal("0.01")).scaleb(2)
+            )
+        except InvalidOperation:
+            raise ValueError(
+                "annual_amount must be a non-negative amount of at most "
+                f"{MAX_COMMITTED_AMOUNT}"
+            ) from None
+
+    return OptimizerQuery(
+        start=start,
+        end=end,
+        cadences=cadences,
+        target_met_ratio=target,
+        candidates=candidates,
+        annual_amount_cents=annual_amount_cents,
+    )
+
+
+def cadence_windows(
+    cadence: Cadence, start: datetime, end: datetime
+) -> list[tuple[datetime, datetime]]:
+    """Every whole candidate period inside ``[start, end)``.
+
+    Month-based periods start at each month boundary and weekly ones at each
+    day, so overlapping periods cover every start date a contract could have.
+    """
+    windows = []
+    if cadence.months:
+        first = start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        current = first if first == start else add_months(first, 1)
+        while add_months(current, cadence.months) <= end:
+            windows.append((current, add_months(current, cadence.months)))
+            current = add_months(current, 1)
+    else:
+        length = timedelta(days=cadence.days)
+        current = start
+        while current + length <= end:
+            windows.append((current, current + length))
+            current += timedelta(days=1)
+    return windows
+
+
+def series_window_cents(
+    company: str,
+    service: str,
+    periods: list[tuple[datetime, datetime]],
+    db_url: str,
+    *,
+    engine: ColumnarSpendEngine | None = None,
+    use_rollups: bool = False,
+    cents: bool = False,
+) -> list[int] | None:
+    """Spend in integer cents for every period of one series, in one batched sum.
+
+    Returns ``None`` when ``company``/``service`` has no billing events at all.
+    """
+    windows = [(company, service, start, end) for start, end in periods]
+    if engine is not None:
+        if not engine.has_series(company, service):
+            return None
+        return engine.sum_cents_for_company_windows(windows)
+    with open_repository(db_url, use_rollups=use_rollups) as repository:
+        if not repository.has_series(company, service):
+            return None
+        if not windows:
+            return []
+        if cents:
+            return repository.sum_cents_for_company_windows(windows)
+        return [
+            int(amount.scaleb(2))
+            for amount in repository.sum_spend_for_company_windows(windows)
+        ]
+
+
+def shortfall_totals(sorted_cents: Any, prefix: Any, amounts: Any) -> tuple[Any, Any]:
+    """Periods missed and total shortfall, in cents, at each committed amount.
+
+    A period misses ``amount`` when its spend is below it, so the misses are
+    the ``searchsorted`` position and their shortfall is ``misses * amount``
+    minus their spend, read from the prefix sums.
+    """
+    missed = np.searchsorted(sorted_cents, amounts, side="left")
+    return missed, amounts * missed - prefix[missed]
+
+
+def sweep_cadence(
+    cadence: Cadence,
+    period_cents: list[int],
+    query: OptimizerQuery,
+) -> dict[str, Any]:
+    """Trade-off curve of one cadence across ``query.candidates`` amounts."""
+    count = len(period_cents)
+    result: dict[str, Any] = {
+        "cadence": cadence.name,
+        "periods": count,
+        "periods_per_year": round(cadence.periods_per_year, 4),
+        "recommended": None,
+        "at_annual_amount": None,
+        "curve": {"amount": [], "met_ratio": [], "expected_shortfall": []},
+    }
+    if not count:
+        return result
+
+    sorted_cents = np.sort(np.array(period_cents, dtype=np.int64))
+    prefix = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(sorted_cents, out=prefix[1:])
+
+    def point(amount_cents: int) -> dict[str, Any]:
+        amounts = np.array([amount_cents], dtype=np.int64)
+        missed, shortfall = shortfall_totals(sorted_cents, prefix, amounts)
+        expected_cents = int(shortfall[0]) / count
+        return {
+            "amount": cents_to_float(amount_cents),
+            "annual_commitment": round(
+                cents_to_float(amount_cents) * cadence.periods_per_year, 2
+            ),
+            "met_ratio": round(1 - int(missed[0]) / count, 4),
+            "expected_shortfall": round(expected_cents / 100, 2),
+            "expected_annual_shortfall": round(
+                expected_cents * cadence.periods_per_year / 100, 2
+            ),
+        }
+
+    # The highest amount met in at least the target share of periods is an
+    # order statistic of the period spend, so it is exact, not a grid point.
+    required = max(math.ceil(query.target_met_ratio * count - 1e-9), 1)
+    result["recommended"] = point(int(sorted_cents[count - required]))
+    if query.annual_amount_cents is not None:
+        result["at_annual_amount"] = point(
+            round(query.annual_amount_cents / cadence.periods_per_year)
+        )
+
+    amounts = np.unique(
+        np.linspace(0, int(sorted_cents[-1]), query.candidates).round().astype(np.int64)
+    )
+    missed, shortfall = shortfall_totals(sorted_cents, prefix, amounts)
+    result["curve"] = {
+        "amount": (amounts / 100).tolist(),
+        "met_ratio": np.round(1 - missed / count, 4).tolist(),
+        "expected_shortfall": np.round(shortfall / count / 100, 2).tolist(),
+    }
+    return result
+
+
+def optimize_commitment(
+    company: str,
+    service: str,
+    query: OptimizerQuery,
+    db_url: str,
+    *,
+    engine: ColumnarSpendEngine | None = None,
+    use_rollups: bool = False,
+    cents: bool = False,
+) -> dict[str, Any] | None:
+    """Sweep committed amounts and cadences against historical period spend.
+
+    Every candidate period of every cadence is summed once, in one batched
+    spend call; each cadence's amounts are then swept with array operations.
+    Per cadence it returns the ``recommended`` amount (the highest met in at
+    least ``target_met_ratio`` of periods) and the met ratio and expected
+    shortfall curve. With an ``annual_amount`` it also prices that contract
+    size at every cadence and names the cadence with the least expected
+    annual shortfall. Returns ``None`` for a series with no billing events.
+    """
+    if np is None:
+        raise RuntimeError(
+            "The commitment optimizer requires numpy. Install it with "
+            "`pip install numpy`."
+        )
+    cadences = [CADENCES[name] for name in query.cadences]
+    windows_by_cadence = [
+        cadence_windows(cadence, query.start, query.end) for cadence in cadences
+    ]
+    period_cents = series_window_cents(
+        company,
+        service,
+        [period for periods in windows_by_cadence for period in periods],
+        db_url,
+        engine=engine,
+        use_rollups=use_rollups,
+        cents=cents,
+    )
+    if period_cents is None:
+        return None
+    totals = iter(period_cents)
+
+    results = [
+        sweep_cadence(cadence, [next(totals) for _ in periods], query)
+        for cadence, periods in zip(cadences, windows_by_cadence)
+    ]
+    priced = [item for item in results if item["at_annual_amount"] is not None]
+    best = min(
+        priced,
+        key=lambda item: item["at_annual_amount"]["expected_annual_shortfall"],
+        default=None,
+    )
+    return {
+        "company": company,
+        "service": service,
+        "start": query.start.strftime(DATE_FMT),
+        "end": query.end.strftime(DATE_FMT),
+        "target_met_ratio": query.target_met_ratio,
+        "annual_amount": (
+            cents_to_float(query.annual_amount_cents)
+            if query.annual_amount_cents is not None
+            else None
+        ),
+        "best_cadence": best["cadence"] if best else None,
+        "cadences": results,
+    }
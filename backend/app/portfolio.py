@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import logging
+from decimal import Decimal
+from typing import Any, Callable, Iterator
+
+from psycopg import OperationalError
+
+from .commitments import CommitmentCatalog, DatabaseCommitmentCatalog
+from .evaluation import decimal_to_float, summarize_evaluated_commitment
+
+
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_LEVELS = ("commitment", "company")
+
+
+def ndjson_line(payload: dict[str, Any]) -> str:
+    return json.dumps(payload, separators=(",", ":")) + "\n"
+
+
+def company_batches(
+    catalog: CommitmentCatalog | DatabaseCommitmentCatalog, max_commitments: int
+) -> Iterator[list[tuple[str, list[dict[str, Any]]]]]:
+    """Group whole companies, in name order, into batches of ~``max_commitments``.
+
+    Commitments are looked up a page of companies at a time, sized from the
+    catalog's average commitments per company, so a database catalog costs
+    one query per batch rather than one per company.
+    """
+    companies = sorted(catalog.companies())
+    if not companies:
+        return
+    page_size = max(1, max_commitments * len(companies) // max(1, len(catalog)))
+    batch: list[tuple[str, list[dict[str, Any]]]] = []
+    batch_size = 0
+    for page_start in range(0, len(companies), page_size):
+        page = companies[page_start : page_start + page_size]
+        by_company = catalog.for_companies(page)
+        for company in page:
+            commitments = by_company[company]
+            batch.append((company, commitments))
+            batch_size += len(commitments)
+            if batch_size >= max_commitments:
+                yield batch
+                batch = []
+                batch_size = 0
+    if batch:
+        yield batch
+
+
+def summarize_company(company: str, evaluated: list[dict[str, Any]]) -> dict[str, Any]:
+    def total(field: str) -> float:
+        amounts = (Decimal(str(item[field])) for item in evaluated)
+        return decimal_to_float(sum(amounts, Decimal("0")))
+
+    return {
+        "company": company,
+        "met": all(item["met"] for item in evaluated),
+        "commitment_count": len(evaluated),
+        "total_committed": total("total_committed"),
+        "total_actual": total("total_actual"),
+        "total_shortfall": total("total_shortfall"),
+    }
+
+
+def iter_portfolio_ndjson(
+    catalog: CommitmentCatalog | DatabaseCommitmentCatalog,
+    evaluate: Callable[[list[dict[str, Any]]], list[dict[str, Any]]],
+    level: str = "commitment",
+    batch_size: int = 500,
+) -> Iterator[str]:
+    """Yield the whole portfolio's evaluation as NDJSON lines.
+
+    A header line is yielded before any evaluation runs. Each batch of whole
+    companies is then evaluated with one ``evaluate`` call and written out
+    before the next batch starts, so memory is bounded by ``batch_size``.
+    Failures after the response has started are reported as a final
+    ``{"type": "error"}`` line.
+    """
+    yield ndjson_line(
+        {
+            "type": "portfolio",
+            "level": level,
+            "company_count": len(catalog.companies()),
+            "commitment_count": len(catalog),
+        }
+    )
+
+    for batch in company_batches(catalog, batch_size):
+        try:
+            evaluated = evaluate([item for _, items in batch for item in items])
+        except OperationalError:
+            logger.exception("Database connection failed while streaming portfolio")
+            yield ndjson_line(
+                {
+                    "type": "error",
+                    "error": "Database unavailable. Verify DATABASE_URL and retry.",
+                }
+            )
+            return
+        except Exception as exc:
+            logger.exception("Unexpected portfolio evaluation failure")
+            yield ndjson_line(
+                {"type": "error", "error": f"Failed to evaluate commitments: {exc}"}
+            )
+            return
+
+        results = iter(evaluated)
+        for company, items in batch:
+            company_results = [next(results) for _ in items]
+            if level == "company":
+                yield ndjson_line(
+                    {"type": "company", **summarize_company(company, company_results)}
+                )
+                continue
+            for item in company_results:
+                yield ndjson_line(
+                    {
+                        "type": "commitment",
+                        "company": company,
+                        "commitment": summarize_evaluated_commitment(item),
+                    }
+                )
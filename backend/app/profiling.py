@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+from flask import Flask, Response, g, jsonify, request
+
+
+MAX_PROFILE_SECONDS = 60.0
+DEFAULT_PROFILE_SECONDS = 10.0
+DEFAULT_INTERVAL_SECONDS = 0.005
+PROFILE_HEADER = "X-Profile"
+REPORT_LIMIT = 40
+
+# cProfile cannot run two profilers at once on newer Pythons, and one
+# sampler is enough load on a live worker, so each kind runs one at a time.
+_sampling_lock = threading.Lock()
+_cprofile_lock = threading.Lock()
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame: FrameType | None) -> list[str]:
+    """Labels from the outermost frame to ``frame``."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def sample_stacks(seconds: float, interval: float) -> Counter[str]:
+    """Sample every other thread's Python stack for ``seconds``.
+
+    Each sample adds one count to the thread's ``name;outer;...;inner``
+    stack, the collapsed format flame graph tools read. The sampling thread
+    itself is left out.
+    """
+    own_id = threading.get_ident()
+    stacks: Counter[str] = Counter()
+    deadline = time.monotonic() + seconds
+    while True:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            name = names.get(thread_id, f"thread-{thread_id}")
+            stacks[";".join([name, *collapse_stack(frame)])] += 1
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return stacks
+        time.sleep(min(interval, remaining))
+
+
+def collapsed_output(stacks: Counter[str], match: str = "") -> str:
+    """One ``stack count`` line per stack containing ``match``, busiest first."""
+    return "".join(
+        f"{stack} {count}\n"
+        for stack, count in stacks.most_common()
+        if match in stack
+    )
+
+
+def profile_report(profiler: cProfile.Profile, limit: int = REPORT_LIMIT) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+def bearer_token_matches(token: str) -> bool:
+    scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(
+        supplied.strip().encode(), token.encode()
+    )
+
+
+def parse_positive_seconds(
+    name: str, default: float, maximum: float
+) -> tuple[float | None, str | None]:
+    try:
+        value = float(request.args.get(name, default))
+    except ValueError:
+        value = -1.0
+    if not 0 < value <= maximum:
+        return None, f"{name} must be seconds above 0 and at most {maximum:g}"
+    return value, None
+
+
+def install_profiling(app: Flask, token: str) -> None:
+    """Serve ``/api/debug/profile`` and per-request cProfile behind ``token``.
+
+    Only installed when ``PROFILING_TOKEN`` is set. Both need an
+    ``Authorization: Bearer <token>`` header; without it the endpoint answers
+    401 and the profile header is ignored.
+    """
+
+    @app.get("/api/debug/profile")
+    def sampling_profile() -> Response | tuple[object, int]:
+        if not bearer_token_matches(token):
+            return jsonify({"error": "Profiling requires a valid bearer token."}), 401
+        seconds, error = parse_positive_seconds(
+            "seconds", DEFAULT_PROFILE_SECONDS, MAX_PROFILE_SECONDS
+        )
+        interval, interval_error = parse_positive_seconds(
+            "interval", DEFAULT_INTERVAL_SECONDS, 1.0
+        )
+        if error or interval_error:
+            return jsonify({"error": error or interval_error}), 400
+        if not _sampling_lock.acquire(blocking=False):
+            return jsonify({"error": "A profile is already being sampled."}), 409
+        try:
+            stacks = sample_stacks(seconds, interval)
+        finally:
+            _sampling_lock.release()
+        body = collapsed_output(stacks, request.args.get("match", ""))
+        return Response(body, mimetype="text/plain")
+
+    @app.before_request
+    def start_cprofile() -> tuple[object, int] | None:
+        if not request.headers.get(PROFILE_HEADER) or not bearer_token_matches(token):
+            return None
+        if not _cprofile_lock.acquire(blocking=False):
+            return jsonify({"error": "Another request is being profiled."}), 409
+        profiler = cProfile.Profile()
+        g.cprofile = profiler
+        profiler.enable()
+        return None
+
+    @app.after_request
+    def report_cprofile(response: Response) -> Response:
+        profiler = g.pop("cprofile", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        _cprofile_lock.release()
+        if request.method == "HEAD":
+            # There is no body to carry the report.
+            return response
+        # The report is not the tagged representation.
+        g.pop("etag", None)
+        # The report replaces the body. Streamed bodies are produced after
+        # this hook, so the report covers only the work done before them.
+        # A 204 or 304 must not have a body, so the report goes out as a 200
+        # and the original status moves to a header.
+        report = profile_report(profiler)
+        bodyless = response.status_code < 200 or response.status_code in (204, 304)
+        profiled = Response(
+            report, status=200 if bodyless else response.status, mimetype="text/plain"
+        )
+        profiled.headers[f"{PROFILE_HEADER}-Content-Type"] = response.content_type
+        profiled.headers[f"{PROFILE_HEADER}-Status"] = str(response.status_code)
+        return profiled
+
+    @app.teardown_request
+    def stop_cprofile(_exc: BaseException | None) -> None:
+        profiler = g.pop("cprofile", None)
+        if profiler is not None:
+            profiler.disable()
+            _cprofile_lock.release()
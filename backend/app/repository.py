@@ -1,27 +1,67 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from typing import Iterator, Sequence
 
 import psycopg
+from psycopg.errors import UndefinedTable
 
 
-def list_companies_from_db(db_url: str) -> list[str]:
-    if not db_url:
-        return []
+LIST_COMPANIES_SQL = """
+    SELECT DISTINCT company
+    FROM billing_events
+    ORDER BY company ASC
+"""
 
-    query = """
-        SELECT DISTINCT company
-        FROM billing_events
-        ORDER BY company ASC
-    """
-    with psycopg.connect(db_url) as conn:
-        with conn.cursor() as cur:
-            cur.execute(query)
-            rows = cur.fetchall()
+
+def list_companies(conn: psycopg.Connection) -> list[str]:
+    with conn.cursor() as cur:
+        cur.execute(LIST_COMPANIES_SQL)
+        rows = cur.fetchall()
     return [row[0] for row in rows]
 
 
+HAS_SPEND_SERIES_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM billing_events WHERE company = %s AND aws_service = %s
+    )
+"""
+
+
+def has_spend_series(conn: psycopg.Connection, company: str, service: str) -> bool:
+    """Whether ``billing_events`` holds any row for ``company``/``service``."""
+    with conn.cursor() as cur:
+        cur.execute(HAS_SPEND_SERIES_SQL, (company, service))
+        row = cur.fetchone()
+    return bool(row[0])
+
+
+BILLING_DATA_VERSION_SQL = "SELECT version FROM billing_data_version"
+
+
+def fetch_billing_data_version(conn: psycopg.Connection) -> int:
+    """Return the version the loader bumps whenever billing data changes."""
+    with conn.cursor() as cur:
+        cur.execute(BILLING_DATA_VERSION_SQL)
+        row = cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+def fetch_optional_billing_data_version(conn: psycopg.Connection) -> int | None:
+    """``fetch_billing_data_version``, or ``None`` if the table does not exist.
+
+    Databases initialized before the table was added have no version to key
+    cached results on. The lookup runs in a savepoint, so the missing table
+    does not abort the caller's transaction.
+    """
+    try:
+        with conn.transaction():
+            return fetch_billing_data_version(conn)
+    except UndefinedTable:
+        return None
+
+
 def sum_spend_for_period(
     conn: psycopg.Connection,
     company: str,
@@ -43,3 +83,547 @@ def sum_spend_for_period(
     value = row[0] if row and row[0] is not None else Decimal("0")
     return Decimal(str(value)).quantize(Decimal("0.01"))
 
+
+# Spend queries are written once and rendered for each money storage mode:
+# NUMERIC ``gross_cost`` or BIGINT ``gross_cost_cents`` (``init_db.py --cents``).
+COMPANY_WINDOWS_SPEND_TEMPLATE = """
+    SELECT COALESCE(SUM(billing_events.{cost}), 0){cast}
+    FROM unnest(%s::text[], %s::text[], %s::timestamptz[], %s::timestamptz[])
+        WITH ORDINALITY
+        AS windows (company, aws_service, period_start, period_end, position)
+    LEFT JOIN billing_events
+      ON billing_events.company = windows.company
+     AND billing_events.aws_service = windows.aws_service
+     AND billing_events.event_time >= windows.period_start
+     AND billing_events.event_time < windows.period_end
+    GROUP BY windows.position
+    ORDER BY windows.position
+"""
+COMPANY_WINDOWS_SPEND_SQL = COMPANY_WINDOWS_SPEND_TEMPLATE.format(
+    cost="gross_cost", cast=""
+)
+COMPANY_WINDOWS_CENTS_SQL = COMPANY_WINDOWS_SPEND_TEMPLATE.format(
+    cost="gross_cost_cents", cast="::bigint"
+)
+
+
+def company_windows_params(
+    windows: Sequence[tuple[str, str, datetime, datetime]],
+) -> tuple[list[str], list[str], list[datetime], list[datetime]]:
+    return (
+        [window[0] for window in windows],
+        [window[1] for window in windows],
+        [window[2] for window in windows],
+        [window[3] for window in windows],
+    )
+
+
+def company_windows_totals(rows: Sequence[tuple[object]]) -> list[Decimal]:
+    return [
+        Decimal(str(row[0] if row[0] is not None else 0)).quantize(Decimal("0.01"))
+        for row in rows
+    ]
+
+
+def company_windows_cents(rows: Sequence[tuple[object]]) -> list[int]:
+    return [int(row[0] or 0) for row in rows]
+
+
+def sum_spend_for_company_windows(
+    conn: psycopg.Connection,
+    windows: Sequence[tuple[str, str, datetime, datetime]],
+) -> list[Decimal]:
+    """Sum spend for many ``(company, service, start, end)`` windows in one query.
+
+    Totals are returned in the same order as ``windows``; windows without
+    matching billing events sum to zero.
+    """
+    if not windows:
+        return []
+
+    with conn.cursor() as cur:
+        cur.execute(COMPANY_WINDOWS_SPEND_SQL, company_windows_params(windows))
+        rows = cur.fetchall()
+    return company_windows_totals(rows)
+
+
+def sum_spend_cents_for_company_windows(
+    conn: psycopg.Connection,
+    windows: Sequence[tuple[str, str, datetime, datetime]],
+) -> list[int]:
+    """Integer-cent ``sum_spend_for_company_windows`` for cents storage."""
+    if not windows:
+        return []
+
+    with conn.cursor() as cur:
+        cur.execute(COMPANY_WINDOWS_CENTS_SQL, company_windows_params(windows))
+        rows = cur.fetchall()
+    return company_windows_cents(rows)
+
+
+def sum_spend_for_windows(
+    conn: psycopg.Connection,
+    company: str,
+    windows: Sequence[tuple[str, datetime, datetime]],
+) -> list[Decimal]:
+    """Sum spend for many ``(service, start, end)`` windows of one company."""
+    return sum_spend_for_company_windows(
+        conn, [(company, *window) for window in windows]
+    )
+
+
+SPEND_SERIES_TEMPLATE = """
+    WITH buckets AS (
+        SELECT bucket_start
+        FROM generate_series(
+            %(start)s::timestamptz,
+            %(end)s::timestamptz - INTERVAL '1 microsecond',
+            %(step)s::interval
+        ) AS bucket_start
+    ),
+    spend AS (
+        SELECT
+            date_bin(%(step)s::interval, event_time, %(start)s::timestamptz)
+                AS bucket_start,
+            SUM({cost}) AS amount
+        FROM billing_events
+        WHERE company = %(company)s
+          AND aws_service = %(service)s
+          AND event_time >= %(start)s
+          AND event_time < %(end)s
+        GROUP BY 1
+    )
+    SELECT
+        buckets.bucket_start,
+        COALESCE(spend.amount, 0){cast},
+        (SUM(COALESCE(spend.amount, 0)) OVER (ORDER BY buckets.bucket_start)){cast}
+    FROM buckets
+    LEFT JOIN spend USING (bucket_start)
+    ORDER BY buckets.bucket_start
+"""
+SPEND_SERIES_SQL = SPEND_SERIES_TEMPLATE.format(cost="gross_cost", cast="")
+SPEND_SERIES_CENTS_SQL = SPEND_SERIES_TEMPLATE.format(
+    cost="gross_cost_cents", cast="::bigint"
+)
+
+
+def spend_series(
+    conn: psycopg.Connection,
+    company: str,
+    service: str,
+    period_start: datetime,
+    period_end: datetime,
+    step: timedelta,
+    cents: bool = False,
+) -> list[tuple[datetime, Decimal | int, Decimal | int]]:
+    """Per-bucket and cumulative spend in ``step``-wide buckets of ``[start, end)``.
+
+    Bucketing (``date_bin``), gap filling (``generate_series``) and the running
+    total all happen in the database, so one row comes back per bucket.
+    """
+    params = {
+        "company": company,
+        "service": service,
+        "start": period_start,
+        "end": period_end,
+        "step": step,
+    }
+    with conn.cursor() as cur:
+        cur.execute(SPEND_SERIES_CENTS_SQL if cents else SPEND_SERIES_SQL, params)
+        rows = cur.fetchall()
+    if cents:
+        return [(row[0], int(row[1]), int(row[2])) for row in rows]
+    return [
+        (
+            row[0],
+            Decimal(str(row[1])).quantize(Decimal("0.01")),
+            Decimal(str(row[2])).quantize(Decimal("0.01")),
+        )
+        for row in rows
+    ]
+
+
+SPEND_EVENTS_TEMPLATE = """
+    SELECT
+        company,
+        aws_service,
+        EXTRACT(EPOCH FROM event_time)::bigint,
+        {cost}
+    FROM billing_events
+"""
+SPEND_EVENTS_SQL = SPEND_EVENTS_TEMPLATE.format(
+    cost="(gross_cost * 100)::bigint"
+)
+SPEND_EVENTS_CENTS_SQL = SPEND_EVENTS_TEMPLATE.format(
+    cost="gross_cost_cents"
+)
+
+
+def iter_spend_event_cents(
+    conn: psycopg.Connection, cents: bool = False
+) -> Iterator[tuple[str, str, int, int]]:
+    """Stream ``(company, service, epoch_seconds, cents)`` for every event.
+
+    A server-side cursor keeps client memory flat; ``cents`` reads
+    ``gross_cost_cents`` from integer-cent storage.
+    """
+    with conn.cursor(name="columnar_spend_engine") as cur:
+        cur.itersize = 50_000
+        cur.execute(SPEND_EVENTS_CENTS_SQL if cents else SPEND_EVENTS_SQL)
+        yield from cur
+
+
+ROLLUP_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+
+def _floor_to(value: datetime, step: timedelta) -> datetime:
+    return value - (value - ROLLUP_EPOCH) % step
+
+
+def _ceil_to(value: datetime, step: timedelta) -> datetime:
+    floored = _floor_to(value, step)
+    return floored if floored == value else floored + step
+
+
+def rollup_segments(
+    period_start: datetime, period_end: datetime
+) -> list[tuple[str, datetime, datetime]]:
+    """Split ``[start, end)`` into the fewest raw, hourly and daily segments.
+
+    Whole UTC days come from daily rollups, whole hours at either edge from
+    hourly rollups, and only sub-hour ragged edges from ``billing_events``.
+    """
+    if period_start >= period_end:
+        return []
+
+    hour_start = _ceil_to(period_start, HOUR)
+    hour_end = _floor_to(period_end, HOUR)
+    if hour_start >= hour_end:
+        return [("raw", period_start, period_end)]
+
+    segments: list[tuple[str, datetime, datetime]] = []
+    day_start = _ceil_to(hour_start, DAY)
+    day_end = _floor_to(hour_end, DAY)
+    if day_start < day_end:
+        segments.append(("hour", hour_start, day_start))
+        segments.append(("day", day_start, day_end))
+        segments.append(("hour", day_end, hour_end))
+    else:
+        segments.append(("hour", hour_start, hour_end))
+    segments.append(("raw", period_start, hour_start))
+    segments.append(("raw", hour_end, period_end))
+    return [segment for segment in segments if segment[1] < segment[2]]
+
+
+ROLLUP_WINDOWS_SPEND_TEMPLATE = """
+    WITH segments AS (
+        SELECT *
+        FROM unnest(
+            %(positions)s::int[],
+            %(sources)s::text[],
+            %(companies)s::text[],
+            %(services)s::text[],
+            %(starts)s::timestamptz[],
+            %(ends)s::timestamptz[]
+        ) AS segments (
+            position, source, company, aws_service, period_start, period_end
+        )
+    )
+    SELECT position, SUM(amount){cast}
+    FROM (
+        SELECT segments.position, billing_rollups.{cost} AS amount
+        FROM segments
+        JOIN billing_rollups
+          ON billing_rollups.company = segments.company
+         AND billing_rollups.aws_service = segments.aws_service
+         AND billing_rollups.granularity = segments.source
+         AND billing_rollups.bucket >= segments.period_start
+         AND billing_rollups.bucket < segments.period_end
+        UNION ALL
+        SELECT segments.position, billing_events.{cost} AS amount
+        FROM segments
+        JOIN billing_events
+          ON segments.source = 'raw'
+         AND billing_events.company = segments.company
+         AND billing_events.aws_service = segments.aws_service
+         AND billing_events.event_time >= segments.period_start
+         AND billing_events.event_time < segments.period_end
+    ) AS amounts
+    GROUP BY position
+"""
+ROLLUP_WINDOWS_SPEND_SQL = ROLLUP_WINDOWS_SPEND_TEMPLATE.format(
+    cost="gross_cost", cast=""
+)
+ROLLUP_WINDOWS_CENTS_SQL = ROLLUP_WINDOWS_SPEND_TEMPLATE.format(
+    cost="gross_cost_cents", cast="::bigint"
+)
+
+
+def rollup_windows_params(
+    windows: Sequence[tuple[str, str, datetime, datetime]],
+) -> dict[str, list] | None:
+    """Build ``ROLLUP_WINDOWS_SPEND_SQL`` parameters, or ``None`` if no segments."""
+    params: dict[str, list] = {
+        "positions": [],
+        "sources": [],
+        "companies": [],
+        "services": [],
+        "starts": [],
+        "ends": [],
+    }
+    for position, (company, service, period_start, period_end) in enumerate(windows):
+        for source, segment_start, segment_end in rollup_segments(
+            period_start, period_end
+        ):
+            params["positions"].append(position)
+            params["sources"].append(source)
+            params["companies"].append(company)
+            params["services"].append(service)
+            params["starts"].append(segment_start)
+            params["ends"].append(segment_end)
+    return params if params["positions"] else None
+
+
+def rollup_windows_totals(
+    window_count: int, rows: Sequence[tuple[int, object]]
+) -> list[Decimal]:
+    totals = [Decimal("0.00")] * window_count
+    for position, amount in rows:
+        if amount is not None:
+            totals[position] = Decimal(str(amount)).quantize(Decimal("0.01"))
+    return totals
+
+
+def rollup_windows_cents(
+    window_count: int, rows: Sequence[tuple[int, object]]
+) -> list[int]:
+    totals = [0] * window_count
+    for position, amount in rows:
+        if amount is not None:
+            totals[position] = int(amount)
+    return totals
+
+
+def sum_spend_for_company_windows_from_rollups(
+    conn: psycopg.Connection,
+    windows: Sequence[tuple[str, str, datetime, datetime]],
+) -> list[Decimal]:
+    """Equivalent of ``sum_spend_for_company_windows`` backed by ``billing_rollups``.
+
+    Requires the rollups to be maintained by ``scripts/load_billing_data.py``.
+    """
+    if not windows:
+        return []
+
+    params = rollup_windows_params(windows)
+    if params is None:
+        return rollup_windows_totals(len(windows), [])
+
+    with conn.cursor() as cur:
+        cur.execute(ROLLUP_WINDOWS_SPEND_SQL, params)
+        rows = cur.fetchall()
+    return rollup_windows_totals(len(windows), rows)
+
+
+def sum_spend_cents_for_company_windows_from_rollups(
+    conn: psycopg.Connection,
+    windows: Sequence[tuple[str, str, datetime, datetime]],
+) -> list[int]:
+    """Integer-cent ``sum_spend_for_company_windows_from_rollups``."""
+    if not windows:
+        return []
+
+    params = rollup_windows_params(windows)
+    if params is None:
+        return rollup_windows_cents(len(windows), [])
+
+    with conn.cursor() as cur:
+        cur.execute(ROLLUP_WINDOWS_CENTS_SQL, params)
+        rows = cur.fetchall()
+    return rollup_windows_cents(len(windows), rows)
+
+
+def sum_spend_for_windows_from_rollups(
+    conn: psycopg.Connection,
+    company: str,
+    windows: Sequence[tuple[str, datetime, datetime]],
+) -> list[Decimal]:
+    """Rollup-backed equivalent of ``sum_spend_for_windows``."""
+    return sum_spend_for_company_windows_from_rollups(
+        conn, [(company, *window) for window in windows]
+    )
+
+
+COMMITMENTS_VERSION_SQL = "SELECT version FROM commitments_version"
+COUNT_COMMITMENTS_SQL = "SELECT count(*) FROM commitments"
+COMMITMENT_COMPANIES_SQL = "SELECT DISTINCT company FROM commitments ORDER BY company"
+COMMITMENT_ROWS_SQL = """
+    SELECT
+        commitments.id,
+        commitments.name,
+        commitments.aws_service,
+        commitment_checkins.start_time,
+        commitment_checkins.end_time,
+        commitment_checkins.amount
+    FROM commitments
+    LEFT JOIN commitment_checkins
+      ON commitment_checkins.company = commitments.company
+     AND commitment_checkins.commitment_id = commitments.id
+    WHERE commitments.company = %s
+      AND (%s::bigint IS NULL OR commitments.id = %s::bigint)
+    ORDER BY commitments.id, commitment_checkins.checkin_index
+"""
+COMMITMENT_ROWS_FOR_KEYS_SQL = """
+    SELECT
+        commitments.company,
+        commitments.id,
+        commitments.name,
+        commitments.aws_service,
+        commitment_checkins.start_time,
+        commitment_checkins.end_time,
+        commitment_checkins.amount
+    FROM unnest(%s::text[], %s::bigint[]) AS wanted (company, commitment_id)
+    JOIN commitments
+      ON commitments.company = wanted.company
+     AND commitments.id = wanted.commitment_id
+    LEFT JOIN commitment_checkins
+      ON commitment_checkins.company = commitments.company
+     AND commitment_checkins.commitment_id = commitments.id
+    ORDER BY commitments.company, commitments.id, commitment_checkins.checkin_index
+"""
+COMMITMENT_ROWS_FOR_COMPANIES_SQL = """
+    SELECT
+        commitments.company,
+        commitments.id,
+        commitments.name,
+        commitments.aws_service,
+        commitment_checkins.start_time,
+        commitment_checkins.end_time,
+        commitment_checkins.amount
+    FROM commitments
+    LEFT JOIN commitment_checkins
+      ON commitment_checkins.company = commitments.company
+     AND commitment_checkins.commitment_id = commitments.id
+    WHERE commitments.company = ANY(%s::text[])
+    ORDER BY commitments.company, commitments.id, commitment_checkins.checkin_index
+"""
+STORED_CHECKIN_SPEND_TEMPLATE = """
+    SELECT
+        commitment_checkins.company,
+        commitment_checkins.commitment_id,
+        commitment_checkins.checkin_index,
+        COALESCE(SUM(billing_events.{cost}), 0){cast}
+    FROM unnest(%s::text[], %s::bigint[]) AS wanted (company, commitment_id)
+    JOIN commitments
+      ON commitments.company = wanted.company
+     AND commitments.id = wanted.commitment_id
+    JOIN commitment_checkins
+      ON commitment_checkins.company = commitments.company
+     AND commitment_checkins.commitment_id = commitments.id
+    LEFT JOIN billing_events
+      ON billing_events.company = commitment_checkins.company
+     AND billing_events.aws_service = commitments.aws_service
+     AND billing_events.event_time >= commitment_checkins.start_time
+     AND billing_events.event_time < commitment_checkins.end_time
+    GROUP BY 1, 2, 3
+"""
+STORED_CHECKIN_SPEND_SQL = STORED_CHECKIN_SPEND_TEMPLATE.format(
+    cost="gross_cost", cast=""
+)
+STORED_CHECKIN_CENTS_SQL = STORED_CHECKIN_SPEND_TEMPLATE.format(
+    cost="gross_cost_cents", cast="::bigint"
+)
+
+
+def fetch_commitments_version(conn: psycopg.Connection) -> int:
+    """Return the version ``import_commitments.py`` bumps on every import."""
+    with conn.cursor() as cur:
+        cur.execute(COMMITMENTS_VERSION_SQL)
+        row = cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+def count_commitments(conn: psycopg.Connection) -> int:
+    with conn.cursor() as cur:
+        cur.execute(COUNT_COMMITMENTS_SQL)
+        row = cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+def list_commitment_companies(conn: psycopg.Connection) -> list[str]:
+    with conn.cursor() as cur:
+        cur.execute(COMMITMENT_COMPANIES_SQL)
+        return [row[0] for row in cur.fetchall()]
+
+
+def fetch_commitment_rows(
+    conn: psycopg.Connection, company: str, commitment_id: int | None = None
+) -> list[tuple]:
+    """One row per checkin of a company's commitments (or one commitment).
+
+    Rows are ordered by commitment id and checkin index; a commitment without
+    checkins yields a single row with ``NULL`` checkin columns.
+    """
+    with conn.cursor() as cur:
+        cur.execute(COMMITMENT_ROWS_SQL, (company, commitment_id, commitment_id))
+        return cur.fetchall()
+
+
+def fetch_commitment_rows_for_keys(
+    conn: psycopg.Connection, keys: Sequence[tuple[str, int]]
+) -> list[tuple]:
+    """``fetch_commitment_rows`` for many ``(company, id)`` keys in one query.
+
+    Rows lead with the company and are ordered by company, id and checkin.
+    """
+    if not keys:
+        return []
+    unique = sorted(set(keys))
+    with conn.cursor() as cur:
+        cur.execute(
+            COMMITMENT_ROWS_FOR_KEYS_SQL,
+            ([key[0] for key in unique], [key[1] for key in unique]),
+        )
+        return cur.fetchall()
+
+
+def fetch_commitment_rows_for_companies(
+    conn: psycopg.Connection, companies: Sequence[str]
+) -> list[tuple]:
+    """Every company's ``fetch_commitment_rows`` in one query, company first."""
+    if not companies:
+        return []
+    with conn.cursor() as cur:
+        cur.execute(COMMITMENT_ROWS_FOR_COMPANIES_SQL, (sorted(set(companies)),))
+        return cur.fetchall()
+
+
+def sum_spend_for_stored_checkins(
+    conn: psycopg.Connection,
+    commitments: Sequence[tuple[str, int]],
+    cents: bool = False,
+) -> dict[tuple[str, int, int], Decimal | int]:
+    """Sum spend for every stored checkin of ``(company, id)`` commitments.
+
+    Checkin windows are joined to ``billing_events`` in SQL, so no windows are
+    sent over the wire. Returns totals keyed by ``(company, id, checkin_index)``.
+    """
+    if not commitments:
+        return {}
+
+    sql = STORED_CHECKIN_CENTS_SQL if cents else STORED_CHECKIN_SPEND_SQL
+    unique = sorted(set(commitments))
+    params = ([key[0] for key in unique], [key[1] for key in unique])
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    totals: dict[tuple[str, int, int], Decimal | int] = {}
+    for company, commitment_id, checkin_index, total in rows:
+        totals[(company, commitment_id, checkin_index)] = (
+            int(total or 0)
+            if cents
+            else Decimal(str(total or 0)).quantize(Decimal("0.01"))
+        )
+    return totals
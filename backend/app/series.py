@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any
+
+from .backends import open_repository
+from .commitments import DATE_FMT, checkin_bounds, checkin_committed_cents
+from .evaluation import cents_to_float, checkin_status, decimal_to_float
+
+if TYPE_CHECKING:
+    from .columnar import ColumnarSpendEngine
+
+
+DEFAULT_SERIES_POINTS = 100
+MAX_SERIES_POINTS = 1000
+
+
+def series_step(period_start: datetime, period_end: datetime, points: int) -> timedelta:
+    """Bucket width giving at most ``points`` buckets, rounded up to whole minutes."""
+    seconds = (period_end - period_start).total_seconds()
+    per_point = math.ceil(seconds / max(points, 1))
+    return timedelta(minutes=max(math.ceil(per_point / 60), 1))
+
+
+def default_checkin_index(checkins: list[dict[str, Any]], now: datetime) -> int:
+    """The current checkin, else the latest one that has started, else the first."""
+    started = 0
+    for idx, checkin in enumerate(checkins):
+        start, end = checkin_bounds(checkin)
+        if start <= now < end:
+            return idx
+        if start <= now:
+            started = idx
+    return started
+
+
+def bucket_spend(
+    commitment: dict[str, Any],
+    period_start: datetime,
+    period_end: datetime,
+    step: timedelta,
+    db_url: str,
+    engine: ColumnarSpendEngine | None,
+    cents: bool,
+) -> list[tuple[datetime, Decimal | int, Decimal | int]]:
+    if engine is None:
+        with open_repository(db_url) as repository:
+            return repository.spend_series(
+                commitment["company"],
+                commitment["service"],
+                period_start,
+                period_end,
+                step,
+                cents=cents,
+            )
+
+    starts = []
+    current = period_start
+    while current < period_end:
+        starts.append(current)
+        current += step
+    company, service = commitment["company"], commitment["service"]
+    windows = [
+        (company, service, start, min(start + step, period_end)) for start in starts
+    ]
+    amounts = engine.sum_cents_for_company_windows(windows)
+    rows: list[tuple[datetime, Decimal | int, Decimal | int]] = []
+    cumulative = 0
+    for start, amount in zip(starts, amounts):
+        cumulative += amount
+        if cents:
+            rows.append((start, amount, cumulative))
+        else:
+            rows.append(
+                (start, Decimal(amount).scaleb(-2), Decimal(cumulative).scaleb(-2))
+            )
+    return rows
+
+
+def commitment_series(
+    commitment: dict[str, Any],
+    db_url: str,
+    points: int = DEFAULT_SERIES_POINTS,
+    checkin_index: int | None = None,
+    now: datetime | None = None,
+    *,
+    engine: ColumnarSpendEngine | None = None,
+    cents: bool = False,
+) -> dict[str, Any]:
+    """Downsampled spend for one checkin against its straight-line committed pace.
+
+    The checkin is split into at most ``points`` equal buckets; each point has
+    the bucket's spend, the running total, and the committed amount a linear
+    pace would have reached by the bucket's end. Raises ``IndexError`` for an
+    unknown ``checkin_index``.
+    """
+    if engine is None and not db_url:
+        raise RuntimeError("DATABASE_URL is not set.")
+
+    now = now or datetime.now(timezone.utc)
+    checkins = commitment.get("checkins", [])
+    if checkin_index is None:
+        checkin_index = default_checkin_index(checkins, now)
+    if not 0 <= checkin_index < len(checkins):
+        raise IndexError(checkin_index)
+
+    checkin = checkins[checkin_index]
+    period_start, period_end = checkin_bounds(checkin)
+    step = series_step(period_start, period_end, points)
+    committed_cents = checkin_committed_cents(checkin)
+    duration = (period_end - period_start).total_seconds()
+    to_float = cents_to_float if cents else decimal_to_float
+
+    series = []
+    rows = bucket_spend(
+        commitment, period_start, period_end, step, db_url, engine, cents
+    )
+    for bucket_start, amount, cumulative in rows:
+        # PostgreSQL returns timestamptz in the session TimeZone; the checkin
+        # strings these line up with are UTC.
+        bucket_start = bucket_start.astimezone(timezone.utc)
+        bucket_end = min(bucket_start + step, period_end)
+        elapsed = (bucket_end - period_start).total_seconds()
+        pace_cents = round(committed_cents * elapsed / duration) if duration else 0
+        series.append(
+            {
+                "start": bucket_start.strftime(DATE_FMT),
+                "end": bucket_end.strftime(DATE_FMT),
+                "amount": to_float(amount),
+                "cumulative": to_float(cumulative),
+                "committed_pace": cents_to_float(pace_cents),
+            }
+        )
+
+    return {
+        "id": commitment["id"],
+        "company": commitment["company"],
+        "service": commitment["service"],
+        "checkin": {
+            "index": checkin_index,
+            "start": checkin["start"],
+            "end": checkin["end"],
+            "status": checkin_status(period_start, period_end, now),
+            "committed_amount": cents_to_float(committed_cents),
+        },
+        "bucket_seconds": int(step.total_seconds()),
+        "points": series,
+    }
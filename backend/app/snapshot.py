@@ -0,0 +1,175 @@
+"""Read-only access to the binary billing snapshot ``load_billing_data.py`` writes.
+
+Layout (little-endian, every section 8-byte aligned)::
+
+    header      HEADER struct below
+    dictionary  UTF-8 JSON ``[companies, services]``, zero-padded
+    series      int64[n_series, 2] company and service dictionary codes
+    offsets     int64[n_series + 1] row offsets of each series
+    timestamps  int64[n_rows] epoch seconds, sorted within each series
+    cents       int64[n_rows]
+    cumulative  int64[n_rows + n_series] per-series prefix sums, each led by 0
+
+Series are stored in (company, aws_service) order, so the file maps straight
+onto ``SpendSeries`` views without sorting or summing anything at startup.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy installed
+    np = None
+
+
+MAGIC = b"CCSPEND\x00"
+FORMAT_VERSION = 1
+# magic, format version, header size, data version, companies, services,
+# series, rows, dictionary bytes, reserved.
+HEADER = struct.Struct("<8sIIqIIQQQQ")
+INT64 = 8
+
+
+class InvalidSnapshot(ValueError):
+    """The file is not a complete snapshot in a format this build reads."""
+
+
+@dataclass(frozen=True)
+class SnapshotHeader:
+    format_version: int
+    data_version: int
+    company_count: int
+    service_count: int
+    series_count: int
+    row_count: int
+    dictionary_bytes: int
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Views over one mapped snapshot file.
+
+    ``series`` maps (company, aws_service) to ``(timestamps, cents,
+    cumulative)`` int64 arrays that share the mapping, so every process
+    serving the same file shares one page-cache copy of it.
+    """
+
+    header: SnapshotHeader
+    series: dict[tuple[str, str], tuple[Any, Any, Any]]
+    signature: str
+
+
+def aligned(size: int) -> int:
+    return -(-size // INT64) * INT64
+
+
+def expected_size(header: SnapshotHeader) -> int:
+    int64_count = (
+        header.series_count * 2
+        + (header.series_count + 1)
+        + header.row_count * 2
+        + header.row_count
+        + header.series_count
+    )
+    return HEADER.size + aligned(header.dictionary_bytes) + int64_count * INT64
+
+
+def read_header(buffer: Any) -> SnapshotHeader:
+    if len(buffer) < HEADER.size:
+        raise InvalidSnapshot("Snapshot is shorter than its header.")
+    (
+        magic,
+        format_version,
+        header_size,
+        data_version,
+        company_count,
+        service_count,
+        series_count,
+        row_count,
+        dictionary_bytes,
+        _reserved,
+    ) = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise InvalidSnapshot("Not a billing snapshot (bad magic).")
+    if format_version != FORMAT_VERSION or header_size != HEADER.size:
+        raise InvalidSnapshot(
+            f"Unsupported snapshot format version {format_version}; "
+            f"this build reads version {FORMAT_VERSION}."
+        )
+    header = SnapshotHeader(
+        format_version=format_version,
+        data_version=data_version,
+        company_count=company_count,
+        service_count=service_count,
+        series_count=series_count,
+        row_count=row_count,
+        dictionary_bytes=dictionary_bytes,
+    )
+    if len(buffer) != expected_size(header):
+        raise InvalidSnapshot(
+            f"Snapshot is {len(buffer)} bytes; its header describes "
+            f"{expected_size(header)}."
+        )
+    return header
+
+
+def open_snapshot(path: Path) -> Snapshot:
+    """Memory-map ``path`` read-only and slice it into per-series views.
+
+    The signature comes from the opened file itself, so a snapshot replaced
+    while this one is mapped is never mistaken for it.
+    """
+    if np is None:
+        raise RuntimeError(
+            "Billing snapshots require numpy. Install it with `pip install numpy`."
+        )
+    with path.open("rb") as handle:
+        stat = os.fstat(handle.fileno())
+        if stat.st_size == 0:
+            raise InvalidSnapshot(f"Snapshot {path} is empty.")
+        # The arrays below keep the mapping alive after the handle closes.
+        buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    header = read_header(buffer)
+    offset = HEADER.size
+    companies, services = json.loads(
+        bytes(buffer[offset : offset + header.dictionary_bytes]).decode("utf-8")
+    )
+    if (len(companies), len(services)) != (
+        header.company_count,
+        header.service_count,
+    ):
+        raise InvalidSnapshot("Snapshot dictionary does not match its header.")
+    offset += aligned(header.dictionary_bytes)
+
+    def int64_section(count: int) -> Any:
+        nonlocal offset
+        array = np.frombuffer(buffer, dtype="<i8", count=count, offset=offset)
+        offset += count * INT64
+        return array
+
+    codes = int64_section(header.series_count * 2).reshape(-1, 2).tolist()
+    offsets = int64_section(header.series_count + 1).tolist()
+    timestamps = int64_section(header.row_count)
+    cents = int64_section(header.row_count)
+    cumulative = int64_section(header.row_count + header.series_count)
+
+    series: dict[tuple[str, str], tuple[Any, Any, Any]] = {}
+    for position, (company_code, service_code) in enumerate(codes):
+        start, end = offsets[position], offsets[position + 1]
+        series[(companies[company_code], services[service_code])] = (
+            timestamps[start:end],
+            cents[start:end],
+            cumulative[start + position : end + position + 1],
+        )
+
+    signature = f"{header.data_version}:{stat.st_mtime_ns}-{stat.st_size}"
+    return Snapshot(header=header, series=series, signature=signature)
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import math
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Iterator, Sequence
+from urllib.parse import quote
+
+
+SQLITE_URL_PREFIX = "sqlite:///"
+
+LIST_COMPANIES_SQL = "SELECT DISTINCT company FROM billing_events ORDER BY company"
+HAS_SERIES_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM billing_events WHERE company = ? AND aws_service = ?
+    )
+"""
+BILLING_DATA_VERSION_SQL = "SELECT version FROM billing_data_version"
+WINDOW_CENTS_SQL = """
+    SELECT COALESCE(SUM(gross_cost_cents), 0)
+    FROM billing_events
+    WHERE company = ?
+      AND aws_service = ?
+      AND event_time >= ?
+      AND event_time < ?
+"""
+
+SERIES_CENTS_SQL = """
+    SELECT (event_time - :start) / :step, SUM(gross_cost_cents)
+    FROM billing_events
+    WHERE company = :company
+      AND aws_service = :service
+      AND event_time >= :start
+      AND event_time < :end
+    GROUP BY 1
+"""
+SPEND_EVENTS_SQL = """
+    SELECT company, aws_service, event_time, gross_cost_cents FROM billing_events
+"""
+
+
+def is_sqlite_url(db_url: str) -> bool:
+    return db_url.startswith(SQLITE_URL_PREFIX)
+
+
+def sqlite_path(db_url: str) -> str:
+    """``sqlite:///data/x.db`` is relative, ``sqlite:////srv/x.db`` absolute."""
+    return db_url[len(SQLITE_URL_PREFIX) :]
+
+
+def to_epoch_seconds(value: datetime) -> int:
+    """Round up so ``event_time >= to_epoch_seconds(start)`` keeps ``[start, end)``."""
+    return math.ceil(value.timestamp())
+
+
+@contextmanager
+def sqlite_connection(db_url: str) -> Iterator[sqlite3.Connection]:
+    """Open an existing embedded database read-write.
+
+    Connections are cheap in-process handles, so each caller opens its own
+    instead of borrowing from a pool. The file must already exist (the loader
+    and ``init_db.py`` create it), so a mistyped path fails instead of serving
+    an empty database.
+    """
+    uri = f"file:{quote(sqlite_path(db_url))}?mode=rw"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+class SqliteSpendRepository:
+    """``SpendRepository`` over the embedded SQLite ``billing_events`` table."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def list_companies(self) -> list[str]:
+        return [row[0] for row in self.conn.execute(LIST_COMPANIES_SQL)]
+
+    def has_series(self, company: str, service: str) -> bool:
+        row = self.conn.execute(HAS_SERIES_SQL, (company, service)).fetchone()
+        return bool(row[0])
+
+    def billing_data_version(self) -> int:
+        row = self.conn.execute(BILLING_DATA_VERSION_SQL).fetchone()
+        return int(row[0]) if row else 0
+
+    def sum_cents_for_company_windows(
+        self, windows: Sequence[tuple[str, str, datetime, datetime]]
+    ) -> list[int]:
+        # One indexed range scan per window; there is no network round trip
+        # to amortise, so the statement is simply re-run from SQLite's cache.
+        totals = []
+        for company, service, period_start, period_end in windows:
+            row = self.conn.execute(
+                WINDOW_CENTS_SQL,
+                (
+                    company,
+                    service,
+                    to_epoch_seconds(period_start),
+                    to_epoch_seconds(period_end),
+                ),
+            ).fetchone()
+            totals.append(int(row[0]))
+        return totals
+
+    def sum_spend_for_company_windows(
+        self, windows: Sequence[tuple[str, str, datetime, datetime]]
+    ) -> list[Decimal]:
+        return [
+            Decimal(cents).scaleb(-2)
+            for cents in self.sum_cents_for_company_windows(windows)
+        ]
+
+    def sum_spend_for_period(
+        self, company: str, service: str, period_start: datetime, period_end: datetime
+    ) -> Decimal:
+        return self.sum_spend_for_company_windows(
+            [(company, service, period_start, period_end)]
+        )[0]
+
+    def spend_series(
+        self,
+        company: str,
+        service: str,
+        period_start: datetime,
+        period_end: datetime,
+        step: timedelta,
+        cents: bool = False,
+    ) -> list[tuple[datetime, Decimal | int, Decimal | int]]:
+        """Per-bucket and cumulative spend, bucketed by one grouped range scan.
+
+        ``step`` is a whole number of minutes, so bucket edges fall on whole
+        epoch seconds and integer division matches the half-open windows.
+        """
+        start = to_epoch_seconds(period_start)
+        step_seconds = int(step.total_seconds())
+        rows = self.conn.execute(
+            SERIES_CENTS_SQL,
+            {
+                "company": company,
+                "service": service,
+                "start": start,
+                "end": to_epoch_seconds(period_end),
+                "step": step_seconds,
+            },
+        )
+        by_bucket = {int(bucket): int(total) for bucket, total in rows}
+        series: list[tuple[datetime, Decimal | int, Decimal | int]] = []
+        cumulative = 0
+        bucket_start = period_start
+        index = 0
+        while bucket_start < period_end:
+            amount = by_bucket.get(index, 0)
+            cumulative += amount
+            if cents:
+                series.append((bucket_start, amount, cumulative))
+            else:
+                series.append(
+                    (
+                        bucket_start,
+                        Decimal(amount).scaleb(-2),
+                        Decimal(cumulative).scaleb(-2),
+                    )
+                )
+            bucket_start += step
+            index += 1
+        return series
+
+    def sum_spend_for_stored_checkins(
+        self, commitments: Sequence[tuple[str, int]], cents: bool = False
+    ) -> dict[tuple[str, int, int], Decimal | int]:
+        # ``check_backend_settings`` rejects this combination at startup.
+        raise RuntimeError("The SQLite backend has no commitments tables.")
+
+    def iter_spend_event_cents(
+        self, cents: bool = False
+    ) -> Iterator[tuple[str, str, int, int]]:
+        # Costs are always integer cents here, whatever ``cents`` says.
+        yield from self.conn.execute(SPEND_EVENTS_SQL)
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from dotenv import load_dotenv
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = PROJECT_ROOT / "backend"
+DEFAULT_CSV_PATH = PROJECT_ROOT / "data" / "aws_billing_data.csv"
+DEFAULT_COMMITMENTS_PATH = PROJECT_ROOT / "data" / "spend_commitments.json"
+
+sys.path.insert(0, str(BACKEND_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import load_billing_data  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmark CSV parsing/loading, commitment evaluation and API routes, "
+            "and write the results as JSON."
+        )
+    )
+    parser.add_argument("--csv-path", default=str(DEFAULT_CSV_PATH))
+    parser.add_argument("--commitments-path", default=str(DEFAULT_COMMITMENTS_PATH))
+    parser.add_argument(
+        "--output",
+        default="",
+        help="Write results JSON here as well as printing it.",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=0,
+        help="Max CSV rows to use for parsing/insert benchmarks (0 means all).",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=20,
+        help="Samples per latency benchmark.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["sql", "columnar"],
+        default="sql",
+        help="SPEND_ENGINE used for evaluation and route benchmarks.",
+    )
+    parser.add_argument(
+        "--with-db",
+        action="store_true",
+        help=(
+            "Include benchmarks that need DATABASE_URL. insert_rows runs inside a "
+            "transaction that is rolled back."
+        ),
+    )
+    return parser.parse_args()
+
+
+def throughput(name: str, count: int, seconds: float) -> dict[str, Any]:
+    return {
+        "name": name,
+        "count": count,
+        "seconds": round(seconds, 6),
+        "per_second": round(count / seconds, 1) if seconds > 0 else None,
+    }
+
+
+def latency(name: str, run: Callable[[], object], repeat: int) -> dict[str, Any]:
+    run()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "name": name,
+        "samples": repeat,
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(int(repeat * 0.95), repeat - 1)], 3),
+        "max_ms": round(samples[-1], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_parsing(csv_path: Path, rows: int, workers: int) -> list[dict[str, Any]]:
+    with csv_path.open(newline="", encoding="utf-8") as handle:
+        raw_rows = []
+        for row in csv.DictReader(handle):
+            raw_rows.append(row)
+            if rows and len(raw_rows) >= rows:
+                break
+
+    started = time.perf_counter()
+    for row in raw_rows:
+        load_billing_data.parse_row(row)
+    results = [throughput("parse_row", len(raw_rows), time.perf_counter() - started)]
+
+    started = time.perf_counter()
+    parsed = load_billing_data.read_rows(csv_path, limit=rows)
+    results.append(throughput("read_rows", len(parsed), time.perf_counter() - started))
+
+    started = time.perf_counter()
+    parallel_count = sum(
+        1
+        for _ in load_billing_data.iter_rows_parallel(csv_path, workers, limit=rows)
+    )
+    results.append(
+        throughput(
+            f"iter_rows_parallel[workers={workers}]",
+            parallel_count,
+            time.perf_counter() - started,
+        )
+    )
+    return results
+
+
+def bench_insert(csv_path: Path, rows: int, db_url: str) -> dict[str, Any]:
+    import psycopg
+
+    parsed = load_billing_data.read_rows(csv_path, limit=rows)
+    with psycopg.connect(db_url) as conn:
+        started = time.perf_counter()
+        inserted = load_billing_data.insert_rows(conn, parsed)
+        elapsed = time.perf_counter() - started
+        conn.rollback()
+    return throughput("insert_rows", inserted, elapsed)
+
+
+def bench_evaluation(
+    commitments_path: Path, db_url: str, engine: Any, repeat: int
+) -> list[dict[str, Any]]:
+    from app.commitments import commitment_catalog
+    from app.evaluation import evaluate_commitment, evaluate_commitments
+
+    catalog = commitment_catalog(commitments_path)
+    if not catalog.commitments:
+        return []
+
+    largest = max(catalog.commitments, key=lambda item: len(item.get("checkins", [])))
+    company = largest["company"]
+    return [
+        latency(
+            f"evaluate_commitment[{len(largest.get('checkins', []))} checkins]",
+            lambda: evaluate_commitment(largest, db_url, engine=engine),
+            repeat,
+        ),
+        latency(
+            f"evaluate_commitments[company={company}]",
+            lambda: evaluate_commitments(
+                catalog.for_company(company), db_url, engine=engine
+            ),
+            repeat,
+        ),
+    ]
+
+
+def bench_routes(commitments_path: Path, repeat: int) -> list[dict[str, Any]]:
+    from app import create_app
+    from app.commitments import commitment_catalog
+
+    catalog = commitment_catalog(commitments_path)
+    client = create_app().test_client()
+    routes = ["/api/companies"]
+    if catalog.commitments:
+        sample = max(
+            catalog.commitments, key=lambda item: len(item.get("checkins", []))
+        )
+        routes.append(f"/api/companies/{sample['company']}/commitments")
+        routes.append(f"/api/companies/{sample['company']}/commitments/{sample['id']}")
+
+    results = []
+    for route in routes:
+
+        def request(route: str = route) -> None:
+            response = client.get(route)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {route} returned {response.status_code}")
+
+        results.append(latency(f"GET {route}", request, repeat))
+    return results
+
+
+def main() -> None:
+    load_dotenv(BACKEND_ROOT / ".env")
+    args = parse_args()
+    csv_path = Path(args.csv_path).resolve()
+    commitments_path = Path(args.commitments_path).resolve()
+
+    # Settings read the environment at import time, so configure it first.
+    os.environ["SPEND_ENGINE"] = args.engine
+    os.environ["COMMITMENTS_PATH"] = str(commitments_path)
+    if args.engine == "columnar" and not args.with_db:
+        os.environ["SPEND_ENGINE_CSV"] = str(csv_path)
+    db_url = os.getenv("DATABASE_URL", "") if args.with_db else ""
+
+    results: list[dict[str, Any]] = bench_parsing(csv_path, args.rows, args.workers)
+    if db_url:
+        results.append(bench_insert(csv_path, args.rows, db_url))
+
+    engine = None
+    if args.engine == "columnar":
+        from app.columnar import ColumnarSpendEngine
+
+        started = time.perf_counter()
+        engine = (
+            ColumnarSpendEngine.from_database(db_url)
+            if db_url
+            else ColumnarSpendEngine.from_csv(csv_path)
+        )
+        results.append(
+            {
+                "name": "columnar_engine_build",
+                "seconds": round(time.perf_counter() - started, 6),
+            }
+        )
+
+    if db_url or engine is not None:
+        results.extend(bench_evaluation(commitments_path, db_url, engine, args.repeat))
+        results.extend(bench_routes(commitments_path, args.repeat))
+    else:
+        print(
+            "Skipping evaluation and route benchmarks: pass --with-db or "
+            "--engine columnar.",
+            file=sys.stderr,
+        )
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "csv_path": str(csv_path),
+            "csv_bytes": csv_path.stat().st_size,
+            "commitments_path": str(commitments_path),
+            "rows": args.rows,
+            "workers": args.workers,
+            "repeat": args.repeat,
+            "engine": args.engine,
+            "with_db": bool(db_url),
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "data" / "synthetic"
+MAX_ROWS = 100_000_000
+SERVICES = [
+    "ec2",
+    "s3",
+    "sagemaker",
+    "cloudwatch",
+    "infinidash",
+    "rds",
+    "lambda",
+    "dynamodb",
+    "eks",
+    "redshift",
+    "cloudfront",
+    "elasticache",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic billing CSV and commitments catalog."
+    )
+    parser.add_argument("--companies", type=int, default=10)
+    parser.add_argument(
+        "--services",
+        type=int,
+        default=4,
+        help=f"Services per company (max {len(SERVICES)}).",
+    )
+    parser.add_argument("--start-year", type=int, default=2024)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument(
+        "--interval-minutes",
+        type=int,
+        default=60,
+        help="Minutes between billing events for each company/service.",
+    )
+    parser.add_argument(
+        "--commitments-per-company",
+        type=int,
+        default=2,
+        help="Commitments generated per company, each on a distinct service.",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--output-dir",
+        default=str(DEFAULT_OUTPUT_DIR),
+        help="Directory for aws_billing_data.csv and spend_commitments.json.",
+    )
+    args = parser.parse_args()
+    if not 1 <= args.services <= len(SERVICES):
+        parser.error(f"--services must be between 1 and {len(SERVICES)}.")
+    if args.interval_minutes <= 0 or args.years <= 0 or args.companies <= 0:
+        parser.error("--companies, --years and --interval-minutes must be positive.")
+    return args
+
+
+def company_names(count: int) -> list[str]:
+    width = len(str(count))
+    return [f"company-{idx:0{width}d}" for idx in range(1, count + 1)]
+
+
+def series_base_costs(
+    companies: list[str], service_count: int, rng: random.Random
+) -> dict[tuple[str, str], float]:
+    """Pick each company's services and a per-event base cost for each."""
+    base_costs = {}
+    for company in companies:
+        for service in rng.sample(SERVICES, service_count):
+            base_costs[(company, service)] = round(rng.lognormvariate(2.5, 1.2), 2)
+    return base_costs
+
+
+def write_billing_csv(
+    path: Path,
+    base_costs: dict[tuple[str, str], float],
+    start: datetime,
+    end: datetime,
+    interval: timedelta,
+    rng: random.Random,
+) -> int:
+    """Stream time-ordered events for every series to ``path``; return row count."""
+    series = sorted(base_costs.items())
+    rows = 0
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        handle.write("company,aws_service,datetime,gross_cost\n")
+        current = start
+        while current < end:
+            stamp = current.strftime("%Y-%m-%d %H:%M:%S")
+            lines = []
+            for (company, service), base in series:
+                cost = max(base * rng.uniform(0.6, 1.4), 0.0)
+                lines.append(f"{company},{service},{stamp},{cost:.2f}\n")
+            handle.writelines(lines)
+            rows += len(lines)
+            current += interval
+    return rows
+
+
+def monthly_boundaries(start: datetime, end: datetime) -> list[datetime]:
+    boundaries = [start]
+    current = start
+    while current < end:
+        month = current.month % 12 + 1
+        year = current.year + (1 if current.month == 12 else 0)
+        current = current.replace(year=year, month=month)
+        boundaries.append(min(current, end))
+    return boundaries
+
+
+def build_commitments(
+    base_costs: dict[tuple[str, str], float],
+    companies: list[str],
+    per_company: int,
+    start: datetime,
+    end: datetime,
+    interval: timedelta,
+    rng: random.Random,
+) -> list[dict]:
+    """Monthly-checkin commitments set around each series' expected spend."""
+    events_per_second = 1 / interval.total_seconds()
+    boundaries = monthly_boundaries(start, end)
+    commitments = []
+    next_id = 1
+    for company in companies:
+        services = sorted(service for owner, service in base_costs if owner == company)
+        for service in services[:per_company]:
+            base = base_costs[(company, service)]
+            checkins = []
+            for checkin_start, checkin_end in zip(boundaries, boundaries[1:]):
+                expected = (
+                    base
+                    * events_per_second
+                    * (checkin_end - checkin_start).total_seconds()
+                )
+                checkins.append(
+                    {
+                        "start": checkin_start.strftime("%Y-%m-%d %H:%M:%S"),
+                        "end": checkin_end.strftime("%Y-%m-%d %H:%M:%S"),
+                        "amount": round(expected * rng.uniform(0.8, 1.2), -1),
+                    }
+                )
+            commitments.append(
+                {
+                    "id": next_id,
+                    "name": f"{service.upper()} commitment",
+                    "company": company,
+                    "service": service,
+                    "checkins": checkins,
+                }
+            )
+            next_id += 1
+    return commitments
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    start = datetime(args.start_year, 1, 1, tzinfo=timezone.utc)
+    end = datetime(args.start_year + args.years, 1, 1, tzinfo=timezone.utc)
+    interval = timedelta(minutes=args.interval_minutes)
+
+    companies = company_names(args.companies)
+    base_costs = series_base_costs(companies, args.services, rng)
+    steps = -(-int((end - start).total_seconds()) // int(interval.total_seconds()))
+    expected_rows = steps * len(base_costs)
+    if expected_rows > MAX_ROWS:
+        raise ValueError(
+            f"Requested {expected_rows} rows; the generator caps output at {MAX_ROWS}."
+        )
+
+    output_dir = Path(args.output_dir).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = output_dir / "aws_billing_data.csv"
+    commitments_path = output_dir / "spend_commitments.json"
+
+    print(f"Writing ~{expected_rows} row(s) to {csv_path}")
+    rows = write_billing_csv(csv_path, base_costs, start, end, interval, rng)
+    commitments = build_commitments(
+        base_costs,
+        companies,
+        args.commitments_per_company,
+        start,
+        end,
+        interval,
+        rng,
+    )
+    with commitments_path.open("w", encoding="utf-8") as handle:
+        json.dump({"commitments": commitments}, handle, indent=2)
+
+    print(f"Wrote {rows} billing row(s) to {csv_path}")
+    print(f"Wrote {len(commitments)} commitment(s) to {commitments_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any
+
+import psycopg
+from dotenv import load_dotenv
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_COMMITMENTS_PATH = PROJECT_ROOT / "data" / "spend_commitments.json"
+DATE_FMT = "%Y-%m-%d %H:%M:%S"
+
+CommitmentRow = tuple[str, int, str, str]
+CheckinRow = tuple[str, int, int, datetime, datetime, Decimal]
+
+STAGING_SQL = """
+    CREATE TEMPORARY TABLE commitments_staging
+        (LIKE commitments INCLUDING DEFAULTS) ON COMMIT DROP;
+    CREATE TEMPORARY TABLE commitment_checkins_staging
+        (LIKE commitment_checkins INCLUDING DEFAULTS) ON COMMIT DROP;
+"""
+COPY_COMMITMENTS_SQL = """
+    COPY commitments_staging (company, id, name, aws_service) FROM STDIN
+"""
+COPY_CHECKINS_SQL = """
+    COPY commitment_checkins_staging
+        (company, commitment_id, checkin_index, start_time, end_time, amount)
+    FROM STDIN
+"""
+DELETE_MISSING_SQL = """
+    DELETE FROM commitments
+    WHERE NOT EXISTS (
+        SELECT 1 FROM commitments_staging AS staged
+        WHERE staged.company = commitments.company AND staged.id = commitments.id
+    )
+"""
+MERGE_SQL = """
+    INSERT INTO commitments (company, id, name, aws_service)
+    SELECT company, id, name, aws_service FROM commitments_staging
+    ON CONFLICT (company, id) DO UPDATE SET
+        name = EXCLUDED.name,
+        aws_service = EXCLUDED.aws_service;
+
+    DELETE FROM commitment_checkins
+    USING commitments_staging AS staged
+    WHERE commitment_checkins.company = staged.company
+      AND commitment_checkins.commitment_id = staged.id;
+
+    INSERT INTO commitment_checkins
+        (company, commitment_id, checkin_index, start_time, end_time, amount)
+    SELECT company, commitment_id, checkin_index, start_time, end_time, amount
+    FROM commitment_checkins_staging;
+"""
+BUMP_VERSION_SQL = """
+    INSERT INTO commitments_version (singleton, version, updated_at)
+    VALUES (TRUE, 1, now())
+    ON CONFLICT (singleton) DO UPDATE SET
+        version = commitments_version.version + 1,
+        updated_at = now()
+    RETURNING version
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Import spend_commitments.json into the commitments tables."
+    )
+    parser.add_argument(
+        "--commitments-path",
+        default=str(DEFAULT_COMMITMENTS_PATH),
+        help="Path to a commitments JSON file.",
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Delete stored commitments that are not in the file.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Parse and validate the file without writing to database.",
+    )
+    return parser.parse_args()
+
+
+def parse_checkin_time(value: Any, label: str) -> datetime:
+    try:
+        return datetime.strptime(value, DATE_FMT).replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid {label}: {value}") from exc
+
+
+def commitment_rows(
+    commitments: list[dict[str, Any]],
+) -> tuple[list[CommitmentRow], list[CheckinRow]]:
+    """Validate commitments in the JSON format and flatten them into table rows."""
+    commitment_table: list[CommitmentRow] = []
+    checkin_table: list[CheckinRow] = []
+    seen: set[tuple[str, int]] = set()
+
+    for position, item in enumerate(commitments, start=1):
+        company = str(item.get("company") or "").strip()
+        service = str(item.get("service") or "").strip()
+        commitment_id = item.get("id")
+        if not company or not service or not isinstance(commitment_id, int):
+            raise ValueError(
+                f"Commitment #{position} needs an integer id, company and service"
+            )
+        if (company, commitment_id) in seen:
+            raise ValueError(
+                f"Duplicate commitment '{commitment_id}' for company '{company}'"
+            )
+        seen.add((company, commitment_id))
+        commitment_table.append(
+            (company, commitment_id, str(item.get("name") or ""), service)
+        )
+
+        for index, checkin in enumerate(item.get("checkins", [])):
+            start = parse_checkin_time(checkin.get("start"), "checkin start")
+            end = parse_checkin_time(checkin.get("end"), "checkin end")
+            if end <= start:
+                raise ValueError(
+                    f"Checkin {index} of commitment '{commitment_id}' ends before "
+                    "it starts"
+                )
+            try:
+                amount = Decimal(str(checkin["amount"])).quantize(Decimal("0.01"))
+            except (InvalidOperation, KeyError) as exc:
+                raise ValueError(f"Invalid amount: {checkin.get('amount')}") from exc
+            checkin_table.append((company, commitment_id, index, start, end, amount))
+
+    return commitment_table, checkin_table
+
+
+def import_commitments(
+    conn: psycopg.Connection,
+    commitment_table: list[CommitmentRow],
+    checkin_table: list[CheckinRow],
+    replace: bool = False,
+) -> int:
+    """Upsert commitments and replace their checkins; return the new version.
+
+    Rows are staged with ``COPY`` and merged in one transaction, so the API
+    never sees a commitment without its checkins.
+    """
+    with conn.cursor() as cur:
+        cur.execute(STAGING_SQL)
+        with cur.copy(COPY_COMMITMENTS_SQL) as copy:
+            for row in commitment_table:
+                copy.write_row(row)
+        with cur.copy(COPY_CHECKINS_SQL) as copy:
+            for row in checkin_table:
+                copy.write_row(row)
+        if replace:
+            cur.execute(DELETE_MISSING_SQL)
+        cur.execute(MERGE_SQL)
+        cur.execute(BUMP_VERSION_SQL)
+        row = cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+def main() -> None:
+    load_dotenv(PROJECT_ROOT / "backend" / ".env")
+    args = parse_args()
+    commitments_path = Path(args.commitments_path).resolve()
+
+    if not commitments_path.exists():
+        raise FileNotFoundError(f"Commitments path does not exist: {commitments_path}")
+
+    with commitments_path.open(encoding="utf-8") as handle:
+        payload = json.load(handle)
+    commitment_table, checkin_table = commitment_rows(payload.get("commitments", []))
+    print(
+        f"Parsed {len(commitment_table)} commitment(s) and {len(checkin_table)} "
+        f"checkin(s) from {commitments_path}"
+    )
+
+    if args.dry_run:
+        print("Dry run enabled. Skipping database writes.")
+        return
+
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("DATABASE_URL is not set.")
+
+    with psycopg.connect(db_url) as conn:
+        version = import_commitments(
+            conn, commitment_table, checkin_table, replace=args.replace
+        )
+        conn.commit()
+
+    print(f"Imported commitments; catalog version is now {version}.")
+    print("Serve them with COMMITMENTS_SOURCE=database.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import argparse
 import os
+import sqlite3
+from datetime import datetime, timezone
 from pathlib import Path
 
 import psycopg
@@ -10,6 +12,15 @@ from dotenv import load_dotenv
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 SCHEMA_PATH = PROJECT_ROOT / "backend" / "sql" / "schema.sql"
+PARTITIONED_SCHEMA_PATH = (
+    PROJECT_ROOT / "backend" / "sql" / "partitioned_billing_events.sql"
+)
+CENTS_STORAGE_PATH = PROJECT_ROOT / "backend" / "sql" / "cents_storage.sql"
+SQLITE_SCHEMA_PATH = PROJECT_ROOT / "backend" / "sql" / "sqlite_schema.sql"
+SQLITE_URL_PREFIX = "sqlite:///"
+BILLING_EVENTS_KIND_SQL = """
+    SELECT relkind FROM pg_class WHERE oid = to_regclass('billing_events')
+"""
 
 
 def parse_args() -> argparse.Namespace:
@@ -19,14 +30,86 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Print schema and exit without connecting to database.",
     )
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help=(
+            "Create billing_events range-partitioned by month. Only applies when "
+            "the table does not exist yet."
+        ),
+    )
+    parser.add_argument(
+        "--cents",
+        action="store_true",
+        help=(
+            "Store gross cost as BIGINT gross_cost_cents, converting existing rows. "
+            "Run the API with MONEY_STORAGE=cents afterwards."
+        ),
+    )
+    parser.add_argument(
+        "--partitions-from",
+        default="",
+        help="First month (YYYY-MM) to pre-create partitions for. Defaults to now.",
+    )
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=3,
+        help="Months past the current one to pre-create partitions for.",
+    )
     return parser.parse_args()
 
 
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_range(
+    partitions_from: str, months_ahead: int, now: datetime | None = None
+) -> tuple[datetime, datetime]:
+    """Return the first and last month that should have a partition."""
+    current = month_start(now or datetime.now(timezone.utc))
+    first = current
+    if partitions_from:
+        first = datetime.strptime(partitions_from, "%Y-%m").replace(
+            tzinfo=timezone.utc
+        )
+    return min(first, current), add_months(current, max(months_ahead, 0))
+
+
+def init_sqlite(db_url: str, args: argparse.Namespace) -> None:
+    """Create the embedded SQLite schema; costs are always integer cents there."""
+    if args.partitioned:
+        raise RuntimeError("--partitioned requires a PostgreSQL DATABASE_URL.")
+
+    db_path = Path(db_url[len(SQLITE_URL_PREFIX) :])
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SQLITE_SCHEMA_PATH.read_text(encoding="utf-8"))
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"SQLite schema initialized at {db_path}.")
+
+
 def main() -> None:
     load_dotenv(PROJECT_ROOT / "backend" / ".env")
     args = parse_args()
 
     schema_sql = SCHEMA_PATH.read_text(encoding="utf-8")
+    if args.partitioned:
+        schema_sql = (
+            PARTITIONED_SCHEMA_PATH.read_text(encoding="utf-8") + "\n" + schema_sql
+        )
+    if args.cents:
+        schema_sql += "\n" + CENTS_STORAGE_PATH.read_text(encoding="utf-8")
 
     if args.dry_run:
         print("Dry run: schema parsed successfully.")
@@ -37,14 +120,41 @@ def main() -> None:
     if not db_url:
         raise RuntimeError("DATABASE_URL is not set.")
 
+    if db_url.startswith(SQLITE_URL_PREFIX):
+        init_sqlite(db_url, args)
+        return
+
     with psycopg.connect(db_url) as conn:
         with conn.cursor() as cur:
+            cur.execute(BILLING_EVENTS_KIND_SQL)
+            row = cur.fetchone()
+            if args.partitioned and row is not None and row[0] != "p":
+                raise RuntimeError(
+                    "billing_events already exists as a plain table. Drop it (or "
+                    "rename it and re-load the CSV) before using --partitioned."
+                )
             cur.execute(schema_sql)
+            cur.execute(BILLING_EVENTS_KIND_SQL)
+            row = cur.fetchone()
+            partitioned = row is not None and row[0] == "p"
+            created = 0
+            if partitioned:
+                first, last = partition_range(args.partitions_from, args.months_ahead)
+                cur.execute(
+                    "SELECT ensure_billing_event_partitions(%s, %s)", (first, last)
+                )
+                created = cur.fetchone()[0]
         conn.commit()
 
     print("Schema initialized successfully.")
+    if args.cents:
+        print("Billing tables use integer-cent storage; set MONEY_STORAGE=cents.")
+    if partitioned:
+        print(
+            f"billing_events is partitioned by month; created {created} new "
+            f"partition(s) through {last:%Y-%m}."
+        )
 
 
 if __name__ == "__main__":
     main()
-
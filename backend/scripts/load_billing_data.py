@@ -2,11 +2,22 @@ from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
+import io
+import json
 import os
-from datetime import datetime, timezone
+import re
+import sqlite3
+import sys
+import time
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal, InvalidOperation
+from itertools import accumulate, pairwise
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable, Iterator
 
 import psycopg
 from dotenv import load_dotenv
@@ -14,7 +25,100 @@ from psycopg.types.json import Jsonb
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = PROJECT_ROOT / "backend"
+
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.snapshot import FORMAT_VERSION as SNAPSHOT_FORMAT_VERSION  # noqa: E402
+from app.snapshot import HEADER as SNAPSHOT_HEADER  # noqa: E402
+from app.snapshot import MAGIC as SNAPSHOT_MAGIC  # noqa: E402
+
 DEFAULT_CSV_PATH = PROJECT_ROOT / "data" / "aws_billing_data.csv"
+SQLITE_SCHEMA_PATH = PROJECT_ROOT / "backend" / "sql" / "sqlite_schema.sql"
+SQLITE_URL_PREFIX = "sqlite:///"
+DEFAULT_BATCH_SIZE = 50_000
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+COST_PATTERN = re.compile(r"([0-9]{1,15})(?:\.([0-9]{1,2}))?")
+WATERMARK_PREFIX_BYTES = 1024 * 1024
+# API workers LISTEN on this channel (backend/app/invalidation.py). PostgreSQL
+# rejects payloads of 8000 bytes or more.
+BILLING_CHANGES_CHANNEL = "billing_data_changed"
+NOTIFY_PAYLOAD_LIMIT = 7900
+# Statements touching the cost column are templates rendered by ``money_sql``
+# for the table's money storage: NUMERIC ``gross_cost`` or BIGINT
+# ``gross_cost_cents`` (``init_db.py --cents``).
+COPY_SQL = """
+    COPY billing_events (company, aws_service, event_time, {cost})
+    FROM STDIN (FORMAT BINARY)
+"""
+STAGING_TABLE_SQL = """
+    CREATE TEMPORARY TABLE IF NOT EXISTS billing_events_staging (
+        row_number BIGINT GENERATED ALWAYS AS IDENTITY,
+        company TEXT NOT NULL,
+        aws_service TEXT NOT NULL,
+        event_time TIMESTAMPTZ NOT NULL,
+        {cost} {cost_type} NOT NULL
+    ) ON COMMIT DELETE ROWS
+"""
+STAGING_COPY_SQL = """
+    COPY billing_events_staging (company, aws_service, event_time, {cost})
+    FROM STDIN (FORMAT BINARY)
+"""
+MERGE_STAGING_SQL = """
+    INSERT INTO billing_events (company, aws_service, event_time, {cost})
+    SELECT DISTINCT ON (company, aws_service, event_time)
+        company, aws_service, event_time, {cost}
+    FROM billing_events_staging
+    ORDER BY company, aws_service, event_time, row_number DESC
+    ON CONFLICT (company, aws_service, event_time)
+    DO UPDATE SET {cost} = EXCLUDED.{cost}
+    WHERE billing_events.{cost} IS DISTINCT FROM EXCLUDED.{cost}
+"""
+MONEY_STORAGE_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'billing_events'
+          AND column_name = 'gross_cost_cents'
+    )
+"""
+PARTITIONED_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'billing_events'::regclass
+    )
+"""
+ENSURE_PARTITIONS_SQL = "SELECT ensure_billing_event_partitions(%s, %s)"
+ENSURE_STAGING_PARTITIONS_SQL = """
+    SELECT ensure_billing_event_partitions(min(event_time), max(event_time))
+    FROM billing_events_staging;
+"""
+
+
+@dataclass(frozen=True)
+class MoneyStorage:
+    """How billing tables store gross cost."""
+
+    column: str
+    sql_type: str
+    copy_type: str
+    cents: bool
+
+
+NUMERIC_MONEY = MoneyStorage("gross_cost", "NUMERIC(12,2)", "numeric", cents=False)
+CENTS_MONEY = MoneyStorage("gross_cost_cents", "BIGINT", "int8", cents=True)
+
+
+def money_sql(sql: str, money: MoneyStorage) -> str:
+    return sql.format(cost=money.column, cost_type=money.sql_type)
+
+
+def money_storage(conn: psycopg.Connection) -> MoneyStorage:
+    """Detect whether billing_events uses integer-cent storage."""
+    with conn.cursor() as cur:
+        cur.execute(MONEY_STORAGE_SQL)
+        row = cur.fetchone()
+    return CENTS_MONEY if row and row[0] else NUMERIC_MONEY
 
 
 def parse_args() -> argparse.Namespace:
@@ -27,7 +131,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--truncate",
         action="store_true",
-        help="Truncate billing_events table before inserting rows.",
+        help="Truncate billing_events and billing_rollups before inserting rows.",
     )
     parser.add_argument(
         "--dry-run",
@@ -40,7 +144,67 @@ def parse_args() -> argparse.Namespace:
         default=0,
         help="Optional max number of rows to process (0 means all rows).",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only ingest rows appended since the last load of this file and "
+            "upsert them on (company, aws_service, event_time)."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Parse the CSV in byte-range chunks across this many processes "
+            "(default 1 parses serially). Requires no newlines inside quoted fields."
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Stream rows through binary COPY in fixed-size batches, upserting "
+            "and committing after each batch, so memory stays flat regardless "
+            "of file size and re-running a load is safe."
+        ),
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=(
+            "Rows per COPY batch/commit in --stream and --incremental modes "
+            f"(default {DEFAULT_BATCH_SIZE})."
+        ),
+    )
+    parser.add_argument(
+        "--snapshot",
+        default="",
+        help=(
+            "Also write a binary billing snapshot for SPEND_ENGINE_SNAPSHOT to "
+            "this path: exported from the database after the load, or from the "
+            "CSV alone with --dry-run."
+        ),
+    )
+    parser.add_argument(
+        "--rebuild-rollups",
+        action="store_true",
+        help=(
+            "Recompute every billing_rollups bucket from billing_events without "
+            "loading a CSV. Run once before setting SPEND_ROLLUPS=true on data "
+            "loaded before the rollup table existed."
+        ),
+    )
+    args = parser.parse_args()
+    if args.incremental and args.limit:
+        parser.error("--limit cannot be combined with --incremental.")
+    if args.rebuild_rollups and (
+        args.truncate or args.dry_run or args.incremental or args.stream
+    ):
+        parser.error("--rebuild-rollups does not load a CSV; run it on its own.")
+    return args
 
 
 def parse_row(row: dict[str, str]) -> tuple[str, str, datetime, Decimal]:
@@ -64,43 +228,715 @@ def parse_row(row: dict[str, str]) -> tuple[str, str, datetime, Decimal]:
     return company, aws_service, event_time, gross_cost
 
 
-def read_rows(csv_path: Path, limit: int = 0) -> list[tuple[str, str, datetime, Decimal]]:
-    parsed_rows: list[tuple[str, str, datetime, Decimal]] = []
+def iter_rows(
+    csv_path: Path, limit: int = 0
+) -> Iterator[tuple[str, str, datetime, Decimal]]:
     with csv_path.open(newline="", encoding="utf-8") as handle:
         reader = csv.DictReader(handle)
         for idx, row in enumerate(reader, start=1):
-            parsed_rows.append(parse_row(row))
+            yield parse_row(row)
             if limit and idx >= limit:
                 break
+
+
+def read_rows(csv_path: Path, limit: int = 0) -> list[tuple[str, str, datetime, Decimal]]:
+    return list(iter_rows(csv_path, limit=limit))
+
+
+def cost_in_cents(
+    row: tuple[str, str, datetime, Decimal],
+) -> tuple[str, str, datetime, int]:
+    return row[0], row[1], row[2], int(row[3].scaleb(2))
+
+
+def parse_fields_fast(
+    company: str,
+    aws_service: str,
+    raw_datetime: str,
+    raw_cost: str,
+    cents: bool = False,
+) -> tuple[str, str, datetime, Decimal | int] | None:
+    """Parse the common well-formed row shape without strptime/Decimal parsing.
+
+    Returns ``None`` for anything unusual so the caller can fall back to
+    ``parse_row``, which keeps results and validation errors identical. With
+    ``cents`` the cost is returned as integer cents.
+    """
+    if (
+        len(raw_datetime) != 19
+        or raw_datetime[4] != "-"
+        or raw_datetime[7] != "-"
+        or raw_datetime[10] != " "
+        or raw_datetime[13] != ":"
+        or raw_datetime[16] != ":"
+    ):
+        return None
+    digits = (
+        raw_datetime[0:4]
+        + raw_datetime[5:7]
+        + raw_datetime[8:10]
+        + raw_datetime[11:13]
+        + raw_datetime[14:16]
+        + raw_datetime[17:19]
+    )
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    try:
+        event_time = datetime(
+            int(digits[0:4]),
+            int(digits[4:6]),
+            int(digits[6:8]),
+            int(digits[8:10]),
+            int(digits[10:12]),
+            int(digits[12:14]),
+            tzinfo=timezone.utc,
+        )
+    except ValueError:
+        return None
+
+    cost_match = COST_PATTERN.fullmatch(raw_cost)
+    if cost_match is None:
+        return None
+    whole, fraction = cost_match.groups()
+    cost_cents = int(whole) * 100 + int((fraction or "0").ljust(2, "0"))
+
+    company = company.strip()
+    aws_service = aws_service.strip()
+    if not company or not aws_service:
+        return None
+
+    if cents:
+        return company, aws_service, event_time, cost_cents
+    return company, aws_service, event_time, Decimal(cost_cents).scaleb(-2)
+
+
+def parse_csv_chunk(
+    csv_path: str, fieldnames: list[str], start: int, end: int, cents: bool = False
+) -> list[tuple[str, str, datetime, Decimal | int]]:
+    """Parse the rows in bytes ``[start, end)`` of ``csv_path``.
+
+    Rows are interpreted exactly like ``csv.DictReader`` with ``fieldnames``
+    would, using ``parse_fields_fast`` where possible and ``parse_row``
+    otherwise. ``cents`` returns costs as integer cents.
+    """
+    parsed_rows, error = parse_csv_chunk_until_error(
+        csv_path, fieldnames, start, end, cents
+    )
+    if error is not None:
+        raise error
     return parsed_rows
 
 
+def parse_csv_chunk_until_error(
+    csv_path: str,
+    fieldnames: list[str],
+    start: int,
+    end: int,
+    cents: bool = False,
+    max_rows: int = 0,
+) -> tuple[list[tuple[str, str, datetime, Decimal | int]], ValueError | None]:
+    """Like ``parse_csv_chunk``, but return the first error instead of raising.
+
+    The rows before the invalid one are returned with it, so a caller with a
+    row limit only raises if it actually reaches that row. Parsing stops after
+    ``max_rows`` rows when it is set.
+    """
+    with open(csv_path, "rb") as handle:
+        handle.seek(start)
+        text = handle.read(end - start).decode("utf-8")
+
+    columns = [
+        fieldnames.index(name) if name in fieldnames else -1
+        for name in ("company", "aws_service", "datetime", "gross_cost")
+    ]
+    fast_path = -1 not in columns
+    width = len(fieldnames)
+    parsed_rows: list[tuple[str, str, datetime, Decimal | int]] = []
+    for values in csv.reader(io.StringIO(text, newline="")):
+        if not values:
+            continue
+        parsed = None
+        if fast_path and len(values) == width:
+            parsed = parse_fields_fast(
+                *(values[column] for column in columns), cents=cents
+            )
+        if parsed is None:
+            row: dict = dict(zip(fieldnames, values))
+            if len(values) > width:
+                row[None] = values[width:]
+            for name in fieldnames[len(values) :]:
+                row[name] = None
+            try:
+                parsed = cost_in_cents(parse_row(row)) if cents else parse_row(row)
+            except ValueError as exc:
+                return parsed_rows, exc
+        parsed_rows.append(parsed)
+        if max_rows and len(parsed_rows) >= max_rows:
+            break
+    return parsed_rows, None
+
+
+def csv_header(csv_path: Path) -> tuple[list[str], int]:
+    """Return the CSV field names and the byte offset of the first data row."""
+    with csv_path.open("rb") as handle:
+        header_line = handle.readline()
+        fieldnames = next(csv.reader([header_line.decode("utf-8")]), [])
+        return fieldnames, handle.tell()
+
+
+def csv_chunks(
+    csv_path: Path,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    start: int | None = None,
+    end: int | None = None,
+) -> tuple[list[str], list[tuple[int, int]]]:
+    """Return the header and newline-aligned byte ranges covering the data rows.
+
+    ``start`` must be a row boundary; it defaults to the first data row and
+    ``end`` defaults to the end of the file.
+    """
+    fieldnames, data_start = csv_header(csv_path)
+    with csv_path.open("rb") as handle:
+        file_size = os.fstat(handle.fileno()).st_size
+        end = file_size if end is None else min(end, file_size)
+
+        ranges: list[tuple[int, int]] = []
+        chunk_start = data_start if start is None else max(start, data_start)
+        while chunk_start < end:
+            chunk_end = min(chunk_start + chunk_bytes, end)
+            if chunk_end < end:
+                handle.seek(chunk_end)
+                handle.readline()
+                chunk_end = min(handle.tell(), end)
+            ranges.append((chunk_start, chunk_end))
+            chunk_start = chunk_end
+    return fieldnames, ranges
+
+
+def iter_rows_parallel(
+    csv_path: Path,
+    workers: int,
+    limit: int = 0,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    start: int | None = None,
+    end: int | None = None,
+    cents: bool = False,
+) -> Iterator[tuple[str, str, datetime, Decimal | int]]:
+    """Yield the same rows as ``iter_rows``, parsed by a pool of processes.
+
+    At most ``2 * workers`` chunks are in flight, so memory stays bounded even
+    when the consumer (for example COPY) is slower than parsing. With a single
+    worker the chunks are parsed in-process. A chunk's validation error is
+    raised only once every row before it has been yielded, so with ``limit``
+    invalid rows past the limit are never reported, as in ``iter_rows``.
+    """
+    fieldnames, ranges = csv_chunks(csv_path, chunk_bytes, start=start, end=end)
+    yielded = 0
+    if workers <= 1:
+        for chunk_start, chunk_end in ranges:
+            chunk_rows, error = parse_csv_chunk_until_error(
+                str(csv_path),
+                fieldnames,
+                chunk_start,
+                chunk_end,
+                cents,
+                max_rows=limit - yielded if limit else 0,
+            )
+            for row in chunk_rows:
+                yield row
+                yielded += 1
+                if limit and yielded >= limit:
+                    return
+            if error is not None:
+                raise error
+        return
+
+    pending: list[Future] = []
+    next_range = iter(ranges)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            while True:
+                while len(pending) < 2 * workers:
+                    chunk = next(next_range, None)
+                    if chunk is None:
+                        break
+                    # No chunk can contribute more than the rows still wanted.
+                    pending.append(
+                        executor.submit(
+                            parse_csv_chunk_until_error,
+                            str(csv_path),
+                            fieldnames,
+                            *chunk,
+                            cents,
+                            max_rows=limit - yielded if limit else 0,
+                        )
+                    )
+                if not pending:
+                    return
+                chunk_rows, error = pending.pop(0).result()
+                for row in chunk_rows:
+                    yield row
+                    yielded += 1
+                    if limit and yielded >= limit:
+                        return
+                if error is not None:
+                    raise error
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def source_rows(
+    csv_path: Path, args: argparse.Namespace, cents: bool = False
+) -> Iterator[tuple[str, str, datetime, Decimal | int]]:
+    if args.workers > 1 or cents:
+        return iter_rows_parallel(
+            csv_path, args.workers, limit=args.limit, cents=cents
+        )
+    return iter_rows(csv_path, limit=args.limit)
+
+
+def billing_events_partitioned(conn: psycopg.Connection) -> bool:
+    with conn.cursor() as cur:
+        cur.execute(PARTITIONED_SQL)
+        row = cur.fetchone()
+    return bool(row and row[0])
+
+
+def ensure_partitions(
+    conn: psycopg.Connection, rows: list[tuple[str, str, datetime, Decimal]]
+) -> None:
+    """Create the monthly billing_events partitions ``rows`` will land in."""
+    if not rows or not billing_events_partitioned(conn):
+        return
+    event_times = [row[2] for row in rows]
+    with conn.cursor() as cur:
+        cur.execute(ENSURE_PARTITIONS_SQL, (min(event_times), max(event_times)))
+
+
 def insert_rows(
-    conn: psycopg.Connection, rows: Iterable[tuple[str, str, datetime, Decimal]]
+    conn: psycopg.Connection,
+    rows: Iterable[tuple[str, str, datetime, Decimal | int]],
+    money: MoneyStorage = NUMERIC_MONEY,
 ) -> int:
-    sql = """
-        INSERT INTO billing_events (company, aws_service, event_time, gross_cost)
+    sql = money_sql(
+        """
+        INSERT INTO billing_events (company, aws_service, event_time, {cost})
         VALUES (%s, %s, %s, %s)
-    """
+        ON CONFLICT (company, aws_service, event_time)
+        DO UPDATE SET {cost} = EXCLUDED.{cost}
+        """,
+        money,
+    )
     row_list = list(rows)
     if not row_list:
         return 0
 
+    ensure_partitions(conn, row_list)
     with conn.cursor() as cur:
         cur.executemany(sql, row_list)
     return len(row_list)
 
 
-def main() -> None:
-    load_dotenv(PROJECT_ROOT / "backend" / ".env")
-    args = parse_args()
-    csv_path = Path(args.csv_path).resolve()
+def copy_rows(
+    conn: psycopg.Connection,
+    rows: Iterable[tuple[str, str, datetime, Decimal]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    report: Callable[[str], None] = print,
+    copy_sql: str = COPY_SQL,
+    merge_sql: str | None = None,
+    money: MoneyStorage = NUMERIC_MONEY,
+) -> int:
+    """Stream ``rows`` into billing_events with binary COPY.
 
-    if not csv_path.exists():
-        raise FileNotFoundError(f"CSV path does not exist: {csv_path}")
+    Rows are consumed lazily and committed every ``batch_size`` rows, so only
+    one row is held in memory at a time. Progress and throughput are reported
+    after each batch. When ``merge_sql`` is given it runs after each batch's
+    COPY, inside the same transaction. Both statements are rendered for
+    ``money``.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+
+    copy_sql = money_sql(copy_sql, money)
+    merge_sql = money_sql(merge_sql, money) if merge_sql else None
+    row_iter = iter(rows)
+    copied = 0
+    started = time.perf_counter()
+    while True:
+        batch_count = 0
+        with conn.cursor() as cur:
+            with cur.copy(copy_sql) as copy:
+                copy.set_types(["text", "text", "timestamptz", money.copy_type])
+                for row in row_iter:
+                    copy.write_row(row)
+                    batch_count += 1
+                    if batch_count >= batch_size:
+                        break
+            if merge_sql and batch_count:
+                cur.execute(merge_sql)
+        conn.commit()
+        if not batch_count:
+            break
+
+        copied += batch_count
+        elapsed = time.perf_counter() - started
+        rate = copied / elapsed if elapsed > 0 else 0.0
+        report(f"Copied {copied} row(s) in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+        if batch_count < batch_size:
+            break
+    return copied
+
+
+def upsert_rows(
+    conn: psycopg.Connection,
+    rows: Iterable[tuple[str, str, datetime, Decimal]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    report: Callable[[str], None] = print,
+    money: MoneyStorage = NUMERIC_MONEY,
+) -> int:
+    """COPY ``rows`` through a staging table and upsert them on the natural key.
+
+    Re-ingesting rows that are already loaded is a no-op, and a changed
+    ``gross_cost`` for an existing (company, aws_service, event_time) wins.
+    On a partitioned billing_events, each batch first creates the monthly
+    partitions its staged rows need.
+    """
+    merge_sql = MERGE_STAGING_SQL
+    if billing_events_partitioned(conn):
+        merge_sql = ENSURE_STAGING_PARTITIONS_SQL + MERGE_STAGING_SQL
+    with conn.cursor() as cur:
+        cur.execute(money_sql(STAGING_TABLE_SQL, money))
+    return copy_rows(
+        conn,
+        rows,
+        batch_size=batch_size,
+        report=report,
+        copy_sql=STAGING_COPY_SQL,
+        merge_sql=merge_sql,
+        money=money,
+    )
+
+
+def bump_data_version(conn: psycopg.Connection) -> int:
+    """Advance billing_data_version so API result caches drop stale entries."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO billing_data_version (singleton, version, updated_at)
+            VALUES (TRUE, 1, now())
+            ON CONFLICT (singleton) DO UPDATE SET
+                version = billing_data_version.version + 1,
+                updated_at = now()
+            RETURNING version
+            """
+        )
+        row = cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+def billing_change_payload(
+    version: int, scopes: list[tuple[str, str, datetime, datetime]] | None
+) -> str:
+    """Describe a load for API listeners: its data version and touched windows.
+
+    ``None`` scopes tell listeners that anything may have changed. When one
+    scope per series does not fit in a notification, a single scope spanning
+    every series over the loaded time range is sent instead.
+    """
+
+    def encode(payload_scopes: list[list[str | None]] | None) -> str:
+        return json.dumps(
+            {"version": version, "scopes": payload_scopes}, separators=(",", ":")
+        )
+
+    if scopes is None:
+        return encode(None)
+    payload = encode(
+        [
+            [company, service, start.isoformat(), end.isoformat()]
+            for company, service, start, end in scopes
+        ]
+    )
+    if len(payload.encode("utf-8")) <= NOTIFY_PAYLOAD_LIMIT:
+        return payload
+    first = min(scope[2] for scope in scopes)
+    last = max(scope[3] for scope in scopes)
+    return encode([[None, None, first.isoformat(), last.isoformat()]])
+
+
+def notify_billing_change(
+    conn: psycopg.Connection,
+    version: int,
+    scopes: list[tuple[str, str, datetime, datetime]] | None,
+) -> None:
+    """Queue a notification that is delivered only if the load commits."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT pg_notify(%s, %s)",
+            (BILLING_CHANGES_CHANNEL, billing_change_payload(version, scopes)),
+        )
+
+
+def truncate_billing_tables(conn: psycopg.Connection) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            "TRUNCATE TABLE billing_events, billing_rollups, ingest_watermarks;"
+        )
+    notify_billing_change(conn, bump_data_version(conn), None)
+    conn.commit()
+    print("Truncated billing_events, billing_rollups and ingest_watermarks.")
+
+
+def complete_rows_end(csv_path: Path) -> int:
+    """Return the offset just past the last newline in ``csv_path``.
+
+    A trailing row without a newline may still be being written, so it is
+    left for the next incremental run.
+    """
+    block_size = 64 * 1024
+    with csv_path.open("rb") as handle:
+        position = os.fstat(handle.fileno()).st_size
+        while position > 0:
+            read_from = max(position - block_size, 0)
+            handle.seek(read_from)
+            block = handle.read(position - read_from)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                return read_from + newline + 1
+            position = read_from
+    return 0
+
+
+def prefix_digest(csv_path: Path, length: int) -> str:
+    with csv_path.open("rb") as handle:
+        return hashlib.sha256(handle.read(length)).hexdigest()
+
+
+def fetch_watermark(
+    conn: psycopg.Connection, source: str
+) -> tuple[int, int, str] | None:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT byte_offset, prefix_bytes, prefix_sha256
+            FROM ingest_watermarks
+            WHERE source = %s
+            """,
+            (source,),
+        )
+        return cur.fetchone()
+
+
+def resume_offset(
+    csv_path: Path, watermark: tuple[int, int, str] | None
+) -> int | None:
+    """Return where to resume reading, or ``None`` if the file was replaced.
 
-    rows = read_rows(csv_path, limit=args.limit)
-    print(f"Parsed {len(rows)} row(s) from {csv_path}")
+    The file is treated as the same source only when it is at least as long as
+    the recorded offset and its leading bytes hash to the recorded digest.
+    """
+    if watermark is None:
+        return None
+    byte_offset, prefix_bytes, digest = watermark
+    if csv_path.stat().st_size < byte_offset:
+        return None
+    if prefix_digest(csv_path, prefix_bytes) != digest:
+        return None
+    return byte_offset
+
+
+def save_watermark(
+    conn: psycopg.Connection,
+    source: str,
+    csv_path: Path,
+    byte_offset: int,
+    max_event_time: datetime | None,
+    row_count: int,
+) -> None:
+    prefix_bytes = min(byte_offset, WATERMARK_PREFIX_BYTES)
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO ingest_watermarks (
+                source, byte_offset, prefix_bytes, prefix_sha256,
+                max_event_time, rows_ingested, updated_at
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, now())
+            ON CONFLICT (source) DO UPDATE SET
+                byte_offset = EXCLUDED.byte_offset,
+                prefix_bytes = EXCLUDED.prefix_bytes,
+                prefix_sha256 = EXCLUDED.prefix_sha256,
+                max_event_time = GREATEST(
+                    ingest_watermarks.max_event_time, EXCLUDED.max_event_time
+                ),
+                rows_ingested = ingest_watermarks.rows_ingested
+                    + EXCLUDED.rows_ingested,
+                updated_at = now()
+            """,
+            (
+                source,
+                byte_offset,
+                prefix_bytes,
+                prefix_digest(csv_path, prefix_bytes),
+                max_event_time,
+                row_count,
+            ),
+        )
+
+
+class RollupScopes:
+    """Track the whole UTC days touched per (company, service) while streaming."""
+
+    def __init__(self) -> None:
+        self._bounds: dict[tuple[str, str], tuple[datetime, datetime]] = {}
+
+    def add(self, company: str, aws_service: str, event_time: datetime) -> None:
+        key = (company, aws_service)
+        current = self._bounds.get(key)
+        if current is None:
+            self._bounds[key] = (event_time, event_time)
+        elif event_time < current[0]:
+            self._bounds[key] = (event_time, current[1])
+        elif event_time > current[1]:
+            self._bounds[key] = (current[0], event_time)
+
+    def track(
+        self, rows: Iterable[tuple[str, str, datetime, Decimal]]
+    ) -> Iterator[tuple[str, str, datetime, Decimal]]:
+        for row in rows:
+            self.add(row[0], row[1], row[2])
+            yield row
+
+    def max_event_time(self) -> datetime | None:
+        return max((last for _, last in self._bounds.values()), default=None)
+
+    def scopes(self) -> list[tuple[str, str, datetime, datetime]]:
+        scopes = []
+        for (company, aws_service), (first, last) in self._bounds.items():
+            day_start = first.replace(hour=0, minute=0, second=0, microsecond=0)
+            day_end = last.replace(hour=0, minute=0, second=0, microsecond=0)
+            scopes.append(
+                (company, aws_service, day_start, day_end + timedelta(days=1))
+            )
+        return scopes
+
+
+def rollup_scopes(
+    rows: Iterable[tuple[str, str, datetime, Decimal]],
+) -> list[tuple[str, str, datetime, datetime]]:
+    """Return the whole UTC days touched by ``rows`` per (company, service)."""
+    tracker = RollupScopes()
+    for company, aws_service, event_time, _ in rows:
+        tracker.add(company, aws_service, event_time)
+    return tracker.scopes()
+
+
+def refresh_rollups(
+    conn: psycopg.Connection,
+    scopes: list[tuple[str, str, datetime, datetime]],
+    money: MoneyStorage = NUMERIC_MONEY,
+) -> None:
+    """Recompute hourly and daily billing_rollups buckets inside ``scopes``."""
+    if not scopes:
+        return
+
+    scope_params = (
+        [scope[0] for scope in scopes],
+        [scope[1] for scope in scopes],
+        [scope[2] for scope in scopes],
+        [scope[3] for scope in scopes],
+    )
+    delete_sql = """
+        DELETE FROM billing_rollups
+        USING unnest(%s::text[], %s::text[], %s::timestamptz[], %s::timestamptz[])
+            AS scopes (company, aws_service, range_start, range_end)
+        WHERE billing_rollups.company = scopes.company
+          AND billing_rollups.aws_service = scopes.aws_service
+          AND billing_rollups.bucket >= scopes.range_start
+          AND billing_rollups.bucket < scopes.range_end
+    """
+    insert_sql = money_sql(
+        """
+        INSERT INTO billing_rollups (company, aws_service, granularity, bucket, {cost})
+        SELECT
+            billing_events.company,
+            billing_events.aws_service,
+            granularities.granularity,
+            date_trunc(granularities.granularity, billing_events.event_time, 'UTC'),
+            SUM(billing_events.{cost})
+        FROM unnest(%s::text[], %s::text[], %s::timestamptz[], %s::timestamptz[])
+            AS scopes (company, aws_service, range_start, range_end)
+        JOIN billing_events
+          ON billing_events.company = scopes.company
+         AND billing_events.aws_service = scopes.aws_service
+         AND billing_events.event_time >= scopes.range_start
+         AND billing_events.event_time < scopes.range_end
+        CROSS JOIN (VALUES ('hour'), ('day')) AS granularities (granularity)
+        GROUP BY 1, 2, 3, 4
+        """,
+        money,
+    )
+    with conn.cursor() as cur:
+        cur.execute(delete_sql, scope_params)
+        cur.execute(insert_sql, scope_params)
+
+
+def rebuild_rollups(
+    conn: psycopg.Connection, money: MoneyStorage = NUMERIC_MONEY
+) -> None:
+    """Replace every billing_rollups bucket with sums over all billing_events.
+
+    Loads only refresh the days they touch, so events loaded before the
+    rollup table existed are missing from it until this runs.
+    """
+    insert_sql = money_sql(
+        """
+        INSERT INTO billing_rollups (company, aws_service, granularity, bucket, {cost})
+        SELECT
+            billing_events.company,
+            billing_events.aws_service,
+            granularities.granularity,
+            date_trunc(granularities.granularity, billing_events.event_time, 'UTC'),
+            SUM(billing_events.{cost})
+        FROM billing_events
+        CROSS JOIN (VALUES ('hour'), ('day')) AS granularities (granularity)
+        GROUP BY 1, 2, 3, 4
+        """,
+        money,
+    )
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE TABLE billing_rollups")
+        cur.execute(insert_sql)
+
+
+def rollup_rebuild(db_url: str) -> None:
+    if not db_url:
+        raise RuntimeError("DATABASE_URL is not set.")
+    if db_url.startswith(SQLITE_URL_PREFIX):
+        raise RuntimeError("SQLite databases have no billing_rollups to rebuild.")
+
+    started = time.perf_counter()
+    with psycopg.connect(db_url) as conn:
+        rebuild_rollups(conn, money_storage(conn))
+        # Rollup-backed results cached before the rebuild may be stale.
+        data_version = bump_data_version(conn)
+        notify_billing_change(conn, data_version, None)
+        conn.commit()
+
+    print(f"Rebuilt billing_rollups in {time.perf_counter() - started:.1f}s.")
+    print(f"Billing data version is now {data_version}.")
+
+
+def bulk_load(csv_path: Path, args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    rows = list(source_rows(csv_path, args))
+    elapsed = time.perf_counter() - started
+    rate = len(rows) / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Parsed {len(rows)} row(s) from {csv_path} "
+        f"in {elapsed:.1f}s ({rate:,.0f} rows/s)"
+    )
 
     if args.dry_run:
         print("Dry run enabled. Skipping database writes.")
@@ -111,15 +947,406 @@ def main() -> None:
         raise RuntimeError("DATABASE_URL is not set.")
 
     with psycopg.connect(db_url) as conn:
-        with conn.cursor() as cur:
-            if args.truncate:
-                cur.execute("TRUNCATE TABLE billing_events;")
-                print("Truncated billing_events.")
+        if args.truncate:
+            truncate_billing_tables(conn)
 
-        inserted_count = insert_rows(conn, rows)
+        money = money_storage(conn)
+        if money.cents:
+            rows = [cost_in_cents(row) for row in rows]
+        inserted_count = insert_rows(conn, rows, money)
+        scopes = rollup_scopes(rows)
+        refresh_rollups(conn, scopes, money)
+        data_version = bump_data_version(conn)
+        notify_billing_change(conn, data_version, scopes)
         conn.commit()
 
     print(f"Inserted {inserted_count} row(s) into billing_events.")
+    print(f"Refreshed billing_rollups for {len(scopes)} company/service series.")
+    print(f"Billing data version is now {data_version}.")
+
+
+def stream_load(csv_path: Path, args: argparse.Namespace) -> None:
+    if args.dry_run:
+        started = time.perf_counter()
+        parsed_count = sum(1 for _ in source_rows(csv_path, args))
+        elapsed = time.perf_counter() - started
+        rate = parsed_count / elapsed if elapsed > 0 else 0.0
+        print(
+            f"Parsed {parsed_count} row(s) from {csv_path} "
+            f"in {elapsed:.1f}s ({rate:,.0f} rows/s)"
+        )
+        print("Dry run enabled. Skipping database writes.")
+        return
+
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("DATABASE_URL is not set.")
+
+    tracker = RollupScopes()
+    with psycopg.connect(db_url) as conn:
+        if args.truncate:
+            truncate_billing_tables(conn)
+
+        money = money_storage(conn)
+        rows = source_rows(csv_path, args, cents=money.cents)
+        # Batches commit as they go, so a plain COPY into billing_events would
+        # stop at the first row already loaded with earlier batches committed.
+        # The staging merge upserts instead, and creates partitions as needed.
+        copied_count = upsert_rows(
+            conn, tracker.track(rows), batch_size=args.batch_size, money=money
+        )
+        scopes = tracker.scopes()
+        refresh_rollups(conn, scopes, money)
+        data_version = bump_data_version(conn)
+        notify_billing_change(conn, data_version, scopes)
+        conn.commit()
+
+    print(f"Copied {copied_count} row(s) into billing_events.")
+    print(f"Refreshed billing_rollups for {len(scopes)} company/service series.")
+    print(f"Billing data version is now {data_version}.")
+
+
+def incremental_load(csv_path: Path, args: argparse.Namespace) -> None:
+    if args.dry_run:
+        parsed_count = sum(1 for _ in source_rows(csv_path, args))
+        print(f"Parsed {parsed_count} row(s) from {csv_path}")
+        print("Dry run enabled. Skipping database writes and watermark lookup.")
+        return
+
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("DATABASE_URL is not set.")
+
+    source = str(csv_path)
+    end_offset = complete_rows_end(csv_path)
+    tracker = RollupScopes()
+    with psycopg.connect(db_url) as conn:
+        if args.truncate:
+            truncate_billing_tables(conn)
+
+        start_offset = resume_offset(csv_path, fetch_watermark(conn, source))
+        if start_offset is None:
+            print(f"No usable watermark for {source}; reading from the first row.")
+        else:
+            print(f"Resuming {source} at byte {start_offset} of {end_offset}.")
+
+        money = money_storage(conn)
+        rows = iter_rows_parallel(
+            csv_path,
+            args.workers,
+            start=start_offset,
+            end=end_offset,
+            cents=money.cents,
+        )
+        upserted_count = upsert_rows(
+            conn, tracker.track(rows), batch_size=args.batch_size, money=money
+        )
+        scopes = tracker.scopes()
+        refresh_rollups(conn, scopes, money)
+        data_version = bump_data_version(conn)
+        notify_billing_change(conn, data_version, scopes)
+        save_watermark(
+            conn,
+            source,
+            csv_path,
+            end_offset,
+            tracker.max_event_time(),
+            upserted_count,
+        )
+        conn.commit()
+
+    print(f"Upserted {upserted_count} row(s) into billing_events.")
+    print(f"Refreshed billing_rollups for {len(scopes)} company/service series.")
+    print(f"Billing data version is now {data_version}.")
+
+
+SQLITE_UPSERT_SQL = """
+    INSERT INTO billing_events (company, aws_service, event_time, gross_cost_cents)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (company, aws_service, event_time)
+    DO UPDATE SET gross_cost_cents = excluded.gross_cost_cents
+"""
+SQLITE_BUMP_VERSION_SQL = """
+    UPDATE billing_data_version
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def sqlite_rows(
+    rows: Iterable[tuple[str, str, datetime, int]],
+) -> Iterator[tuple[str, str, int, int]]:
+    """Integer-cent rows with event times as Unix seconds, as SQLite stores them."""
+    for company, service, event_time, cents in rows:
+        yield company, service, int(event_time.timestamp()), cents
+
+
+def upsert_sqlite_rows(
+    conn: sqlite3.Connection,
+    rows: Iterable[tuple[str, str, datetime, int]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    report: Callable[[int, float], None] | None = None,
+) -> int:
+    """Upsert rows in ``batch_size`` transactions; return the row count."""
+    started = time.perf_counter()
+    total = 0
+    batch: list[tuple[str, str, int, int]] = []
+    for row in sqlite_rows(rows):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            with conn:
+                conn.executemany(SQLITE_UPSERT_SQL, batch)
+            total += len(batch)
+            batch = []
+            if report is not None:
+                report(total, time.perf_counter() - started)
+    if batch:
+        with conn:
+            conn.executemany(SQLITE_UPSERT_SQL, batch)
+        total += len(batch)
+    return total
+
+
+def sqlite_load(csv_path: Path, db_url: str, args: argparse.Namespace) -> None:
+    """Load into the embedded SQLite backend named by ``sqlite:///<path>``.
+
+    Rows are upserted on the natural key in ``--batch-size`` transactions, so
+    memory stays flat and re-running a load is safe, as with ``--stream``.
+    SQLite has no rollups or watermarks, so ``--incremental`` is Postgres-only.
+    """
+    if args.incremental:
+        raise RuntimeError("--incremental requires a PostgreSQL DATABASE_URL.")
+
+    db_path = Path(db_url[len(SQLITE_URL_PREFIX) :])
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SQLITE_SCHEMA_PATH.read_text(encoding="utf-8"))
+        if args.truncate:
+            with conn:
+                conn.execute("DELETE FROM billing_events")
+            print("Truncated billing_events.")
+
+        rows = source_rows(csv_path, args, cents=True)
+        upserted_count = upsert_sqlite_rows(
+            conn,
+            rows,
+            batch_size=args.batch_size,
+            report=lambda total, elapsed: print(
+                f"Upserted {total} row(s) in {elapsed:.1f}s"
+            ),
+        )
+        with conn:
+            conn.execute(SQLITE_BUMP_VERSION_SQL)
+            data_version = conn.execute(
+                "SELECT version FROM billing_data_version"
+            ).fetchone()[0]
+    finally:
+        conn.close()
+
+    print(f"Upserted {upserted_count} row(s) into {db_path}.")
+    print(f"Billing data version is now {data_version}.")
+
+
+# Binary snapshot read by ``backend/app/snapshot.py``, which owns the layout
+# and the header constants imported above.
+SNAPSHOT_EXPORT_SQL = """
+    SELECT company, aws_service, EXTRACT(EPOCH FROM event_time)::bigint, {cents}
+    FROM billing_events
+    ORDER BY company, aws_service, event_time
+"""
+SQLITE_SNAPSHOT_EXPORT_SQL = """
+    SELECT company, aws_service, event_time, gross_cost_cents
+    FROM billing_events
+    ORDER BY company, aws_service, event_time
+"""
+
+
+def int64_bytes(values: Iterable[int]) -> bytes:
+    column = array("q", values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def write_int64(handle: io.BufferedWriter, column: array) -> None:
+    """Write an ``array('q')`` column little-endian, copying only if big-endian."""
+    if sys.byteorder != "little":
+        column = array("q", column)
+        column.byteswap()
+    handle.write(column)
+
+
+def sort_series(timestamps: array, costs: array) -> tuple[array, array]:
+    """Order one series by time; already ordered series are returned as-is."""
+    if all(earlier <= later for earlier, later in pairwise(timestamps)):
+        return timestamps, costs
+    order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+    return (
+        array("q", (timestamps[i] for i in order)),
+        array("q", (costs[i] for i in order)),
+    )
+
+
+def write_snapshot(
+    path: Path, rows: Iterable[tuple[str, str, int, int]], data_version: int = 0
+) -> tuple[int, int]:
+    """Write ``(company, aws_service, epoch_seconds, cents)`` rows as a snapshot.
+
+    Rows may arrive in any order; each series is sorted by time (unless it
+    already is, as database exports are) and gets its prefix sums here, so
+    readers only map the file. Series stay in ``array('q')`` columns that are
+    written out directly. The file is written next to ``path`` and renamed
+    into place, so processes that already mapped the previous snapshot keep
+    reading it intact. Returns (series, rows) counts.
+    """
+    columns: dict[tuple[str, str], tuple[array, array]] = {}
+    for company, aws_service, timestamp, cents in rows:
+        timestamps, costs = columns.setdefault(
+            (company, aws_service), (array("q"), array("q"))
+        )
+        timestamps.append(timestamp)
+        costs.append(cents)
+
+    keys = sorted(columns)
+    companies = sorted({company for company, _ in keys})
+    services = sorted({service for _, service in keys})
+    company_codes = {name: code for code, name in enumerate(companies)}
+    service_codes = {name: code for code, name in enumerate(services)}
+
+    offsets = [0]
+    for key in keys:
+        columns[key] = sort_series(*columns[key])
+        offsets.append(offsets[-1] + len(columns[key][0]))
+
+    dictionary = json.dumps([companies, services], separators=(",", ":")).encode()
+    padding = b"\0" * (-len(dictionary) % 8)
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_FORMAT_VERSION,
+        SNAPSHOT_HEADER.size,
+        data_version,
+        len(companies),
+        len(services),
+        len(keys),
+        offsets[-1],
+        len(dictionary),
+        0,
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.partial")
+    with partial.open("wb") as handle:
+        handle.write(header + dictionary + padding)
+        handle.write(
+            int64_bytes(
+                code
+                for company, service in keys
+                for code in (company_codes[company], service_codes[service])
+            )
+        )
+        handle.write(int64_bytes(offsets))
+        for key in keys:
+            write_int64(handle, columns[key][0])
+        for key in keys:
+            write_int64(handle, columns[key][1])
+        for key in keys:
+            write_int64(handle, array("q", accumulate(columns[key][1], initial=0)))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(partial, path)
+    return len(keys), offsets[-1]
+
+
+def csv_snapshot(csv_path: Path, snapshot_path: Path, args: argparse.Namespace) -> None:
+    """Write a snapshot straight from the CSV, without touching a database."""
+    started = time.perf_counter()
+    rows = (
+        (company, service, int(event_time.timestamp()), cents)
+        for company, service, event_time, cents in source_rows(
+            csv_path, args, cents=True
+        )
+    )
+    series_count, row_count = write_snapshot(snapshot_path, rows)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Wrote {row_count} row(s) in {series_count} series from {csv_path} "
+        f"to snapshot {snapshot_path} in {elapsed:.1f}s."
+    )
+    print("Dry run enabled. Skipping database writes.")
+
+
+def database_snapshot(db_url: str, snapshot_path: Path) -> None:
+    """Export all of ``billing_events``, not just this load, to a snapshot.
+
+    The data version is read before the export, so a concurrent load can only
+    make the snapshot's version older than its data, never newer.
+    """
+    if db_url.startswith(SQLITE_URL_PREFIX):
+        conn = sqlite3.connect(db_url[len(SQLITE_URL_PREFIX) :])
+        try:
+            with conn:
+                data_version = conn.execute(
+                    "SELECT version FROM billing_data_version"
+                ).fetchone()[0]
+                counts = write_snapshot(
+                    snapshot_path,
+                    conn.execute(SQLITE_SNAPSHOT_EXPORT_SQL),
+                    data_version=data_version,
+                )
+        finally:
+            conn.close()
+    else:
+        with psycopg.connect(db_url) as conn:
+            money = money_storage(conn)
+            cents = (
+                money.column if money.cents else f"({money.column} * 100)::bigint"
+            )
+            with conn.cursor() as cur:
+                cur.execute("SELECT version FROM billing_data_version")
+                row = cur.fetchone()
+            data_version = int(row[0]) if row else 0
+            with conn.cursor(name="billing_snapshot_export") as cur:
+                cur.itersize = DEFAULT_BATCH_SIZE
+                cur.execute(SNAPSHOT_EXPORT_SQL.format(cents=cents))
+                counts = write_snapshot(snapshot_path, cur, data_version=data_version)
+
+    series_count, row_count = counts
+    print(
+        f"Wrote {row_count} row(s) in {series_count} series to snapshot "
+        f"{snapshot_path} at billing data version {data_version}."
+    )
+
+
+def main() -> None:
+    load_dotenv(PROJECT_ROOT / "backend" / ".env")
+    args = parse_args()
+    if args.rebuild_rollups:
+        rollup_rebuild(os.getenv("DATABASE_URL", ""))
+        return
+
+    csv_path = Path(args.csv_path).resolve()
+
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CSV path does not exist: {csv_path}")
+
+    snapshot_path = Path(args.snapshot).resolve() if args.snapshot else None
+    if args.dry_run and snapshot_path is not None:
+        csv_snapshot(csv_path, snapshot_path, args)
+        return
+
+    db_url = os.getenv("DATABASE_URL", "")
+    if db_url.startswith(SQLITE_URL_PREFIX) and not args.dry_run:
+        sqlite_load(csv_path, db_url, args)
+    elif args.incremental:
+        incremental_load(csv_path, args)
+    elif args.stream:
+        stream_load(csv_path, args)
+    else:
+        bulk_load(csv_path, args)
+
+    if snapshot_path is not None and not args.dry_run:
+        database_snapshot(db_url, snapshot_path)
 
 
 if __name__ == "__main__":
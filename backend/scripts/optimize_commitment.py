@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = PROJECT_ROOT / "backend"
+
+sys.path.insert(0, str(BACKEND_ROOT))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Sweep committed amounts and checkin cadences for one company and "
+            "service against historical spend."
+        )
+    )
+    parser.add_argument("--company", required=True)
+    parser.add_argument("--service", required=True)
+    parser.add_argument(
+        "--start", required=True, help="History start, YYYY-MM-DD (UTC)."
+    )
+    parser.add_argument(
+        "--end", default="", help="History end, YYYY-MM-DD (UTC). Defaults to now."
+    )
+    parser.add_argument(
+        "--cadence",
+        default="",
+        help="Comma-separated cadences (week, month, quarter, half_year, year).",
+    )
+    parser.add_argument(
+        "--target",
+        default="0.9",
+        help="Share of periods the recommended amount must meet (default 0.9).",
+    )
+    parser.add_argument(
+        "--candidates",
+        default="1000",
+        help="Committed amounts swept per cadence (default 1000).",
+    )
+    parser.add_argument(
+        "--annual-amount",
+        default="",
+        help="Price this yearly contract size at every cadence.",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the full result, including curves, as JSON.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    load_dotenv(BACKEND_ROOT / ".env")
+    args = parse_args()
+
+    from app.columnar import LazySpendEngine
+    from app.config import Settings
+    from app.optimizer import optimize_commitment, parse_optimizer_query
+
+    settings = Settings()
+    try:
+        query = parse_optimizer_query(
+            {
+                "start": args.start,
+                "end": args.end,
+                "cadence": args.cadence,
+                "target": args.target,
+                "candidates": args.candidates,
+                "annual_amount": args.annual_amount,
+            },
+            datetime.now(timezone.utc),
+        )
+    except ValueError as exc:
+        raise SystemExit(f"error: {exc}") from None
+
+    engine = (
+        LazySpendEngine(settings).get() if settings.spend_engine == "columnar" else None
+    )
+    started = time.perf_counter()
+    result = optimize_commitment(
+        args.company,
+        args.service,
+        query,
+        settings.database_url,
+        engine=engine,
+        use_rollups=settings.spend_rollups,
+        cents=settings.money_storage == "cents",
+    )
+    elapsed = time.perf_counter() - started
+    if result is None:
+        raise SystemExit(f"error: no billing data for {args.company}/{args.service}")
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(
+        f"{result['company']}/{result['service']} from {result['start']} "
+        f"to {result['end']}, target met ratio {result['target_met_ratio']}"
+    )
+    print(f"{'cadence':<10} {'periods':>7} {'amount':>12} {'per year':>14} {'met':>6}")
+    for item in result["cadences"]:
+        recommended = item["recommended"]
+        if recommended is None:
+            print(f"{item['cadence']:<10} {0:>7} {'-':>12} {'-':>14} {'-':>6}")
+            continue
+        print(
+            f"{item['cadence']:<10} {item['periods']:>7} "
+            f"{recommended['amount']:>12,.2f} "
+            f"{recommended['annual_commitment']:>14,.2f} "
+            f"{recommended['met_ratio']:>6.1%}"
+        )
+    if result["best_cadence"]:
+        print(
+            f"Least expected shortfall for {result['annual_amount']:,.2f} a year: "
+            f"{result['best_cadence']}"
+        )
+    print(f"Computed in {elapsed * 1000:.0f} ms.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+-- Optional integer-cent money storage, applied by `init_db.py --cents` after
+-- schema.sql. Replaces the NUMERIC gross_cost columns of billing_events and
+-- billing_rollups with BIGINT gross_cost_cents, converting existing rows in
+-- place. Re-running it is a no-op. Serve the API with MONEY_STORAGE=cents.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'billing_events'
+          AND column_name = 'gross_cost'
+    ) THEN
+        ALTER TABLE billing_events ADD COLUMN gross_cost_cents BIGINT;
+        UPDATE billing_events SET gross_cost_cents = (gross_cost * 100)::BIGINT;
+        -- Dropping gross_cost also drops the covering index that includes it.
+        ALTER TABLE billing_events
+            DROP COLUMN gross_cost,
+            ALTER COLUMN gross_cost_cents SET NOT NULL,
+            ADD CONSTRAINT billing_events_gross_cost_cents_check
+                CHECK (gross_cost_cents >= 0);
+        CREATE UNIQUE INDEX uq_billing_events_company_service_time_covering
+            ON billing_events (company, aws_service, event_time)
+            INCLUDE (gross_cost_cents);
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'billing_rollups'
+          AND column_name = 'gross_cost'
+    ) THEN
+        ALTER TABLE billing_rollups ADD COLUMN gross_cost_cents BIGINT;
+        UPDATE billing_rollups SET gross_cost_cents = (gross_cost * 100)::BIGINT;
+        ALTER TABLE billing_rollups
+            DROP COLUMN gross_cost,
+            ALTER COLUMN gross_cost_cents SET NOT NULL;
+    END IF;
+END;
+$$;
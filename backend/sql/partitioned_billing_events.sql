@@ -0,0 +1,13 @@
+-- Optional layout applied by `init_db.py --partitioned` before schema.sql.
+-- billing_events is range-partitioned by month on event_time, so spend range
+-- queries only scan the partitions their windows touch. Partitioned tables need
+-- the partition key in every unique constraint, hence the composite key.
+-- Monthly partitions are created by ensure_billing_event_partitions().
+CREATE TABLE IF NOT EXISTS billing_events (
+    id BIGSERIAL,
+    company TEXT NOT NULL,
+    aws_service TEXT NOT NULL,
+    event_time TIMESTAMPTZ NOT NULL,
+    gross_cost NUMERIC(12,2) NOT NULL CHECK (gross_cost >= 0),
+    PRIMARY KEY (id, event_time)
+) PARTITION BY RANGE (event_time);
@@ -6,5 +6,129 @@ CREATE TABLE IF NOT EXISTS billing_events (
     gross_cost NUMERIC(12,2) NOT NULL CHECK (gross_cost >= 0)
 );
 
-CREATE INDEX IF NOT EXISTS idx_billing_events_company_service_time
-    ON billing_events (company, aws_service, event_time);
+-- Natural key: one billing event per company, service and hour. Incremental
+-- loads upsert on it. INCLUDE (gross_cost) lets spend range sums run as
+-- index-only scans once the visibility map is current (VACUUM/autovacuum).
+-- cents_storage.sql rebuilds it on gross_cost_cents, so only create it here
+-- when it is missing.
+DO $$
+BEGIN
+    IF to_regclass('uq_billing_events_company_service_time_covering') IS NULL THEN
+        CREATE UNIQUE INDEX uq_billing_events_company_service_time_covering
+            ON billing_events (company, aws_service, event_time)
+            INCLUDE (gross_cost);
+    END IF;
+END;
+$$;
+
+DROP INDEX IF EXISTS idx_billing_events_company_service_time;
+DROP INDEX IF EXISTS uq_billing_events_company_service_time;
+
+-- Events arrive roughly in time order, so a BRIN index stays tiny and serves
+-- time-range scans across all companies.
+CREATE INDEX IF NOT EXISTS idx_billing_events_event_time_brin
+    ON billing_events USING brin (event_time) WITH (autosummarize = on);
+
+-- Creates the monthly partitions covering [range_start, range_end] when
+-- billing_events is range-partitioned (init_db.py --partitioned); a no-op for
+-- the plain table. Returns the number of partitions created.
+CREATE OR REPLACE FUNCTION ensure_billing_event_partitions(
+    range_start TIMESTAMPTZ,
+    range_end TIMESTAMPTZ
+) RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start TIMESTAMP;
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    IF range_start IS NULL OR range_end IS NULL OR NOT EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'billing_events'::regclass
+    ) THEN
+        RETURN 0;
+    END IF;
+
+    month_start := date_trunc('month', range_start AT TIME ZONE 'UTC');
+    WHILE month_start <= range_end AT TIME ZONE 'UTC' LOOP
+        partition_name := 'billing_events_' || to_char(month_start, 'YYYYMM');
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF billing_events '
+                'FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                month_start AT TIME ZONE 'UTC',
+                (month_start + INTERVAL '1 month') AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        month_start := month_start + INTERVAL '1 month';
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+CREATE TABLE IF NOT EXISTS billing_rollups (
+    company TEXT NOT NULL,
+    aws_service TEXT NOT NULL,
+    granularity TEXT NOT NULL CHECK (granularity IN ('hour', 'day')),
+    bucket TIMESTAMPTZ NOT NULL,
+    gross_cost NUMERIC(16,2) NOT NULL,
+    PRIMARY KEY (company, aws_service, granularity, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS ingest_watermarks (
+    source TEXT PRIMARY KEY,
+    byte_offset BIGINT NOT NULL,
+    prefix_bytes BIGINT NOT NULL,
+    prefix_sha256 TEXT NOT NULL,
+    max_event_time TIMESTAMPTZ,
+    rows_ingested BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Bumped by every loader run so API caches can tell when billing data changed.
+CREATE TABLE IF NOT EXISTS billing_data_version (
+    singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO billing_data_version (singleton, version)
+VALUES (TRUE, 0)
+ON CONFLICT (singleton) DO NOTHING;
+
+-- Commitment catalog imported from spend_commitments.json by
+-- import_commitments.py; the API reads it with COMMITMENTS_SOURCE=database.
+-- Lookups by company, and by (company, id), are primary-key range scans.
+CREATE TABLE IF NOT EXISTS commitments (
+    company TEXT NOT NULL,
+    id BIGINT NOT NULL,
+    name TEXT NOT NULL,
+    aws_service TEXT NOT NULL,
+    PRIMARY KEY (company, id)
+);
+
+CREATE TABLE IF NOT EXISTS commitment_checkins (
+    company TEXT NOT NULL,
+    commitment_id BIGINT NOT NULL,
+    checkin_index INTEGER NOT NULL,
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ NOT NULL,
+    amount NUMERIC(16,2) NOT NULL CHECK (amount >= 0),
+    PRIMARY KEY (company, commitment_id, checkin_index),
+    FOREIGN KEY (company, commitment_id)
+        REFERENCES commitments (company, id) ON DELETE CASCADE,
+    CHECK (end_time > start_time)
+);
+
+-- Bumped by every commitments import so API ETags can tell the catalog changed.
+CREATE TABLE IF NOT EXISTS commitments_version (
+    singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO commitments_version (singleton, version)
+VALUES (TRUE, 0)
+ON CONFLICT (singleton) DO NOTHING;
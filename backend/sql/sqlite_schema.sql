@@ -0,0 +1,24 @@
+-- Embedded SQLite equivalent of schema.sql for DATABASE_URL=sqlite:///<path>.
+-- Costs are integer cents and event times are Unix seconds (UTC), since SQLite
+-- has neither an exact decimal nor a timestamptz type.
+--
+-- WITHOUT ROWID stores rows in the primary-key B-tree itself, so a spend sum
+-- for one company/service/time range is a single contiguous range scan that
+-- also reads the cost: the counterpart of the covering unique index on
+-- (company, aws_service, event_time) INCLUDE (gross_cost) in Postgres.
+CREATE TABLE IF NOT EXISTS billing_events (
+    company TEXT NOT NULL,
+    aws_service TEXT NOT NULL,
+    event_time INTEGER NOT NULL,
+    gross_cost_cents INTEGER NOT NULL CHECK (gross_cost_cents >= 0),
+    PRIMARY KEY (company, aws_service, event_time)
+) WITHOUT ROWID;
+
+-- Bumped by every loader run so API caches can tell when billing data changed.
+CREATE TABLE IF NOT EXISTS billing_data_version (
+    singleton INTEGER PRIMARY KEY CHECK (singleton = 1),
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO billing_data_version (singleton, version) VALUES (1, 0);
@@ -0,0 +1,30 @@
+"""Helpers shared by the test modules."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+from backend.app.metrics import current_timings
+
+
+def utc(*args: int) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def epoch(*args: int) -> int:
+    return int(utc(*args).timestamp())
+
+
+def fake_evaluate(
+    commitment: dict[str, Any], db_url: str, **_kwargs: Any
+) -> dict[str, Any]:
+    """Stand-in for ``evaluate_commitment`` with a body large enough to compress.
+
+    With request timing on, it records two queries taking 4 ms in all.
+    """
+    timings = current_timings()
+    if timings is not None:
+        timings.db_queries += 2
+        timings.db_seconds += 0.004
+    return {"id": commitment["id"], "checkins": [], "note": "x" * 4096}
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import json
 import unittest
 from unittest.mock import patch
 
 from psycopg import OperationalError
 
 from backend.app import create_app
+from backend.app.commitments import CommitmentCatalog
+
+
+def ndjson_lines(response) -> list[dict]:
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
 
 
 class ApiRoutesTests(unittest.TestCase):
@@ -14,14 +20,16 @@ class ApiRoutesTests(unittest.TestCase):
         self.client = self.app.test_client()
 
     @patch("backend.app.list_companies_from_db")
-    @patch("backend.app.load_commitments")
+    @patch("backend.app.commitment_catalog")
     def test_companies_endpoint_returns_sorted_union(
-        self, load_commitments_mock, list_companies_mock
+        self, commitment_catalog_mock, list_companies_mock
     ) -> None:
-        load_commitments_mock.return_value = [
-            {"company": "cyberdyne"},
-            {"company": "ingen"},
-        ]
+        commitment_catalog_mock.return_value = CommitmentCatalog(
+            [
+                {"company": "cyberdyne"},
+                {"company": "ingen"},
+            ]
+        )
         list_companies_mock.return_value = ["tyrell", "ingen"]
 
         response = self.client.get("/api/companies")
@@ -30,47 +38,51 @@ class ApiRoutesTests(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(body["companies"], ["cyberdyne", "ingen", "tyrell"])
 
-    @patch("backend.app.evaluate_commitment")
-    @patch("backend.app.load_commitments")
+    @patch("backend.app.evaluate_commitments")
+    @patch("backend.app.commitment_catalog")
     def test_company_commitments_happy_path(
-        self, load_commitments_mock, evaluate_commitment_mock
+        self, commitment_catalog_mock, evaluate_commitments_mock
     ) -> None:
-        load_commitments_mock.return_value = [
+        commitment_catalog_mock.return_value = CommitmentCatalog(
+            [
+                {
+                    "id": 1,
+                    "name": "S3 commitment",
+                    "company": "cyberdyne",
+                    "service": "s3",
+                    "checkins": [
+                        {
+                            "start": "2024-01-01 00:00:00",
+                            "end": "2024-02-01 00:00:00",
+                            "amount": 1000,
+                        }
+                    ],
+                }
+            ]
+        )
+        evaluate_commitments_mock.return_value = [
             {
                 "id": 1,
                 "name": "S3 commitment",
-                "company": "cyberdyne",
                 "service": "s3",
+                "met": False,
+                "total_committed": 1000.0,
+                "total_actual": 875.25,
+                "total_shortfall": 124.75,
                 "checkins": [
                     {
                         "start": "2024-01-01 00:00:00",
                         "end": "2024-02-01 00:00:00",
-                        "amount": 1000,
+                        "committed_amount": 1000.0,
+                        "actual_amount": 875.25,
+                        "shortfall": 124.75,
+                        "surplus": 0.0,
+                        "met": False,
+                        "status": "past",
                     }
                 ],
             }
         ]
-        evaluate_commitment_mock.return_value = {
-            "id": 1,
-            "name": "S3 commitment",
-            "service": "s3",
-            "met": False,
-            "total_committed": 1000.0,
-            "total_actual": 875.25,
-            "total_shortfall": 124.75,
-            "checkins": [
-                {
-                    "start": "2024-01-01 00:00:00",
-                    "end": "2024-02-01 00:00:00",
-                    "committed_amount": 1000.0,
-                    "actual_amount": 875.25,
-                    "shortfall": 124.75,
-                    "surplus": 0.0,
-                    "met": False,
-                    "status": "past",
-                }
-            ],
-        }
 
         response = self.client.get("/api/companies/cyberdyne/commitments")
         body = response.get_json()
@@ -83,17 +95,19 @@ class ApiRoutesTests(unittest.TestCase):
         self.assertIsInstance(summary["total_actual"], float)
         self.assertIsInstance(summary["total_shortfall"], float)
 
-    @patch("backend.app.load_commitments")
-    def test_company_commitments_invalid_company(self, load_commitments_mock) -> None:
-        load_commitments_mock.return_value = [
-            {
-                "id": 1,
-                "name": "S3 commitment",
-                "company": "cyberdyne",
-                "service": "s3",
-                "checkins": [],
-            }
-        ]
+    @patch("backend.app.commitment_catalog")
+    def test_company_commitments_invalid_company(self, commitment_catalog_mock) -> None:
+        commitment_catalog_mock.return_value = CommitmentCatalog(
+            [
+                {
+                    "id": 1,
+                    "name": "S3 commitment",
+                    "company": "cyberdyne",
+                    "service": "s3",
+                    "checkins": [],
+                }
+            ]
+        )
 
         response = self.client.get("/api/companies/unknown/commitments")
         body = response.get_json()
@@ -101,23 +115,25 @@ class ApiRoutesTests(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertIn("not found", body["error"])
 
-    @patch("backend.app.evaluate_commitment")
-    @patch("backend.app.load_commitments")
+    @patch("backend.app.evaluate_commitments")
+    @patch("backend.app.commitment_catalog")
     def test_company_commitments_db_unavailable(
-        self, load_commitments_mock, evaluate_commitment_mock
+        self, commitment_catalog_mock, evaluate_commitments_mock
     ) -> None:
-        load_commitments_mock.return_value = [
-            {
-                "id": 1,
-                "name": "S3 commitment",
-                "company": "cyberdyne",
-                "service": "s3",
-                "checkins": [],
-            }
-        ]
+        commitment_catalog_mock.return_value = CommitmentCatalog(
+            [
+                {
+                    "id": 1,
+                    "name": "S3 commitment",
+                    "company": "cyberdyne",
+                    "service": "s3",
+                    "checkins": [],
+                }
+            ]
+        )
         # The route logs OperationalError with logger.exception(), so a stack trace
         # appears in test output even though the response assertion is expected.
-        evaluate_commitment_mock.side_effect = OperationalError("db unavailable")
+        evaluate_commitments_mock.side_effect = OperationalError("db unavailable")
 
         response = self.client.get("/api/companies/cyberdyne/commitments")
         body = response.get_json()
@@ -126,19 +142,21 @@ class ApiRoutesTests(unittest.TestCase):
         self.assertIn("Database unavailable", body["error"])
 
     @patch("backend.app.evaluate_commitment")
-    @patch("backend.app.load_commitments")
+    @patch("backend.app.commitment_catalog")
     def test_commitment_detail_happy_path(
-        self, load_commitments_mock, evaluate_commitment_mock
+        self, commitment_catalog_mock, evaluate_commitment_mock
     ) -> None:
-        load_commitments_mock.return_value = [
-            {
-                "id": 5,
-                "name": "Sagemaker commitment",
-                "company": "weyland-yutani",
-                "service": "sagemaker",
-                "checkins": [],
-            }
-        ]
+        commitment_catalog_mock.return_value = CommitmentCatalog(
+            [
+                {
+                    "id": 5,
+                    "name": "Sagemaker commitment",
+                    "company": "weyland-yutani",
+                    "service": "sagemaker",
+                    "checkins": [],
+                }
+            ]
+        )
         evaluate_commitment_mock.return_value = {
             "id": 5,
             "name": "Sagemaker commitment",
@@ -158,17 +176,19 @@ class ApiRoutesTests(unittest.TestCase):
         self.assertEqual(body["company"], "weyland-yutani")
         self.assertEqual(body["commitment"]["id"], 5)
 
-    @patch("backend.app.load_commitments")
-    def test_commitment_detail_invalid_commitment(self, load_commitments_mock) -> None:
-        load_commitments_mock.return_value = [
-            {
-                "id": 7,
-                "name": "S3 commitment",
-                "company": "ingen",
-                "service": "s3",
-                "checkins": [],
-            }
-        ]
+    @patch("backend.app.commitment_catalog")
+    def test_commitment_detail_invalid_commitment(self, commitment_catalog_mock) -> None:
+        commitment_catalog_mock.return_value = CommitmentCatalog(
+            [
+                {
+                    "id": 7,
+                    "name": "S3 commitment",
+                    "company": "ingen",
+                    "service": "s3",
+                    "checkins": [],
+                }
+            ]
+        )
 
         response = self.client.get("/api/companies/ingen/commitments/999")
         body = response.get_json()
@@ -176,6 +196,71 @@ class ApiRoutesTests(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertIn("not found", body["error"])
 
+    @patch("backend.app.evaluate_commitments")
+    @patch("backend.app.commitment_catalog")
+    def test_portfolio_streams_ndjson_per_commitment_and_company(
+        self, commitment_catalog_mock, evaluate_commitments_mock
+    ) -> None:
+        commitment_catalog_mock.return_value = CommitmentCatalog(
+            [
+                {"id": 1, "name": "S3", "company": "ingen", "service": "s3"},
+                {"id": 2, "name": "EC2", "company": "cyberdyne", "service": "ec2"},
+                {"id": 3, "name": "S3", "company": "cyberdyne", "service": "s3"},
+            ]
+        )
+        evaluate_commitments_mock.side_effect = lambda commitments, *_, **__: [
+            {
+                "id": item["id"],
+                "name": item["name"],
+                "service": item["service"],
+                "met": item["id"] != 2,
+                "total_committed": 100.1,
+                "total_actual": 50.2,
+                "total_shortfall": 49.9,
+                "checkins": [],
+            }
+            for item in commitments
+        ]
+
+        response = self.client.get("/api/portfolio/commitments")
+        lines = ndjson_lines(response)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual(lines[0]["type"], "portfolio")
+        self.assertEqual(lines[0]["commitment_count"], 3)
+        self.assertEqual(
+            [(line["company"], line["commitment"]["id"]) for line in lines[1:]],
+            [("cyberdyne", 2), ("cyberdyne", 3), ("ingen", 1)],
+        )
+
+        response = self.client.get("/api/portfolio/commitments?level=company")
+        lines = ndjson_lines(response)
+
+        self.assertEqual(
+            [line["type"] for line in lines], ["portfolio", "company", "company"]
+        )
+        self.assertEqual(lines[1]["company"], "cyberdyne")
+        self.assertFalse(lines[1]["met"])
+        self.assertEqual(lines[1]["total_committed"], 200.2)
+        self.assertEqual(lines[1]["total_shortfall"], 99.8)
+
+    @patch("backend.app.evaluate_commitments")
+    @patch("backend.app.commitment_catalog")
+    def test_portfolio_reports_database_failure_in_stream(
+        self, commitment_catalog_mock, evaluate_commitments_mock
+    ) -> None:
+        commitment_catalog_mock.return_value = CommitmentCatalog(
+            [{"id": 1, "name": "S3", "company": "ingen", "service": "s3"}]
+        )
+        evaluate_commitments_mock.side_effect = OperationalError("db unavailable")
+
+        response = self.client.get("/api/portfolio/commitments")
+        lines = ndjson_lines(response)
+
+        self.assertEqual(lines[-1]["type"], "error")
+        self.assertIn("Database unavailable", lines[-1]["error"])
+
 
 if __name__ == "__main__":
     unittest.main()
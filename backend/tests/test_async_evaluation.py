@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from psycopg import OperationalError
+
+from backend.app.asgi import AsyncCommitmentsApp
+from backend.app.async_evaluation import evaluate_commitments_async
+from backend.app.cache import CheckinResultCache
+from backend.app.commitments import CommitmentCatalog
+from backend.app.config import Settings
+from backend.app.evaluation import evaluate_commitments
+
+
+def commitment(commitment_id: int, service: str) -> dict:
+    return {
+        "id": commitment_id,
+        "name": f"{service} commitment",
+        "company": "cyberdyne",
+        "service": service,
+        "checkins": [
+            {"start": "2024-01-01 00:00:00", "end": "2024-02-01 00:00:00", "amount": 100},
+        ],
+    }
+
+
+class FakePool:
+    def __init__(self) -> None:
+        self.in_use = 0
+        self.max_in_use = 0
+
+    @asynccontextmanager
+    async def connection(self):
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        try:
+            yield object()
+        finally:
+            self.in_use -= 1
+
+
+async def slow_sum(conn, windows, use_rollups=False, cents=False) -> list[Decimal]:
+    await asyncio.sleep(0.01)
+    return [Decimal("150.00") for _ in windows]
+
+
+class AsyncEvaluationTests(unittest.IsolatedAsyncioTestCase):
+    @patch("backend.app.async_evaluation.sum_spend_for_company_windows_async")
+    async def test_commitments_run_concurrently_up_to_limit(self, sum_mock) -> None:
+        sum_mock.side_effect = slow_sum
+        pool = FakePool()
+        commitments = [commitment(idx, "s3") for idx in range(6)]
+
+        evaluated = await evaluate_commitments_async(commitments, pool, concurrency=3)
+
+        self.assertEqual([item["id"] for item in evaluated], list(range(6)))
+        self.assertTrue(all(item["met"] for item in evaluated))
+        self.assertEqual(pool.max_in_use, 3)
+
+    @patch("backend.app.async_evaluation.fetch_billing_data_version_async")
+    @patch("backend.app.async_evaluation.sum_spend_for_company_windows_async")
+    async def test_past_checkins_are_served_from_cache(
+        self, sum_mock, version_mock
+    ) -> None:
+        sum_mock.side_effect = slow_sum
+        version_mock.return_value = 3
+        cache = CheckinResultCache(max_entries=10, ttl_seconds=60)
+        now = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        item = commitment(1, "s3")
+
+        first = await evaluate_commitments_async([item], FakePool(), now, cache=cache)
+        second = await evaluate_commitments_async([item], FakePool(), now, cache=cache)
+
+        self.assertEqual(first, second)
+        self.assertEqual(sum_mock.call_count, 1)
+
+        version_mock.return_value = None
+        await evaluate_commitments_async([item], FakePool(), now, cache=cache)
+        self.assertEqual(sum_mock.call_count, 2)
+
+
+async def call_asgi(app: AsyncCommitmentsApp, path: str) -> tuple[int, dict]:
+    messages: list[dict] = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    await app({"type": "http", "method": "GET", "path": path}, receive, send)
+    return messages[0]["status"], json.loads(messages[1]["body"])
+
+
+class AsgiRoutesTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.app = AsyncCommitmentsApp(Settings(database_url=""))
+        catalog = CommitmentCatalog([commitment(1, "s3"), commitment(2, "ec2")])
+        patcher = patch("backend.app.asgi.commitment_catalog", return_value=catalog)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_unknown_company_and_commitment_return_404(self) -> None:
+        status, body = await call_asgi(self.app, "/api/companies/unknown/commitments")
+        self.assertEqual(status, 404)
+        self.assertIn("not found", body["error"])
+
+        status, body = await call_asgi(
+            self.app, "/api/companies/cyberdyne/commitments/9"
+        )
+        self.assertEqual(status, 404)
+        self.assertIn("not found", body["error"])
+
+    async def test_operational_error_maps_to_503(self) -> None:
+        with patch.object(
+            AsyncCommitmentsApp, "evaluate", side_effect=OperationalError("down")
+        ):
+            status, body = await call_asgi(
+                self.app, "/api/companies/cyberdyne/commitments"
+            )
+
+        self.assertEqual(status, 503)
+        self.assertIn("Database unavailable", body["error"])
+
+    async def test_company_commitments_are_summarized(self) -> None:
+        async def evaluate(commitments):
+            return [
+                {
+                    "id": item["id"],
+                    "name": item["name"],
+                    "service": item["service"],
+                    "met": True,
+                    "total_committed": 100.0,
+                    "total_actual": 150.0,
+                    "total_shortfall": 0.0,
+                    "checkins": [{}],
+                }
+                for item in commitments
+            ]
+
+        with patch.object(AsyncCommitmentsApp, "evaluate", side_effect=evaluate):
+            status, body = await call_asgi(
+                self.app, "/api/companies/cyberdyne/commitments"
+            )
+
+        self.assertEqual(status, 200)
+        self.assertEqual([item["id"] for item in body["commitments"]], [1, 2])
+        self.assertEqual(body["commitments"][0]["checkin_count"], 1)
+
+    async def test_columnar_engine_answers_without_a_pool(self) -> None:
+        engine = MagicMock()
+        engine.sum_spend_for_company_windows.side_effect = lambda windows: [
+            Decimal("80.00") for _ in windows
+        ]
+        app = AsyncCommitmentsApp(
+            Settings(database_url="", spend_engine="columnar", spend_rollups=True)
+        )
+        app.spend_engine = MagicMock(get=MagicMock(return_value=engine))
+
+        with patch(
+            "backend.app.asgi.evaluate_commitments", wraps=evaluate_commitments
+        ) as evaluate_mock:
+            status, body = await call_asgi(
+                app, "/api/companies/cyberdyne/commitments/1"
+            )
+
+        self.assertTrue(evaluate_mock.call_args.kwargs["use_rollups"])
+        self.assertEqual(status, 200)
+        self.assertEqual(body["commitment"]["total_actual"], 80.0)
+        self.assertFalse(body["commitment"]["met"])
+
+    async def test_database_commitments_source_is_honoured(self) -> None:
+        app = AsyncCommitmentsApp(
+            Settings(database_url="postgresql://local", commitments_source="database")
+        )
+        stored = [commitment(7, "rds")]
+
+        async def evaluate(commitments):
+            return [{"id": item["id"], "checkins": []} for item in commitments]
+
+        with patch(
+            "backend.app.asgi.DatabaseCommitmentCatalog.get", return_value=stored[0]
+        ) as get_mock, patch.object(
+            AsyncCommitmentsApp, "evaluate", side_effect=evaluate
+        ):
+            status, body = await call_asgi(
+                app, "/api/companies/cyberdyne/commitments/7"
+            )
+
+        get_mock.assert_called_once_with("cyberdyne", 7)
+        self.assertEqual(status, 200)
+        self.assertEqual(body["commitment"]["id"], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from backend.app import create_app
+from backend.app.batch import InvalidBatch, parse_batch
+from backend.app.config import Settings
+from backend.app.evaluation import evaluate_commitments
+from backend.scripts.load_billing_data import SQLITE_SCHEMA_PATH, upsert_sqlite_rows
+from backend.tests.helpers import utc
+
+
+COMMITMENT = {
+    "id": 1,
+    "name": "S3 commitment",
+    "company": "cyberdyne",
+    "service": "s3",
+    "checkins": [
+        {"start": "2024-01-01 00:00:00", "end": "2024-02-01 00:00:00", "amount": 10},
+    ],
+}
+
+
+class BatchEvaluationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        conn = sqlite3.connect(root / "billing.db")
+        conn.executescript(SQLITE_SCHEMA_PATH.read_text(encoding="utf-8"))
+        upsert_sqlite_rows(
+            conn,
+            [
+                ("cyberdyne", "s3", utc(2024, 1, 5), 1200),
+                ("cyberdyne", "s3", utc(2024, 2, 5), 300),
+                ("cyberdyne", "ec2", utc(2024, 1, 5), 5000),
+            ],
+        )
+        conn.close()
+        commitments_path = root / "commitments.json"
+        commitments_path.write_text(json.dumps({"commitments": [COMMITMENT]}))
+        settings = Settings(
+            database_url=f"sqlite:///{root / 'billing.db'}",
+            commitments_path=str(commitments_path),
+            commitments_source="file",
+            spend_engine="sql",
+            spend_rollups=False,
+            money_storage="numeric",
+            metrics_enabled=False,
+        )
+        with patch("backend.app.Settings", return_value=settings):
+            self.client = create_app().test_client()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_stored_and_inline_items_are_evaluated_in_order(self) -> None:
+        with patch(
+            "backend.app.evaluate_commitments", wraps=evaluate_commitments
+        ) as evaluate_mock:
+            response = self.client.post(
+                "/api/evaluate",
+                json={
+                    "items": [
+                        {
+                            "company": "cyberdyne",
+                            "service": "ec2",
+                            "name": "Proposed EC2 quarter",
+                            "checkins": [
+                                {
+                                    "start": "2024-01-01 00:00:00",
+                                    "end": "2024-02-01 00:00:00",
+                                    "amount": 60,
+                                },
+                                {
+                                    "start": "2024-02-01 00:00:00",
+                                    "end": "2024-03-01 00:00:00",
+                                    "amount": "0",
+                                },
+                            ],
+                        },
+                        {"company": "cyberdyne", "id": 1},
+                        {"company": "cyberdyne", "id": 99},
+                    ]
+                },
+            )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()["results"]
+        self.assertEqual(evaluate_mock.call_count, 1)
+        self.assertEqual(
+            [item["source"] for item in results], ["inline", "stored", "stored"]
+        )
+        what_if = results[0]["commitment"]
+        self.assertIsNone(what_if["id"])
+        self.assertEqual(what_if["total_actual"], 50.0)
+        self.assertEqual(what_if["total_shortfall"], 10.0)
+        self.assertEqual(
+            [checkin["met"] for checkin in what_if["checkins"]], [False, True]
+        )
+        self.assertTrue(results[1]["commitment"]["met"])
+        self.assertEqual(results[1]["commitment"]["total_actual"], 12.0)
+        self.assertEqual(
+            results[2]["error"], "Commitment '99' not found for company 'cyberdyne'"
+        )
+
+    def test_invalid_batches_are_rejected_with_the_item_path(self) -> None:
+        bad_checkin = {"start": "2024-02-01 00:00:00", "end": "2024-01-01 00:00:00"}
+        cases = [
+            (None, '"items" list'),
+            ({"items": []}, "from 1 to"),
+            ({"items": [{"company": "cyberdyne", "id": "1"}]}, "items[0].id"),
+            (
+                {
+                    "items": [
+                        {"company": "c", "id": 1},
+                        {"company": "c", "service": "s3", "checkins": [bad_checkin]},
+                    ]
+                },
+                "items[1].checkins[0] must end after it starts",
+            ),
+            (
+                {
+                    "items": [
+                        {
+                            "company": "c",
+                            "service": "s3",
+                            "checkins": [{**bad_checkin, "end": "2024-03-01 00:00:00"}],
+                        }
+                    ]
+                },
+                "items[0].checkins[0].amount",
+            ),
+        ]
+        for amount in (1e40, "1e40", "92233720368547758.08"):
+            checkin = {**bad_checkin, "end": "2024-03-01 00:00:00", "amount": amount}
+            item = {"company": "c", "service": "s3", "checkins": [checkin]}
+            cases.append(
+                ({"items": [item]}, "items[0].checkins[0].amount must be at most")
+            )
+        for payload, message in cases:
+            with self.assertRaises(InvalidBatch) as caught:
+                parse_batch(payload)
+            self.assertIn(message, str(caught.exception))
+
+        response = self.client.post("/api/evaluate", data="not json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/api/evaluate", json=cases[-2][0])
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
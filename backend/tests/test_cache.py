@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import unittest
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from psycopg.errors import UndefinedTable
+
+from backend.app.cache import CheckinResultCache
+from backend.app.evaluation import evaluate_commitments
+from backend.app.repository import fetch_optional_billing_data_version
+from backend.tests.helpers import utc
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CheckinResultCacheTests(unittest.TestCase):
+    def test_entries_expire_evict_and_follow_data_version(self) -> None:
+        clock = FakeClock()
+        cache = CheckinResultCache(max_entries=2, ttl_seconds=10, clock=clock)
+        jan = ("cyberdyne", "s3", utc(2024, 1, 1), utc(2024, 2, 1))
+        feb = ("cyberdyne", "s3", utc(2024, 2, 1), utc(2024, 3, 1))
+        mar = ("cyberdyne", "s3", utc(2024, 3, 1), utc(2024, 4, 1))
+
+        cache.put(jan, 1, Decimal("10.00"))
+        cache.put(feb, 1, Decimal("20.00"))
+        self.assertEqual(cache.get(jan, 1), Decimal("10.00"))
+        self.assertIsNone(cache.get(jan, 2))
+
+        cache.put(jan, 1, Decimal("10.00"))
+        cache.put(mar, 1, Decimal("30.00"))
+        self.assertIsNone(cache.get(feb, 1))
+
+        clock.now = 11
+        self.assertIsNone(cache.get(mar, 1))
+
+    @patch("backend.app.backends.fetch_optional_billing_data_version")
+    @patch("backend.app.backends.sum_spend_for_company_windows")
+    @patch("backend.app.backends.connection")
+    def test_past_checkins_are_served_from_cache(
+        self, connect_mock, sum_spend_mock, version_mock
+    ) -> None:
+        connect_mock.return_value.__enter__.return_value = object()
+        version_mock.return_value = 7
+        sum_spend_mock.side_effect = lambda conn, windows: [
+            Decimal("100.00") for _ in windows
+        ]
+        commitment = {
+            "id": 1,
+            "name": "S3 commitment",
+            "company": "cyberdyne",
+            "service": "s3",
+            "checkins": [
+                {"start": "2024-01-01 00:00:00", "end": "2024-02-01 00:00:00", "amount": 100},
+                {"start": "2024-02-01 00:00:00", "end": "2024-03-01 00:00:00", "amount": 100},
+            ],
+        }
+        cache = CheckinResultCache(max_entries=10, ttl_seconds=60)
+        now = utc(2024, 2, 15)
+
+        first = evaluate_commitments([commitment], "postgresql://local", now, cache=cache)
+        second = evaluate_commitments([commitment], "postgresql://local", now, cache=cache)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(sum_spend_mock.call_args_list[0].args[1]), 2)
+        self.assertEqual(
+            sum_spend_mock.call_args_list[1].args[1],
+            [("cyberdyne", "s3", utc(2024, 2, 1), utc(2024, 3, 1))],
+        )
+
+        version_mock.return_value = 8
+        evaluate_commitments([commitment], "postgresql://local", now, cache=cache)
+        self.assertEqual(len(sum_spend_mock.call_args_list[2].args[1]), 2)
+
+        # A schema without billing_data_version has no version to key on.
+        version_mock.return_value = None
+        for _ in range(2):
+            evaluate_commitments([commitment], "postgresql://local", now, cache=cache)
+        self.assertEqual(len(sum_spend_mock.call_args_list[3].args[1]), 2)
+        self.assertEqual(len(sum_spend_mock.call_args_list[4].args[1]), 2)
+
+    def test_missing_version_table_reads_as_no_version(self) -> None:
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value.execute.side_effect = (
+            UndefinedTable('relation "billing_data_version" does not exist')
+        )
+
+        self.assertIsNone(fetch_optional_billing_data_version(conn))
+        conn.transaction.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
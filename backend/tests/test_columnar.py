@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import unittest
+from decimal import Decimal
+
+from backend.app.columnar import ColumnarSpendEngine, np
+from backend.app.evaluation import evaluate_commitments
+from backend.tests.helpers import epoch, utc
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class ColumnarSpendEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = ColumnarSpendEngine.from_rows(
+            [
+                ("cyberdyne", "s3", epoch(2024, 1, 31, 23), 10_000),
+                ("cyberdyne", "s3", epoch(2024, 1, 1), 25_050),
+                ("cyberdyne", "s3", epoch(2024, 2, 1), 99),
+                ("cyberdyne", "ec2", epoch(2024, 1, 15), 500_000),
+                ("ingen", "s3", epoch(2024, 1, 15), 7),
+            ]
+        )
+
+    def test_windows_are_half_open_and_scoped_to_company_service(self) -> None:
+        totals = self.engine.sum_cents_for_windows(
+            "cyberdyne",
+            [
+                ("s3", utc(2024, 1, 1), utc(2024, 2, 1)),
+                ("s3", utc(2024, 2, 1), utc(2024, 3, 1)),
+                ("ec2", utc(2024, 1, 1), utc(2024, 1, 15)),
+                ("sagemaker", utc(2024, 1, 1), utc(2025, 1, 1)),
+            ],
+        )
+
+        self.assertEqual(totals, [35_050, 99, 0, 0])
+
+    def test_evaluate_commitments_uses_engine_without_database(self) -> None:
+        commitment = {
+            "id": 1,
+            "name": "S3 commitment",
+            "company": "cyberdyne",
+            "service": "s3",
+            "checkins": [
+                {"start": "2024-01-01 00:00:00", "end": "2024-02-01 00:00:00", "amount": 400},
+            ],
+        }
+
+        evaluated = evaluate_commitments([commitment], db_url="", engine=self.engine)
+
+        self.assertEqual(evaluated[0]["total_actual"], 350.5)
+        self.assertEqual(evaluated[0]["total_shortfall"], 49.5)
+        self.assertFalse(evaluated[0]["met"])
+        self.assertEqual(
+            self.engine.sum_spend_for_windows(
+                "cyberdyne", [("s3", utc(2024, 1, 1), utc(2024, 2, 1))]
+            ),
+            [Decimal("350.50")],
+        )
+        self.assertEqual(
+            evaluate_commitments(
+                [commitment], db_url="", engine=self.engine, cents=True
+            ),
+            evaluated,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+from backend.app.commitments import CommitmentCatalog, commitment_catalog
+
+
+def write_commitments(path: Path, commitments: list[dict]) -> None:
+    path.write_text(json.dumps({"commitments": commitments}), encoding="utf-8")
+
+
+class CommitmentCatalogTests(unittest.TestCase):
+    def test_lookups_by_company_and_id_with_parsed_checkins(self) -> None:
+        catalog = CommitmentCatalog(
+            [
+                {
+                    "id": 1,
+                    "name": "S3 commitment",
+                    "company": "cyberdyne",
+                    "service": "s3",
+                    "checkins": [
+                        {
+                            "start": "2024-01-01 00:00:00",
+                            "end": "2024-02-01 00:00:00",
+                            "amount": 1000.5,
+                        }
+                    ],
+                },
+                {"id": 2, "name": "EC2", "company": "ingen", "service": "ec2"},
+            ]
+        )
+
+        self.assertEqual(catalog.companies(), {"cyberdyne", "ingen"})
+        self.assertEqual([item["id"] for item in catalog.for_company("ingen")], [2])
+        self.assertEqual(catalog.for_company("unknown"), [])
+        self.assertIsNone(catalog.get("ingen", 1))
+
+        checkin = catalog.get("cyberdyne", 1)["checkins"][0]
+        self.assertEqual(
+            checkin["start_at"], datetime(2024, 1, 1, tzinfo=timezone.utc)
+        )
+        self.assertEqual(checkin["end_at"], datetime(2024, 2, 1, tzinfo=timezone.utc))
+        self.assertEqual(checkin["committed_amount"], Decimal("1000.50"))
+
+    def test_reloads_only_when_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "commitments.json"
+            write_commitments(path, [{"id": 1, "company": "tyrell", "service": "s3"}])
+
+            first = commitment_catalog(path)
+            self.assertIs(commitment_catalog(path), first)
+
+            write_commitments(
+                path,
+                [
+                    {"id": 1, "company": "tyrell", "service": "s3"},
+                    {"id": 2, "company": "ingen", "service": "ec2"},
+                ],
+            )
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+            second = commitment_catalog(path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.companies(), {"tyrell", "ingen"})
+
+
+if __name__ == "__main__":
+    unittest.main()
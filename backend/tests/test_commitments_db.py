@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import unittest
+from datetime import timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from backend.app.commitments import (
+    DatabaseCommitmentCatalog,
+    commitment_catalog,
+    commitments_from_rows,
+)
+from backend.app.evaluation import evaluate_commitments
+from backend.app.portfolio import company_batches
+from backend.scripts.import_commitments import commitment_rows
+from backend.tests.helpers import utc
+
+
+COMMITMENT = {
+    "id": 1,
+    "name": "S3 commitment",
+    "company": "cyberdyne",
+    "service": "s3",
+    "checkins": [
+        {"start": "2024-01-01 00:00:00", "end": "2024-02-01 00:00:00", "amount": 100},
+        {"start": "2024-02-01 00:00:00", "end": "2024-03-01 00:00:00", "amount": 50.5},
+    ],
+}
+
+
+class ImportCommitmentsTests(unittest.TestCase):
+    def test_rows_flatten_checkins_with_indexes(self) -> None:
+        commitments, checkins = commitment_rows([COMMITMENT])
+
+        self.assertEqual(commitments, [("cyberdyne", 1, "S3 commitment", "s3")])
+        self.assertEqual(
+            checkins[1],
+            (
+                "cyberdyne",
+                1,
+                1,
+                utc(2024, 2, 1),
+                utc(2024, 3, 1),
+                Decimal("50.50"),
+            ),
+        )
+
+    def test_invalid_commitments_are_rejected(self) -> None:
+        backwards = {
+            **COMMITMENT,
+            "checkins": [
+                {"start": "2024-02-01 00:00:00", "end": "2024-01-01 00:00:00"},
+            ],
+        }
+        for commitments in (
+            [{**COMMITMENT, "id": "1"}],
+            [COMMITMENT, COMMITMENT],
+            [backwards],
+            [{**COMMITMENT, "checkins": [{"start": "soon", "end": "later"}]}],
+        ):
+            with self.assertRaises(ValueError):
+                commitment_rows(commitments)
+
+    def test_sample_catalog_imports_cleanly(self) -> None:
+        commitments, checkins = commitment_rows(commitment_catalog().commitments)
+        self.assertEqual(len(commitments), len(commitment_catalog()))
+        self.assertGreater(len(checkins), 0)
+
+
+class DatabaseCatalogTests(unittest.TestCase):
+    def test_rows_become_prepared_commitments(self) -> None:
+        est = timezone(timedelta(hours=-5))
+        rows = [
+            (1, "S3", "s3", utc(2024, 1, 1), utc(2024, 2, 1), Decimal("100.00")),
+            (
+                1,
+                "S3",
+                "s3",
+                utc(2024, 2, 1).astimezone(est),
+                utc(2024, 3, 1).astimezone(est),
+                Decimal("50.50"),
+            ),
+            (2, "Empty", "ec2", None, None, None),
+        ]
+
+        first, empty = commitments_from_rows("cyberdyne", rows)
+
+        self.assertEqual(first["company"], "cyberdyne")
+        self.assertEqual(first["checkins"][1]["start"], "2024-02-01 00:00:00")
+        self.assertEqual(first["checkins"][1]["committed_cents"], 5050)
+        self.assertEqual(empty["checkins"], [])
+
+    @patch("backend.app.backends.sum_spend_for_stored_checkins")
+    @patch("backend.app.backends.connection")
+    def test_stored_commitments_are_evaluated_with_one_join(
+        self, connect_mock, stored_mock
+    ) -> None:
+        sentinel_conn = object()
+        connect_mock.return_value.__enter__.return_value = sentinel_conn
+        stored_mock.return_value = {("cyberdyne", 1, 0): Decimal("120.00")}
+        commitment = commitments_from_rows(
+            "cyberdyne",
+            [
+                (1, "S3", "s3", utc(2024, 1, 1), utc(2024, 2, 1), Decimal("100.00")),
+                (1, "S3", "s3", utc(2024, 2, 1), utc(2024, 3, 1), Decimal("50.50")),
+            ],
+        )
+
+        evaluated = evaluate_commitments(
+            commitment, "postgresql://local", utc(2024, 6, 1), stored=True
+        )[0]
+
+        stored_mock.assert_called_once_with(
+            sentinel_conn, [("cyberdyne", 1)], cents=False
+        )
+        self.assertEqual(evaluated["checkins"][0]["actual_amount"], 120.0)
+        self.assertEqual(evaluated["checkins"][1]["shortfall"], 50.5)
+        self.assertFalse(evaluated["met"])
+
+    @patch("backend.app.commitments.fetch_commitment_rows_for_companies")
+    @patch("backend.app.commitments.list_commitment_companies")
+    @patch("backend.app.commitments.count_commitments")
+    @patch("backend.app.commitments.connection")
+    def test_portfolio_batches_fetch_a_page_of_companies_per_query(
+        self, connect_mock, count_mock, companies_mock, rows_mock
+    ) -> None:
+        connect_mock.return_value.__enter__.return_value = object()
+        companies = [f"company-{index}" for index in range(6)]
+        companies_mock.return_value = companies
+        count_mock.return_value = 12
+        rows_mock.side_effect = lambda conn, page: [
+            (company, commitment_id, "S3", "s3", None, None, None)
+            for company in page
+            for commitment_id in (1, 2)
+        ]
+
+        catalog = DatabaseCommitmentCatalog("postgresql://local")
+        header = (len(catalog.companies()), len(catalog))
+        batches = list(company_batches(catalog, 4))
+
+        self.assertEqual(
+            [call.args[1] for call in rows_mock.call_args_list],
+            [companies[0:2], companies[2:4], companies[4:6]],
+        )
+        self.assertEqual(
+            [[company for company, _ in batch] for batch in batches],
+            [companies[0:2], companies[2:4], companies[4:6]],
+        )
+        self.assertEqual([item["id"] for item in batches[0][0][1]], [1, 2])
+        # The portfolio header and the batching share one count and listing.
+        self.assertEqual(header, (6, 12))
+        self.assertEqual(companies_mock.call_count, 1)
+        self.assertEqual(count_mock.call_count, 1)
+
+    @patch("backend.app.commitments.fetch_commitments_version", return_value=4)
+    @patch("backend.app.commitments.connection")
+    def test_catalog_version_is_read_once_per_instance(
+        self, connect_mock, version_mock
+    ) -> None:
+        catalog = DatabaseCommitmentCatalog("postgresql://local")
+
+        self.assertEqual([catalog.version, catalog.version], ["db:4", "db:4"])
+        self.assertEqual(version_mock.call_count, 1)
+        self.assertEqual(
+            DatabaseCommitmentCatalog("postgresql://local").version, "db:4"
+        )
+        self.assertEqual(version_mock.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import unittest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from backend.app import db
+from backend.app.config import Settings
+from backend.app.metrics import end_request_timings, start_request_timings
+
+
+class FakeConnectionPool:
+    def __init__(self, conninfo: str, **kwargs: object) -> None:
+        self.conninfo = conninfo
+        self.kwargs = kwargs
+        self.opened_with: bool | None = None
+        self.closed = False
+        self.borrowed = 0
+        self.conn = SimpleNamespace(cursor_factory=None)
+        self.stats: dict[str, int] = {}
+
+    def open(self, wait: bool = True) -> None:
+        self.opened_with = wait
+
+    def close(self) -> None:
+        self.closed = True
+
+    @contextmanager
+    def connection(self):
+        self.borrowed += 1
+        yield self.conn
+
+    def get_stats(self) -> dict[str, int]:
+        return self.stats
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = patch("backend.app.db.ConnectionPool", FakeConnectionPool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(db.close_pool)
+
+    def test_init_pool_opens_in_background_and_skips_non_postgres_urls(self) -> None:
+        self.assertIsNone(db.init_pool(Settings(database_url="")))
+        self.assertIsNone(db.init_pool(Settings(database_url="sqlite:///x.db")))
+
+        first = db.init_pool(
+            Settings(database_url="postgresql://a", db_pool_max_size=3)
+        )
+        self.assertFalse(first.opened_with)
+        self.assertEqual(first.kwargs["max_size"], 3)
+
+        second = db.init_pool(Settings(database_url="postgresql://b"))
+        self.assertTrue(first.closed)
+        self.assertIsNot(first, second)
+
+    def test_connection_borrows_from_matching_pool_and_records_wait(self) -> None:
+        pool = db.init_pool(Settings(database_url="postgresql://a"))
+        token = start_request_timings()
+        try:
+            with patch("backend.app.db.record_pool_wait") as record_wait:
+                with db.connection("postgresql://a") as conn:
+                    self.assertIs(conn, pool.conn)
+        finally:
+            end_request_timings(token)
+
+        self.assertEqual(pool.borrowed, 1)
+        record_wait.assert_called_once()
+
+    def test_connection_to_another_url_opens_a_dedicated_connection(self) -> None:
+        pool = db.init_pool(Settings(database_url="postgresql://a"))
+        dedicated = MagicMock()
+        dedicated.__enter__.return_value = dedicated
+
+        with patch("backend.app.db.psycopg.connect", return_value=dedicated) as connect:
+            with db.connection("postgresql://b") as conn:
+                self.assertIs(conn, dedicated)
+
+        connect.assert_called_once_with("postgresql://b")
+        self.assertEqual(pool.borrowed, 0)
+
+    def test_pool_stats_maps_psycopg_counters(self) -> None:
+        self.assertIsNone(db.pool_stats())
+        pool = db.init_pool(Settings(database_url="postgresql://a"))
+        pool.stats = {
+            "pool_min": 1,
+            "pool_max": 10,
+            "pool_size": 4,
+            "pool_available": 1,
+            "requests_num": 8,
+            "requests_wait_ms": 20,
+            "requests_errors": 2,
+        }
+
+        stats = db.pool_stats()
+
+        self.assertEqual(stats["size"], 4)
+        self.assertEqual(stats["in_use"], 3)
+        self.assertEqual(stats["requests"], 8)
+        self.assertEqual(stats["wait_ms_total"], 20)
+        self.assertEqual(stats["wait_ms_avg"], 2.5)
+        self.assertEqual(stats["requests_errors"], 2)
+        self.assertEqual(stats["connections_errors"], 0)
+
+        pool.stats = {}
+        self.assertEqual(db.pool_stats()["wait_ms_avg"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
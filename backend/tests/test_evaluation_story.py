@@ -5,18 +5,18 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from unittest.mock import patch
 
-from backend.app.evaluation import evaluate_commitment
+from backend.app.evaluation import evaluate_commitment, evaluate_commitments
 
 
 class EvaluationStoryTests(unittest.TestCase):
-    @patch("backend.app.evaluation.sum_spend_for_period")
-    @patch("backend.app.evaluation.psycopg.connect")
+    @patch("backend.app.backends.sum_spend_for_company_windows")
+    @patch("backend.app.backends.connection")
     def test_evaluate_commitment_tells_met_missed_surplus_story(
         self, connect_mock, sum_spend_mock
     ) -> None:
         sentinel_conn = object()
         connect_mock.return_value.__enter__.return_value = sentinel_conn
-        sum_spend_mock.side_effect = [
+        sum_spend_mock.return_value = [
             Decimal("900.00"),   # missed by 100
             Decimal("1000.00"),  # exact match
             Decimal("1100.00"),  # surplus 100
@@ -57,16 +57,16 @@ class EvaluationStoryTests(unittest.TestCase):
         self.assertEqual(checkins[2]["surplus"], 100.0)
         self.assertTrue(checkins[2]["met"])
 
-        self.assertEqual(sum_spend_mock.call_count, 3)
+        self.assertEqual(sum_spend_mock.call_count, 1)
 
-    @patch("backend.app.evaluation.sum_spend_for_period")
-    @patch("backend.app.evaluation.psycopg.connect")
+    @patch("backend.app.backends.sum_spend_for_company_windows")
+    @patch("backend.app.backends.connection")
     def test_evaluate_commitment_passes_start_end_boundaries_to_repository(
         self, connect_mock, sum_spend_mock
     ) -> None:
         sentinel_conn = object()
         connect_mock.return_value.__enter__.return_value = sentinel_conn
-        sum_spend_mock.return_value = Decimal("1000.00")
+        sum_spend_mock.return_value = [Decimal("1000.00")]
         commitment = {
             "id": 2,
             "name": "EC2 commitment",
@@ -82,14 +82,63 @@ class EvaluationStoryTests(unittest.TestCase):
         call_args = sum_spend_mock.call_args
         self.assertIsNotNone(call_args)
         self.assertIs(call_args.args[0], sentinel_conn)
-        self.assertEqual(call_args.args[1], "ingen")
-        self.assertEqual(call_args.args[2], "ec2")
         self.assertEqual(
-            call_args.args[3], datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc)
+            call_args.args[1],
+            [
+                (
+                    "ingen",
+                    "ec2",
+                    datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc),
+                    datetime(2024, 2, 1, 0, 0, tzinfo=timezone.utc),
+                )
+            ],
         )
+
+    @patch("backend.app.backends.sum_spend_for_company_windows")
+    @patch("backend.app.backends.connection")
+    def test_evaluate_commitments_batches_all_checkins_across_companies(
+        self, connect_mock, sum_spend_mock
+    ) -> None:
+        connect_mock.return_value.__enter__.return_value = object()
+        sum_spend_mock.return_value = [
+            Decimal("100.00"),
+            Decimal("200.00"),
+            Decimal("300.00"),
+        ]
+        commitments = [
+            {
+                "id": 1,
+                "name": "S3 commitment",
+                "company": "cyberdyne",
+                "service": "s3",
+                "checkins": [
+                    {"start": "2024-01-01 00:00:00", "end": "2024-02-01 00:00:00", "amount": 100},
+                    {"start": "2024-02-01 00:00:00", "end": "2024-03-01 00:00:00", "amount": 100},
+                ],
+            },
+            {
+                "id": 2,
+                "name": "EC2 commitment",
+                "company": "ingen",
+                "service": "ec2",
+                "checkins": [
+                    {"start": "2024-01-01 00:00:00", "end": "2024-04-01 00:00:00", "amount": 500},
+                ],
+            },
+        ]
+
+        evaluated = evaluate_commitments(commitments, db_url="postgresql://local")
+
+        self.assertEqual(sum_spend_mock.call_count, 1)
+        windows = sum_spend_mock.call_args.args[1]
         self.assertEqual(
-            call_args.args[4], datetime(2024, 2, 1, 0, 0, tzinfo=timezone.utc)
+            [window[:2] for window in windows],
+            [("cyberdyne", "s3"), ("cyberdyne", "s3"), ("ingen", "ec2")],
         )
+        self.assertEqual(evaluated[0]["total_actual"], 300.0)
+        self.assertTrue(evaluated[0]["met"])
+        self.assertEqual(evaluated[1]["total_actual"], 300.0)
+        self.assertEqual(evaluated[1]["total_shortfall"], 200.0)
 
     def test_evaluate_commitment_requires_database_url(self) -> None:
         commitment = {
@@ -103,6 +152,44 @@ class EvaluationStoryTests(unittest.TestCase):
         with self.assertRaisesRegex(RuntimeError, "DATABASE_URL is not set."):
             evaluate_commitment(commitment, db_url="")
 
+    @patch("backend.app.backends.sum_spend_cents_for_company_windows")
+    @patch("backend.app.backends.sum_spend_for_company_windows")
+    @patch("backend.app.backends.connection")
+    def test_cents_storage_matches_decimal_output(
+        self, connect_mock, sum_spend_mock, sum_cents_mock
+    ) -> None:
+        connect_mock.return_value.__enter__.return_value = object()
+        actual_cents = [0, 1, 10, 99_99, 100_00, 123_456_78, 33_33]
+        sum_cents_mock.return_value = actual_cents
+        sum_spend_mock.return_value = [
+            Decimal(cents).scaleb(-2) for cents in actual_cents
+        ]
+        amounts = [0.01, 0.1, 99.99, 100, "123456.785", 0.29, 33.33]
+        commitment = {
+            "id": 3,
+            "name": "RDS commitment",
+            "company": "tyrell",
+            "service": "rds",
+            "checkins": [
+                {
+                    "start": f"2024-{month:02d}-01 00:00:00",
+                    "end": f"2024-{month + 1:02d}-01 00:00:00",
+                    "amount": amount,
+                }
+                for month, amount in enumerate(amounts, start=1)
+            ],
+        }
+        now = datetime(2024, 4, 15, tzinfo=timezone.utc)
+
+        expected = evaluate_commitment(commitment, "postgresql://local", now)
+        evaluated = evaluate_commitment(
+            commitment, "postgresql://local", now, cents=True
+        )
+
+        self.assertEqual(evaluated, expected)
+        self.assertEqual(repr(evaluated), repr(expected))
+        sum_cents_mock.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import gzip
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from backend.app import create_app
+from backend.app.commitments import CommitmentCatalog
+from backend.app.config import Settings
+from backend.app.http_cache import billing_data_token, checkin_phase
+from backend.tests.helpers import fake_evaluate, utc
+
+
+COMMITMENT = {
+    "id": 1,
+    "name": "S3 commitment",
+    "company": "cyberdyne",
+    "service": "s3",
+    "checkins": [
+        {"start": "2024-01-01 00:00:00", "end": "2024-02-01 00:00:00", "amount": 300},
+    ],
+}
+CATALOG = CommitmentCatalog([COMMITMENT])
+DETAIL_URL = "/api/companies/cyberdyne/commitments/1"
+
+
+class CheckinPhaseTests(unittest.TestCase):
+    def test_phase_tracks_boundaries_and_buckets_only_current_checkins(self) -> None:
+        commitments = CATALOG.commitments
+
+        before = checkin_phase(commitments, utc(2023, 12, 31), 60)
+        self.assertEqual(before, checkin_phase(commitments, utc(2023, 12, 1), 60))
+
+        during = checkin_phase(commitments, utc(2024, 1, 2, 0, 0, 30), 60)
+        same_bucket = checkin_phase(commitments, utc(2024, 1, 2, 0, 0, 50), 60)
+        next_bucket = checkin_phase(commitments, utc(2024, 1, 2, 0, 1), 60)
+        self.assertEqual(during, same_bucket)
+        self.assertNotEqual(during, next_bucket)
+        self.assertNotEqual(during, before)
+
+        after = checkin_phase(commitments, utc(2024, 3, 1), 60)
+        self.assertEqual(after, checkin_phase(commitments, utc(2025, 3, 1), 60))
+
+    def test_catalog_version_follows_content(self) -> None:
+        self.assertEqual(CATALOG.version, CommitmentCatalog([COMMITMENT]).version)
+        changed = {**COMMITMENT, "name": "Renamed"}
+        self.assertNotEqual(CATALOG.version, CommitmentCatalog([changed]).version)
+
+    @patch("backend.app.http_cache.open_repository")
+    def test_listener_version_names_the_data_without_a_query(
+        self, open_mock
+    ) -> None:
+        settings = Settings(database_url="postgresql://local")
+        repository = open_mock.return_value.__enter__.return_value
+        repository.billing_data_version.return_value = 4
+
+        listening = SimpleNamespace(version=5)
+        self.assertEqual(billing_data_token(settings, None, listening), "db:5")
+        open_mock.assert_not_called()
+
+        disconnected = SimpleNamespace(version=None)
+        self.assertEqual(billing_data_token(settings, None, disconnected), "db:4")
+        self.assertEqual(billing_data_token(settings, None), "db:4")
+
+
+@patch("backend.app.commitment_catalog", return_value=CATALOG)
+class ConditionalRequestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = create_app().test_client()
+
+    @patch("backend.app.evaluate_commitment", side_effect=fake_evaluate)
+    @patch("backend.app.billing_data_token", return_value="db:3")
+    def test_matching_if_none_match_returns_304_without_evaluating(
+        self, data_token_mock, evaluate_mock, _catalog
+    ) -> None:
+        response = self.client.get(DETAIL_URL)
+        etag = response.headers["ETag"]
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(DETAIL_URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(evaluate_mock.call_count, 1)
+
+        data_token_mock.return_value = "db:4"
+        response = self.client.get(DETAIL_URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    @patch("backend.app.evaluate_commitment", side_effect=fake_evaluate)
+    @patch("backend.app.billing_data_token", return_value=None)
+    def test_unknown_data_version_sends_no_etag(self, _token, _evaluate, _catalog):
+        response = self.client.get(DETAIL_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response.headers)
+
+    @patch("backend.app.evaluate_commitment", side_effect=fake_evaluate)
+    @patch("backend.app.billing_data_token", return_value="db:3")
+    def test_large_payload_is_gzipped_with_encoded_etag(
+        self, _token, _evaluate, _catalog
+    ) -> None:
+        plain = self.client.get(DETAIL_URL)
+        response = self.client.get(DETAIL_URL, headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(
+            json.loads(gzip.decompress(response.get_data())), plain.get_json()
+        )
+        self.assertEqual(
+            response.headers["ETag"], plain.headers["ETag"][:-1] + '-gzip"'
+        )
+
+        revalidated = self.client.get(
+            DETAIL_URL,
+            headers={
+                "Accept-Encoding": "gzip",
+                "If-None-Match": response.headers["ETag"],
+            },
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_small_payloads_and_disabled_compression_are_sent_plain(
+        self, _catalog
+    ) -> None:
+        with patch("backend.app.list_companies_from_db", return_value=["acme"]):
+            response = self.client.get(
+                "/api/companies", headers={"Accept-Encoding": "gzip"}
+            )
+        self.assertNotIn("Content-Encoding", response.headers)
+
+        with patch(
+            "backend.app.Settings", return_value=Settings(compression_min_bytes=0)
+        ):
+            client = create_app().test_client()
+        with patch("backend.app.evaluate_commitment", side_effect=fake_evaluate):
+            response = client.get(DETAIL_URL, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Encoding", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timezone
+
+from backend.scripts.init_db import add_months, partition_range
+
+
+class PartitionRangeTests(unittest.TestCase):
+    def test_defaults_to_current_month_through_months_ahead(self) -> None:
+        now = datetime(2024, 11, 17, 9, 30, tzinfo=timezone.utc)
+
+        first, last = partition_range("", 3, now=now)
+
+        self.assertEqual(first, datetime(2024, 11, 1, tzinfo=timezone.utc))
+        self.assertEqual(last, datetime(2025, 2, 1, tzinfo=timezone.utc))
+
+    def test_backfills_from_requested_month(self) -> None:
+        now = datetime(2024, 3, 2, tzinfo=timezone.utc)
+
+        first, last = partition_range("2023-01", 0, now=now)
+
+        self.assertEqual(first, datetime(2023, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(last, datetime(2024, 3, 1, tzinfo=timezone.utc))
+
+    def test_add_months_crosses_year_boundaries(self) -> None:
+        start = datetime(2024, 12, 1, tzinfo=timezone.utc)
+
+        self.assertEqual(add_months(start, 1), start.replace(year=2025, month=1))
+        self.assertEqual(add_months(start, -12), start.replace(year=2023))
+
+
+if __name__ == "__main__":
+    unittest.main()
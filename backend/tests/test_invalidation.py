@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import unittest
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from backend.app.cache import CheckinResultCache
+from backend.app.columnar import LazySpendEngine
+from backend.app.config import Settings
+from backend.app.invalidation import (
+    BillingChange,
+    BillingChangeListener,
+    apply_billing_change,
+    parse_billing_change,
+)
+from backend.scripts.load_billing_data import (
+    NOTIFY_PAYLOAD_LIMIT,
+    billing_change_payload,
+)
+from backend.tests.helpers import utc
+
+
+JAN = ("cyberdyne", "s3", utc(2024, 1, 1), utc(2024, 2, 1))
+FEB = ("cyberdyne", "s3", utc(2024, 2, 1), utc(2024, 3, 1))
+EC2_FEB = ("cyberdyne", "ec2", utc(2024, 2, 1), utc(2024, 3, 1))
+
+
+class BillingChangeTests(unittest.TestCase):
+    def test_payload_round_trips_and_coarsens_when_too_large(self) -> None:
+        change = parse_billing_change(
+            billing_change_payload(
+                8, [("cyberdyne", "s3", utc(2024, 2, 10), utc(2024, 2, 12))]
+            )
+        )
+        self.assertEqual(change.version, 8)
+        touched = [change.touches(key) for key in (JAN, FEB, EC2_FEB)]
+        self.assertEqual(touched, [False, True, False])
+
+        many = [
+            (f"company-{idx}", "s3", utc(2024, 2, 10), utc(2024, 2, 12))
+            for idx in range(200)
+        ]
+        payload = billing_change_payload(9, many)
+        self.assertLessEqual(len(payload), NOTIFY_PAYLOAD_LIMIT)
+        wide = parse_billing_change(payload)
+        touched = [wide.touches(key) for key in (JAN, FEB, EC2_FEB)]
+        self.assertEqual(touched, [False, True, True])
+        everything = parse_billing_change(billing_change_payload(10, None))
+        self.assertTrue(everything.touches(JAN))
+
+    def test_indexed_scopes_match_a_scan_of_every_scope(self) -> None:
+        days = [utc(2024, 1, day) for day in range(1, 29)]
+        scopes = [
+            (company, service, days[first], days[first + length])
+            for first, length, company, service in (
+                (0, 3, "cyberdyne", "s3"),
+                (2, 4, "cyberdyne", "s3"),
+                (6, 1, "cyberdyne", "s3"),
+                (10, 2, "cyberdyne", None),
+                (14, 1, None, "ec2"),
+                (20, 3, None, None),
+            )
+        ]
+        change = BillingChange(version=2, scopes=tuple(scopes))
+
+        for company in ("cyberdyne", "ingen"):
+            for service in ("s3", "ec2"):
+                for first in range(len(days) - 1):
+                    for last in range(first + 1, min(first + 4, len(days))):
+                        key = (company, service, days[first], days[last])
+                        scanned = any(
+                            scope[0] in (None, company)
+                            and scope[1] in (None, service)
+                            and scope[2] < key[3]
+                            and key[2] < scope[3]
+                            for scope in scopes
+                        )
+                        self.assertEqual(change.touches(key), scanned, key)
+
+    def test_cache_carries_untouched_entries_to_the_new_version(self) -> None:
+        cache = CheckinResultCache(max_entries=10, ttl_seconds=60)
+        cache.put(JAN, 7, Decimal("1.00"))
+        cache.put(FEB, 7, Decimal("2.00"))
+        cache.put(EC2_FEB, 6, Decimal("3.00"))
+        change = parse_billing_change(
+            billing_change_payload(
+                8, [("cyberdyne", "s3", utc(2024, 2, 10), utc(2024, 2, 12))]
+            )
+        )
+
+        apply_billing_change(change, cache, None)
+
+        self.assertEqual(cache.get(JAN, 8), Decimal("1.00"))
+        self.assertIsNone(cache.get(FEB, 8))
+        self.assertIsNone(cache.get(EC2_FEB, 8))
+
+        # Version 9 went unreported, so version 10 cannot reuse version 8.
+        nothing = parse_billing_change('{"version": 10, "scopes": []}')
+        apply_billing_change(nothing, cache, None)
+        self.assertIsNone(cache.get(JAN, 10))
+
+    def test_listener_ignores_malformed_notifications(self) -> None:
+        on_change = MagicMock()
+        listener = BillingChangeListener("postgresql://local", on_change)
+        self.assertIsNone(listener.version)
+
+        listener.handle("not json")
+        listener.handle('{"scopes": []}')
+        listener.handle('{"version": 3, "scopes": [["acme", "s3", "soon", "now"]]}')
+        on_change.assert_not_called()
+
+        listener.handle('{"version": 3, "scopes": null}')
+        self.assertEqual(on_change.call_args.args[0].version, 3)
+        self.assertEqual(listener.version, 3)
+
+    def test_only_database_backed_engines_are_reset(self) -> None:
+        database_engine = LazySpendEngine(Settings(database_url="postgresql://x"))
+        snapshot_engine = LazySpendEngine(
+            Settings(database_url="postgresql://x", spend_engine_snapshot="/tmp/s")
+        )
+        database_engine._engine = snapshot_engine._engine = object()
+        change = parse_billing_change('{"version": 2, "scopes": null}')
+
+        apply_billing_change(change, None, database_engine)
+        apply_billing_change(change, None, snapshot_engine)
+
+        self.assertIsNone(database_engine._engine)
+        self.assertIsNotNone(snapshot_engine._engine)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from backend.app import create_app
+from backend.app.commitments import CommitmentCatalog
+from backend.app.listing import (
+    InvalidCursor,
+    ListingQuery,
+    decode_cursor,
+    list_commitments_page,
+    parse_listing_query,
+)
+
+
+NOW = datetime(2024, 1, 15, tzinfo=timezone.utc)
+CURRENT = {"start": "2024-01-01 00:00:00", "end": "2024-02-01 00:00:00", "amount": 10}
+PAST = {"start": "2023-01-01 00:00:00", "end": "2023-02-01 00:00:00", "amount": 10}
+
+CATALOG = CommitmentCatalog(
+    [
+        {
+            "id": commitment_id,
+            "name": f"Commitment {commitment_id}",
+            "company": "cyberdyne",
+            "service": "s3" if commitment_id % 2 else "ec2",
+            "checkins": [CURRENT if commitment_id <= 3 else PAST],
+        }
+        for commitment_id in (6, 1, 4, 2, 5, 3)
+    ]
+)
+COMMITMENTS = CATALOG.for_company("cyberdyne")
+
+
+class RecordingEvaluator:
+    """Marks odd ids as met and records which commitments were evaluated."""
+
+    def __init__(self) -> None:
+        self.evaluated: list[int] = []
+
+    def __call__(self, commitments, *_args, **_kwargs):
+        self.evaluated += [item["id"] for item in commitments]
+        return [
+            {
+                "id": item["id"],
+                "name": item["name"],
+                "service": item["service"],
+                "met": bool(item["id"] % 2),
+                "checkins": item["checkins"],
+                "total_committed": 10.0,
+                "total_actual": 10.0 if item["id"] % 2 else 5.0,
+                "total_shortfall": 0.0 if item["id"] % 2 else 5.0,
+            }
+            for item in commitments
+        ]
+
+
+def page_ids(query: ListingQuery, evaluate=None):
+    page, cursor = list_commitments_page(
+        COMMITMENTS, query, evaluate or RecordingEvaluator(), NOW
+    )
+    return [item["id"] for item in page], cursor
+
+
+class ListCommitmentsPageTests(unittest.TestCase):
+    def test_cursor_walks_pages_in_id_order_evaluating_only_the_page(self) -> None:
+        evaluate = RecordingEvaluator()
+        first, cursor = page_ids(ListingQuery(limit=4), evaluate)
+        self.assertEqual(first, [1, 2, 3, 4])
+        self.assertEqual(evaluate.evaluated, [1, 2, 3, 4])
+
+        second, cursor = page_ids(
+            ListingQuery(limit=4, after=decode_cursor(cursor)), evaluate
+        )
+        self.assertEqual(second, [5, 6])
+        self.assertIsNone(cursor)
+
+    def test_met_filter_scans_forward_until_the_page_fills(self) -> None:
+        evaluate = RecordingEvaluator()
+        ids, cursor = page_ids(ListingQuery(limit=2, met=False), evaluate)
+
+        self.assertEqual(ids, [2, 4])
+        self.assertEqual(evaluate.evaluated, [1, 2, 3, 4])
+        self.assertEqual(decode_cursor(cursor), 4)
+
+    def test_catalog_filters_and_catalog_fields_skip_evaluation(self) -> None:
+        evaluate = RecordingEvaluator()
+        page, cursor = list_commitments_page(
+            COMMITMENTS,
+            ListingQuery(
+                service="s3", has_current_checkin=True, fields=("id", "service")
+            ),
+            evaluate,
+            NOW,
+        )
+
+        self.assertEqual(page, [{"id": 1, "service": "s3"}, {"id": 3, "service": "s3"}])
+        self.assertIsNone(cursor)
+        self.assertEqual(evaluate.evaluated, [])
+
+    def test_invalid_arguments_raise_value_error(self) -> None:
+        for args in (
+            {"limit": "0"},
+            {"limit": "501"},
+            {"met": "maybe"},
+            {"fields": "id,secret"},
+        ):
+            with self.assertRaises(ValueError):
+                parse_listing_query(args)
+        with self.assertRaises(InvalidCursor):
+            parse_listing_query({"cursor": "not-a-cursor"})
+        with self.assertRaises(InvalidCursor):
+            page_ids(ListingQuery(after="text-id"))
+
+
+class ListingRouteTests(unittest.TestCase):
+    @patch("backend.app.evaluate_commitments", side_effect=RecordingEvaluator())
+    @patch("backend.app.commitment_catalog", return_value=CATALOG)
+    def test_route_returns_page_and_next_cursor(self, _catalog, _evaluate) -> None:
+        client = create_app().test_client()
+
+        response = client.get(
+            "/api/companies/cyberdyne/commitments?limit=2&fields=id,met"
+        )
+        payload = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            payload["commitments"], [{"id": 1, "met": True}, {"id": 2, "met": False}]
+        )
+        self.assertIsNotNone(payload["next_cursor"])
+
+        response = client.get("/api/companies/cyberdyne/commitments?limit=abc")
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from psycopg.errors import UniqueViolation
+
+from backend.scripts.load_billing_data import (
+    CENTS_MONEY,
+    RollupScopes,
+    complete_rows_end,
+    copy_rows,
+    cost_in_cents,
+    iter_rows,
+    iter_rows_parallel,
+    parse_csv_chunk,
+    parse_fields_fast,
+    parse_row,
+    prefix_digest,
+    resume_offset,
+    rollup_rebuild,
+    stream_load,
+    upsert_rows,
+)
+from backend.tests.helpers import utc
+
+
+CSV_TEXT = (
+    "company,aws_service,datetime,gross_cost\n"
+    "cyberdyne,ec2,2024-01-01 00:00:00,224.86\n"
+    "cyberdyne,s3,2024-01-01 01:00:00,15\n"
+    "\n"
+    ' ingen ,"s3",2024-02-29 23:00:00,007.5\n'
+    "tyrell,s3,2024-03-01 00:00:00,1.005\n"
+    "tyrell,s3,2024-3-1 2:00:00, 1.50 \n"
+    "tyrell,s3,2024-03-01 03:00:00,1_000,extra\n"
+)
+
+
+class FakeCopy:
+    def __init__(self, conn: FakeCopyConnection, sql: str) -> None:
+        self.conn = conn
+        self.sql = sql
+        self.rows: list[tuple] = []
+
+    def set_types(self, types: list[str]) -> None:
+        self.conn.events.append(("types", types[-1]))
+
+    def write_row(self, row: tuple) -> None:
+        self.rows.append(row)
+
+
+class FakeCursor:
+    def __init__(self, conn: FakeCopyConnection) -> None:
+        self.conn = conn
+
+    def __enter__(self) -> FakeCursor:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    @contextmanager
+    def copy(self, sql: str):
+        copy = FakeCopy(self.conn, sql)
+        yield copy
+        self.conn.events.append(("copy", " ".join(sql.split()[:2]), len(copy.rows)))
+        if "billing_events_staging" in sql:
+            self.conn.staging.extend(copy.rows)
+            return
+        for company, service, event_time, cost in copy.rows:
+            if (company, service, event_time) in self.conn.table:
+                raise UniqueViolation("duplicate key value")
+            self.conn.table[(company, service, event_time)] = cost
+
+    def execute(self, sql: str, params: object = None) -> None:
+        self.conn.events.append(("execute", " ".join(sql.split())))
+        if "FROM billing_events_staging" in sql and "INSERT" in sql:
+            for company, service, event_time, cost in self.conn.staging:
+                self.conn.table[(company, service, event_time)] = cost
+        self.result = (1,) if "billing_data_version" in sql else (False,)
+
+    def fetchone(self) -> tuple:
+        return self.result
+
+
+class FakeCopyConnection:
+    """Records the COPY, statement and commit sequence a load issues.
+
+    ``table`` stands in for billing_events and its unique natural key; the
+    staging table is emptied on commit, like ``ON COMMIT DELETE ROWS``.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[tuple] = []
+        self.table: dict[tuple[str, str, datetime], object] = {}
+        self.staging: list[tuple] = []
+
+    def __enter__(self) -> FakeCopyConnection:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def commit(self) -> None:
+        self.events.append(("commit",))
+        self.staging.clear()
+
+
+class FastParserTests(unittest.TestCase):
+    def test_fast_path_matches_parse_row(self) -> None:
+        cases = [
+            ("cyberdyne", "ec2", "2024-01-01 00:00:00", "224.86"),
+            ("cyberdyne", "ec2", "2024-12-31 23:59:59", "0"),
+            (" ingen ", "s3 ", "2024-02-29 12:00:00", "007.5"),
+        ]
+        for company, service, raw_datetime, raw_cost in cases:
+            expected = parse_row(
+                {
+                    "company": company,
+                    "aws_service": service,
+                    "datetime": raw_datetime,
+                    "gross_cost": raw_cost,
+                }
+            )
+            parsed = parse_fields_fast(company, service, raw_datetime, raw_cost)
+            self.assertEqual(parsed, expected)
+            self.assertEqual(str(parsed[3]), str(expected[3]))
+
+    def test_fast_path_defers_unusual_values(self) -> None:
+        self.assertIsNone(parse_fields_fast("a", "b", "2024-02-30 00:00:00", "1"))
+        self.assertIsNone(parse_fields_fast("a", "b", "2024-3-1 2:00:00", "1"))
+        self.assertIsNone(parse_fields_fast("a", "b", "2024-01-01 00:00:00", "1.005"))
+        self.assertIsNone(parse_fields_fast("a", "b", "2024-01-01 00:00:00", "-1"))
+        self.assertIsNone(parse_fields_fast(" ", "b", "2024-01-01 00:00:00", "1"))
+
+    def test_chunked_parsing_matches_serial_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "billing.csv"
+            path.write_text(CSV_TEXT, encoding="utf-8")
+
+            expected = list(iter_rows(path))
+            parsed = list(iter_rows_parallel(path, workers=2, chunk_bytes=40))
+
+        self.assertEqual(len(parsed), 6)
+        self.assertEqual(parsed, expected)
+        self.assertEqual(
+            [str(row[3]) for row in parsed], [str(row[3]) for row in expected]
+        )
+
+    def test_cents_parsing_matches_decimal_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "billing.csv"
+            path.write_text(CSV_TEXT, encoding="utf-8")
+
+            expected = [cost_in_cents(row) for row in iter_rows(path)]
+            parsed = list(iter_rows_parallel(path, workers=1, cents=True))
+
+        self.assertEqual(parsed, expected)
+        self.assertEqual(
+            [row[3] for row in parsed], [22486, 1500, 750, 100, 150, 100000]
+        )
+        self.assertTrue(all(type(row[3]) is int for row in parsed))
+
+    def test_chunk_validation_errors_match_parse_row(self) -> None:
+        fieldnames = ["company", "aws_service", "datetime", "gross_cost"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "billing.csv"
+            path.write_text("acme,ec2,2024-13-01 00:00:00,1\n", encoding="utf-8")
+
+            with self.assertRaisesRegex(ValueError, "Invalid datetime: 2024-13-01"):
+                parse_csv_chunk(str(path), fieldnames, 0, path.stat().st_size)
+
+    def test_invalid_rows_past_the_limit_are_never_reported(self) -> None:
+        text = CSV_TEXT + "acme,ec2,2024-13-01 00:00:00,1\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "billing.csv"
+            path.write_text(text, encoding="utf-8")
+
+            for workers in (1, 2):
+                limited = list(iter_rows_parallel(path, workers, limit=6))
+                self.assertEqual(limited, list(iter_rows(path, limit=6)))
+                with self.assertRaisesRegex(ValueError, "Invalid datetime"):
+                    list(iter_rows_parallel(path, workers, limit=7))
+            with self.assertRaisesRegex(ValueError, "Invalid datetime"):
+                list(iter_rows(path, limit=7))
+
+
+class StreamingCopyTests(unittest.TestCase):
+    ROWS = [
+        ("cyberdyne", "s3", utc(2024, 1, 1, hour), Decimal("1.00"))
+        for hour in range(5)
+    ]
+
+    def test_copy_commits_every_batch_and_reports_progress(self) -> None:
+        conn = FakeCopyConnection()
+        progress: list[str] = []
+
+        copied = copy_rows(conn, iter(self.ROWS), batch_size=2, report=progress.append)
+
+        self.assertEqual(copied, 5)
+        copies = [event for event in conn.events if event[0] == "copy"]
+        self.assertEqual([event[2] for event in copies], [2, 2, 1])
+        self.assertEqual(conn.events.count(("commit",)), 3)
+        self.assertEqual(conn.events[-1], ("commit",))
+        self.assertEqual(
+            [line.split(" in ")[0] for line in progress],
+            ["Copied 2 row(s)", "Copied 4 row(s)", "Copied 5 row(s)"],
+        )
+        with self.assertRaises(ValueError):
+            copy_rows(conn, [], batch_size=0)
+
+    def test_exact_multiple_ends_with_an_empty_committed_batch(self) -> None:
+        conn = FakeCopyConnection()
+
+        copied = copy_rows(conn, self.ROWS[:4], batch_size=2, report=lambda _: None)
+
+        self.assertEqual(copied, 4)
+        copies = [event[2] for event in conn.events if event[0] == "copy"]
+        self.assertEqual(copies, [2, 2, 0])
+        self.assertEqual(conn.events.count(("commit",)), 3)
+
+    def test_upsert_merges_each_batch_after_its_copy_before_commit(self) -> None:
+        conn = FakeCopyConnection()
+
+        upsert_rows(
+            conn,
+            [cost_in_cents(row) for row in self.ROWS[:3]],
+            batch_size=2,
+            report=lambda _: None,
+            money=CENTS_MONEY,
+        )
+
+        batches = [
+            event[0] if event[0] != "execute" else event[1].split()[0]
+            for event in conn.events
+            if event[0] in {"copy", "commit"} or event[1].startswith("INSERT")
+        ]
+        self.assertEqual(
+            batches, ["copy", "INSERT", "commit", "copy", "INSERT", "commit"]
+        )
+        self.assertIn(("types", "int8"), conn.events)
+        merge = next(event[1] for event in conn.events if "INSERT" in event[1])
+        self.assertIn("gross_cost_cents = EXCLUDED.gross_cost_cents", merge)
+        staging = [event for event in conn.events if event[0] == "copy"]
+        self.assertEqual(
+            {event[1] for event in staging}, {"COPY billing_events_staging"}
+        )
+
+    def test_rerunning_a_stream_load_upserts_instead_of_failing(self) -> None:
+        conn = FakeCopyConnection()
+        args = SimpleNamespace(
+            dry_run=False, truncate=False, workers=1, limit=0, batch_size=2
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "billing.csv"
+            path.write_text(CSV_TEXT, encoding="utf-8")
+            with patch.dict("os.environ", {"DATABASE_URL": "postgresql://x"}), patch(
+                "backend.scripts.load_billing_data.psycopg.connect",
+                return_value=conn,
+            ), patch("builtins.print"):
+                stream_load(path, args)
+                first = dict(conn.table)
+                path.write_text(
+                    CSV_TEXT.replace("224.86", "224.87"), encoding="utf-8"
+                )
+                stream_load(path, args)
+            rows = list(iter_rows(path))
+
+        self.assertEqual(len(first), 6)
+        self.assertEqual(conn.table.keys(), first.keys())
+        changed = ("cyberdyne", "ec2", utc(2024, 1, 1))
+        self.assertEqual(conn.table[changed], Decimal("224.87"))
+        with self.assertRaises(UniqueViolation):
+            copy_rows(conn, rows, report=lambda _: None)
+
+    def test_rollup_scopes_cover_whole_days_per_series(self) -> None:
+        tracker = RollupScopes()
+        rows = [
+            ("cyberdyne", "s3", utc(2024, 1, 2, 5), 1),
+            ("cyberdyne", "s3", utc(2024, 1, 1, 23), 1),
+            ("cyberdyne", "s3", utc(2024, 1, 3, 0, 30), 1),
+            ("ingen", "ec2", utc(2024, 2, 1, 12), 1),
+        ]
+
+        self.assertEqual(list(tracker.track(iter(rows))), rows)
+
+        self.assertEqual(
+            sorted(tracker.scopes()),
+            [
+                ("cyberdyne", "s3", utc(2024, 1, 1), utc(2024, 1, 4)),
+                ("ingen", "ec2", utc(2024, 2, 1), utc(2024, 2, 2)),
+            ],
+        )
+        self.assertEqual(tracker.max_event_time(), utc(2024, 2, 1, 12))
+        self.assertIsNone(RollupScopes().max_event_time())
+
+    def test_rollup_rebuild_replaces_every_bucket_and_bumps_the_version(
+        self,
+    ) -> None:
+        conn = FakeCopyConnection()
+        with patch(
+            "backend.scripts.load_billing_data.psycopg.connect", return_value=conn
+        ), patch("builtins.print"):
+            rollup_rebuild("postgresql://x")
+
+        statements = [event[1] for event in conn.events if event[0] == "execute"]
+        self.assertEqual(statements[1], "TRUNCATE TABLE billing_rollups")
+        self.assertTrue(statements[2].startswith("INSERT INTO billing_rollups"))
+        self.assertIn("FROM billing_events CROSS JOIN", statements[2])
+        self.assertIn("billing_data_version", statements[3])
+        self.assertIn("pg_notify", statements[4])
+        self.assertEqual(conn.events[-1], ("commit",))
+        with self.assertRaises(RuntimeError):
+            rollup_rebuild("sqlite:///billing.db")
+
+
+class IncrementalWatermarkTests(unittest.TestCase):
+    def test_resumes_after_last_complete_row_of_appended_file(self) -> None:
+        header_and_first = (
+            "company,aws_service,datetime,gross_cost\n"
+            "cyberdyne,ec2,2024-01-01 00:00:00,1.00\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "billing.csv"
+            path.write_text(
+                header_and_first + "cyberdyne,ec2,2024-01-01 01:", encoding="utf-8"
+            )
+
+            offset = complete_rows_end(path)
+            self.assertEqual(offset, len(header_and_first))
+            watermark = (offset, offset, prefix_digest(path, offset))
+
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write("00:00,2.00\ncyberdyne,ec2,2024-01-01 02:00:00,3.00\n")
+
+            start = resume_offset(path, watermark)
+            self.assertEqual(start, offset)
+            appended = list(
+                iter_rows_parallel(path, 1, start=start, end=complete_rows_end(path))
+            )
+
+        self.assertEqual([str(row[3]) for row in appended], ["2.00", "3.00"])
+
+    def test_replaced_file_is_read_from_the_start(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "billing.csv"
+            path.write_text(CSV_TEXT, encoding="utf-8")
+            offset = complete_rows_end(path)
+            watermark = (offset, offset, prefix_digest(path, offset))
+
+            path.write_text(CSV_TEXT.replace("224.86", "224.87"), encoding="utf-8")
+            self.assertIsNone(resume_offset(path, watermark))
+
+            path.write_text(CSV_TEXT[:20], encoding="utf-8")
+            self.assertIsNone(resume_offset(path, watermark))
+
+
+if __name__ == "__main__":
+    unittest.main()
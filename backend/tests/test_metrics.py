@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from backend.app import create_app
+from backend.app.commitments import CommitmentCatalog
+from backend.app.config import Settings
+from backend.app.metrics import (
+    MetricsRegistry,
+    RequestTimings,
+    TimedCursor,
+    current_timings,
+    end_request_timings,
+    instrumented,
+    start_request_timings,
+)
+from backend.tests.helpers import fake_evaluate
+
+
+CATALOG = CommitmentCatalog(
+    [
+        {
+            "id": 1,
+            "name": "S3 commitment",
+            "company": "cyberdyne",
+            "service": "s3",
+            "checkins": [],
+        }
+    ]
+)
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_render_emits_cumulative_histogram_counters_and_gauges(self) -> None:
+        registry = MetricsRegistry()
+        for elapsed, queries in ((0.003, 1), (0.2, 3)):
+            timings = RequestTimings(started=0.0, db_queries=queries, db_seconds=0.01)
+            with patch.object(RequestTimings, "elapsed", return_value=elapsed):
+                registry.observe("GET", "/api/companies", 200, timings)
+
+        text = registry.render(
+            {
+                "db_pool": {"size": 4, "in_use": 1, "requests": 9, "wait_ms_total": 12},
+                "result_cache": None,
+            }
+        )
+        labels = 'method="GET",route="/api/companies"'
+
+        bucket = "commitments_http_request_duration_seconds_bucket"
+        self.assertIn(f'{bucket}{{{labels},le="0.005"}} 1', text)
+        self.assertIn(f'{bucket}{{{labels},le="0.1"}} 1', text)
+        self.assertIn(f'{bucket}{{{labels},le="0.25"}} 2', text)
+        self.assertIn(f'{bucket}{{{labels},le="+Inf"}} 2', text)
+        self.assertIn(f"commitments_db_queries_total{{{labels}}} 4", text)
+        self.assertIn(
+            f'commitments_http_requests_total{{{labels},status="200"}} 2', text
+        )
+        self.assertIn("# TYPE commitments_db_pool_in_use gauge", text)
+        self.assertIn("commitments_db_pool_in_use 1", text)
+        self.assertIn("# TYPE commitments_db_pool_requests_total counter", text)
+        self.assertIn("commitments_db_pool_requests_total 9", text)
+        self.assertIn("# TYPE commitments_db_pool_wait_ms_total counter", text)
+        self.assertNotIn("wait_ms_total_total", text)
+        self.assertNotIn("result_cache", text)
+
+
+class InstrumentedConnectionTests(unittest.TestCase):
+    def test_cursor_factory_is_swapped_only_inside_measured_request(self) -> None:
+        conn = SimpleNamespace(cursor_factory=object)
+
+        with instrumented(conn):
+            self.assertIs(conn.cursor_factory, object)
+
+        token = start_request_timings()
+        try:
+            with instrumented(conn):
+                self.assertIs(conn.cursor_factory, TimedCursor)
+        finally:
+            end_request_timings(token)
+
+        self.assertIs(conn.cursor_factory, object)
+        self.assertIsNone(current_timings())
+
+
+class MetricsRoutesTests(unittest.TestCase):
+    @patch("backend.app.evaluate_commitment", side_effect=fake_evaluate)
+    @patch("backend.app.commitment_catalog", return_value=CATALOG)
+    def test_server_timing_header_and_metrics_endpoint(self, _catalog, _evaluate):
+        with patch("backend.app.Settings", return_value=Settings(metrics_enabled=True)):
+            client = create_app().test_client()
+
+        response = client.get("/api/companies/cyberdyne/commitments/1")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=4.00;desc="2 queries"', response.headers["Server-Timing"])
+        self.assertIn("total;dur=", response.headers["Server-Timing"])
+
+        metrics = client.get("/api/metrics")
+        text = metrics.get_data(as_text=True)
+        self.assertEqual(metrics.status_code, 200)
+        self.assertTrue(metrics.content_type.startswith("text/plain"))
+        self.assertIn(
+            'commitments_db_queries_total{method="GET",'
+            'route="/api/companies/<company>/commitments/<int:commitment_id>"} 2',
+            text,
+        )
+        self.assertIsNone(current_timings())
+
+    @patch("backend.app.commitment_catalog", return_value=CATALOG)
+    def test_metrics_disabled_adds_no_header_or_endpoint(self, _catalog) -> None:
+        with patch(
+            "backend.app.Settings", return_value=Settings(metrics_enabled=False)
+        ):
+            client = create_app().test_client()
+
+        response = client.get("/api/companies/unknown/commitments")
+        self.assertNotIn("Server-Timing", response.headers)
+        self.assertEqual(client.get("/api/metrics").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from backend.app import create_app
+from backend.app.columnar import ColumnarSpendEngine, np
+from backend.app.optimizer import (
+    CADENCES,
+    cadence_windows,
+    optimize_commitment,
+    parse_optimizer_query,
+)
+from backend.tests.helpers import utc
+
+
+# Monthly spend of 100, 200, ..., 1200 dollars across 2024.
+MONTHLY_CENTS = [(month, month * 10_000) for month in range(1, 13)]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class CommitmentOptimizerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = ColumnarSpendEngine.from_rows(
+            [
+                ("cyberdyne", "s3", int(utc(2024, month, 15).timestamp()), cents)
+                for month, cents in MONTHLY_CENTS
+            ]
+        )
+
+    def optimize(self, **args: str) -> dict:
+        query = parse_optimizer_query(
+            {"start": "2024-01-01", "end": "2025-01-01", **args}, utc(2026, 1, 1)
+        )
+        return optimize_commitment("cyberdyne", "s3", query, "", engine=self.engine)
+
+    def test_curve_matches_a_per_amount_evaluation(self) -> None:
+        result = self.optimize(cadence="month,quarter", candidates="50")
+        month = result["cadences"][0]
+
+        spend = [cents / 100 for _, cents in MONTHLY_CENTS]
+        for amount, met_ratio, shortfall in zip(
+            month["curve"]["amount"],
+            month["curve"]["met_ratio"],
+            month["curve"]["expected_shortfall"],
+        ):
+            self.assertAlmostEqual(
+                met_ratio, sum(value >= amount for value in spend) / 12, places=4
+            )
+            self.assertAlmostEqual(
+                shortfall,
+                sum(max(amount - value, 0) for value in spend) / 12,
+                delta=0.0051,
+            )
+        self.assertEqual(month["curve"]["amount"][-1], 1200.0)
+        self.assertEqual(result["cadences"][1]["periods"], 10)
+
+    def test_recommended_amount_is_exact_and_annual_amount_picks_a_cadence(
+        self,
+    ) -> None:
+        result = self.optimize(
+            cadence="month,year", target="0.75", annual_amount="6000"
+        )
+        month, year = result["cadences"]
+
+        # Nine of twelve months spent at least $400.
+        self.assertEqual(month["recommended"]["amount"], 400.0)
+        self.assertEqual(month["recommended"]["met_ratio"], 0.75)
+        self.assertEqual(year["recommended"]["amount"], 7800.0)
+        # $500 a month misses January to April by 1000 in all; a $6000 year
+        # clears the $7800 spent.
+        self.assertEqual(month["at_annual_amount"]["expected_annual_shortfall"], 1000.0)
+        self.assertEqual(year["at_annual_amount"]["expected_annual_shortfall"], 0.0)
+        self.assertEqual(result["best_cadence"], "year")
+
+    def test_unknown_series_has_no_result(self) -> None:
+        query = parse_optimizer_query({"start": "2024-01-01"}, utc(2025, 1, 1))
+
+        self.assertIsNone(
+            optimize_commitment("cyberdyne", "rds", query, "", engine=self.engine)
+        )
+
+    def test_windows_and_query_validation(self) -> None:
+        weeks = cadence_windows(CADENCES["week"], utc(2024, 1, 1), utc(2024, 1, 15))
+        self.assertEqual(len(weeks), 8)
+        quarters = cadence_windows(
+            CADENCES["quarter"], utc(2024, 1, 2), utc(2024, 7, 1)
+        )
+        self.assertEqual(
+            quarters,
+            [
+                (utc(2024, 2, 1), utc(2024, 5, 1)),
+                (utc(2024, 3, 1), utc(2024, 6, 1)),
+                (utc(2024, 4, 1), utc(2024, 7, 1)),
+            ],
+        )
+
+        for args in (
+            {},
+            {"start": "2024-13-01"},
+            {"start": "2024-01-01", "end": "2023-01-01"},
+            {"start": "2010-01-01"},
+            {"start": "2024-01-01", "cadence": "fortnight"},
+            {"start": "2024-01-01", "target": "0"},
+            {"start": "2024-01-01", "candidates": "1"},
+            {"start": "2024-01-01", "annual_amount": "-5"},
+            {"start": "2024-01-01", "annual_amount": "1e40"},
+            {"start": "2024-01-01", "annual_amount": "92233720368547758.08"},
+            {"start": "2024-01-01", "annual_amount": "NaN"},
+        ):
+            with self.assertRaises(ValueError):
+                parse_optimizer_query(args, utc(2025, 1, 1))
+
+
+class OptimizerRouteTests(unittest.TestCase):
+    def test_overflowing_annual_amount_is_a_bad_request(self) -> None:
+        client = create_app().test_client()
+
+        response = client.get(
+            "/api/companies/cyberdyne/services/s3/optimize"
+            "?start=2024-01-01&annual_amount=1e40"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("annual_amount", response.get_json()["error"])
+
+    def test_unknown_series_is_not_found(self) -> None:
+        client = create_app().test_client()
+
+        with patch("backend.app.optimize_commitment", return_value=None):
+            response = client.get(
+                "/api/companies/cyberdyne/services/rds/optimize?start=2024-01-01"
+            )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("rds", response.get_json()["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+import unittest
+from unittest.mock import patch
+
+from backend.app import create_app
+from backend.app.commitments import CommitmentCatalog
+from backend.app.config import Settings
+
+TOKEN = "s3cret"
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+
+def busy_evaluation_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def make_client(profiling_token: str):
+    settings = Settings(
+        database_url="",
+        profiling_token=profiling_token,
+        metrics_enabled=False,
+        compression_min_bytes=0,
+    )
+    with patch("backend.app.Settings", return_value=settings):
+        return create_app().test_client()
+
+
+class ProfilingTests(unittest.TestCase):
+    def test_endpoint_is_opt_in_and_token_gated(self) -> None:
+        self.assertEqual(make_client("").get("/api/debug/profile").status_code, 404)
+
+        client = make_client(TOKEN)
+        for headers in ({}, {"Authorization": "Bearer wrong"}):
+            response = client.get("/api/debug/profile?seconds=0.01", headers=headers)
+            self.assertEqual(response.status_code, 401)
+        response = client.get("/api/debug/profile?seconds=120", headers=AUTH)
+        self.assertEqual(response.status_code, 400)
+
+    def test_sampling_returns_collapsed_stacks_of_other_threads(self) -> None:
+        stop = threading.Event()
+        worker = threading.Thread(
+            target=busy_evaluation_loop, args=(stop,), name="busy-worker"
+        )
+        worker.start()
+        try:
+            response = make_client(TOKEN).get(
+                "/api/debug/profile?seconds=0.1&interval=0.01&match=busy_evaluation",
+                headers=AUTH,
+            )
+        finally:
+            stop.set()
+            worker.join()
+
+        self.assertEqual(response.status_code, 200)
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertTrue(stack.startswith("busy-worker;"))
+        self.assertIn("busy_evaluation_loop (test_profiling.py:", stack)
+        self.assertGreater(int(count), 0)
+        self.assertNotIn("sample_stacks", response.get_data(as_text=True))
+
+    def test_profile_header_returns_a_cprofile_report(self) -> None:
+        client = make_client(TOKEN)
+        plain = client.get("/api/health", headers={"X-Profile": "1"})
+        self.assertEqual(plain.mimetype, "application/json")
+
+        profiled = client.get("/api/health", headers={"X-Profile": "1", **AUTH})
+        self.assertEqual(profiled.status_code, 200)
+        self.assertEqual(profiled.mimetype, "text/plain")
+        self.assertEqual(profiled.headers["X-Profile-Content-Type"], "application/json")
+        self.assertIn("function calls", profiled.get_data(as_text=True))
+        self.assertIn("health", profiled.get_data(as_text=True))
+
+    @patch("backend.app.list_companies_from_db", return_value=["acme"])
+    @patch("backend.app.billing_data_token", return_value="db:1")
+    @patch("backend.app.commitment_catalog", return_value=CommitmentCatalog([]))
+    def test_profiled_not_modified_response_is_a_200_report(self, *_mocks) -> None:
+        client = make_client(TOKEN)
+        etag = client.get("/api/companies").headers["ETag"]
+        conditional = {"If-None-Match": etag}
+        self.assertEqual(
+            client.get("/api/companies", headers=conditional).status_code, 304
+        )
+
+        profiled = client.get(
+            "/api/companies", headers={"X-Profile": "1", **conditional, **AUTH}
+        )
+        self.assertEqual(profiled.status_code, 200)
+        self.assertEqual(profiled.headers["X-Profile-Status"], "304")
+        self.assertNotIn("ETag", profiled.headers)
+        self.assertIn("function calls", profiled.get_data(as_text=True))
+
+        head = client.head("/api/companies", headers={"X-Profile": "1", **AUTH})
+        self.assertEqual(head.status_code, 200)
+        self.assertEqual(head.mimetype, "application/json")
+
+        # The profiler lock was released on every path.
+        self.assertEqual(
+            client.get("/api/health", headers={"X-Profile": "1", **AUTH}).status_code,
+            200,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import MagicMock
+
+from backend.app.repository import rollup_segments, sum_spend_for_stored_checkins
+from backend.tests.helpers import utc
+
+
+class RollupSegmentsTests(unittest.TestCase):
+    def test_month_window_is_answered_from_daily_buckets(self) -> None:
+        segments = rollup_segments(utc(2024, 1, 1), utc(2024, 2, 1))
+
+        self.assertEqual(segments, [("day", utc(2024, 1, 1), utc(2024, 2, 1))])
+
+    def test_ragged_edges_use_hourly_buckets_then_raw_rows(self) -> None:
+        segments = rollup_segments(utc(2024, 1, 1, 22, 30), utc(2024, 1, 4, 3, 15))
+
+        self.assertEqual(
+            segments,
+            [
+                ("hour", utc(2024, 1, 1, 23), utc(2024, 1, 2)),
+                ("day", utc(2024, 1, 2), utc(2024, 1, 4)),
+                ("hour", utc(2024, 1, 4), utc(2024, 1, 4, 3)),
+                ("raw", utc(2024, 1, 1, 22, 30), utc(2024, 1, 1, 23)),
+                ("raw", utc(2024, 1, 4, 3), utc(2024, 1, 4, 3, 15)),
+            ],
+        )
+
+    def test_sub_day_and_sub_hour_windows(self) -> None:
+        self.assertEqual(
+            rollup_segments(utc(2024, 1, 1, 5), utc(2024, 1, 1, 9)),
+            [("hour", utc(2024, 1, 1, 5), utc(2024, 1, 1, 9))],
+        )
+        self.assertEqual(
+            rollup_segments(utc(2024, 1, 1, 5, 10), utc(2024, 1, 1, 5, 50)),
+            [("raw", utc(2024, 1, 1, 5, 10), utc(2024, 1, 1, 5, 50))],
+        )
+        self.assertEqual(rollup_segments(utc(2024, 1, 2), utc(2024, 1, 1)), [])
+
+
+class StoredCheckinSpendTests(unittest.TestCase):
+    def test_repeated_commitment_keys_are_sent_once(self) -> None:
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [("acme", 1, 0, 250)]
+
+        totals = sum_spend_for_stored_checkins(
+            conn, [("acme", 2), ("acme", 1), ("acme", 2)], cents=True
+        )
+
+        self.assertEqual(cursor.execute.call_args[0][1], (["acme", "acme"], [1, 2]))
+        self.assertEqual(totals, {("acme", 1, 0): 250})
+
+
+if __name__ == "__main__":
+    unittest.main()
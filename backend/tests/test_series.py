@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from backend.app import create_app
+from backend.app.commitments import CommitmentCatalog, prepare_commitment
+from backend.app.series import commitment_series, default_checkin_index, series_step
+from backend.tests.helpers import utc
+
+
+COMMITMENT = {
+    "id": 1,
+    "name": "S3 commitment",
+    "company": "cyberdyne",
+    "service": "s3",
+    "checkins": [
+        {"start": "2024-01-01 00:00:00", "end": "2024-01-04 00:00:00", "amount": 300},
+        {"start": "2024-01-04 00:00:00", "end": "2024-02-01 00:00:00", "amount": 900},
+    ],
+}
+
+
+class SeriesStepTests(unittest.TestCase):
+    def test_step_never_yields_more_than_requested_points(self) -> None:
+        start = utc(2024, 1, 1)
+        for end, points in (
+            (utc(2024, 2, 1), 100),
+            (utc(2025, 1, 1), 7),
+            (utc(2024, 1, 1, 0, 30), 1000),
+        ):
+            step = series_step(start, end, points)
+            buckets = -(-(end - start) // step)
+            self.assertLessEqual(buckets, points)
+            self.assertEqual(step % timedelta(minutes=1), timedelta(0))
+
+    def test_default_checkin_is_current_then_latest_started(self) -> None:
+        checkins = prepare_commitment(COMMITMENT)["checkins"]
+
+        self.assertEqual(default_checkin_index(checkins, utc(2024, 1, 2)), 0)
+        self.assertEqual(default_checkin_index(checkins, utc(2024, 1, 9)), 1)
+        self.assertEqual(default_checkin_index(checkins, utc(2025, 1, 1)), 1)
+        self.assertEqual(default_checkin_index(checkins, utc(2023, 1, 1)), 0)
+
+
+class CommitmentSeriesTests(unittest.TestCase):
+    @patch("backend.app.backends.spend_series")
+    @patch("backend.app.backends.connection")
+    def test_series_adds_committed_pace_to_database_buckets(
+        self, connect_mock, spend_series_mock
+    ) -> None:
+        sentinel_conn = object()
+        connect_mock.return_value.__enter__.return_value = sentinel_conn
+        spend_series_mock.return_value = [
+            (utc(2024, 1, 1), Decimal("120.00"), Decimal("120.00")),
+            (utc(2024, 1, 2), Decimal("80.50"), Decimal("200.50")),
+            (utc(2024, 1, 3), Decimal("0.00"), Decimal("200.50")),
+        ]
+
+        series = commitment_series(
+            COMMITMENT, "postgresql://local", points=3, checkin_index=0
+        )
+
+        spend_series_mock.assert_called_once_with(
+            sentinel_conn,
+            "cyberdyne",
+            "s3",
+            utc(2024, 1, 1),
+            utc(2024, 1, 4),
+            timedelta(days=1),
+            cents=False,
+        )
+        self.assertEqual(series["bucket_seconds"], 86400)
+        self.assertEqual(series["checkin"]["committed_amount"], 300.0)
+        self.assertEqual(
+            series["points"][1],
+            {
+                "start": "2024-01-02 00:00:00",
+                "end": "2024-01-03 00:00:00",
+                "amount": 80.5,
+                "cumulative": 200.5,
+                "committed_pace": 200.0,
+            },
+        )
+        self.assertEqual(series["points"][2]["committed_pace"], 300.0)
+
+    @patch("backend.app.backends.spend_series")
+    @patch("backend.app.backends.connection")
+    def test_buckets_in_a_non_utc_session_timezone_are_reported_in_utc(
+        self, connect_mock, spend_series_mock
+    ) -> None:
+        connect_mock.return_value.__enter__.return_value = object()
+        new_york = timezone(timedelta(hours=-5))
+        spend_series_mock.return_value = [
+            (datetime(2023, 12, 31, 19, tzinfo=new_york), Decimal("1"), Decimal("1")),
+            (datetime(2024, 1, 1, 19, tzinfo=new_york), Decimal("1"), Decimal("2")),
+            (datetime(2024, 1, 2, 19, tzinfo=new_york), Decimal("1"), Decimal("3")),
+        ]
+
+        series = commitment_series(
+            COMMITMENT, "postgresql://local", points=3, checkin_index=0
+        )
+
+        self.assertEqual(
+            [(point["start"], point["end"]) for point in series["points"]],
+            [
+                ("2024-01-01 00:00:00", "2024-01-02 00:00:00"),
+                ("2024-01-02 00:00:00", "2024-01-03 00:00:00"),
+                ("2024-01-03 00:00:00", "2024-01-04 00:00:00"),
+            ],
+        )
+
+    def test_unknown_checkin_raises_index_error(self) -> None:
+        with self.assertRaises(IndexError):
+            commitment_series(COMMITMENT, "postgresql://local", checkin_index=5)
+
+
+class SeriesRouteTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = create_app().test_client()
+
+    @patch("backend.app.commitment_catalog")
+    def test_points_are_validated(self, commitment_catalog_mock) -> None:
+        commitment_catalog_mock.return_value = CommitmentCatalog([COMMITMENT])
+
+        for query in ("points=0", "points=1001", "points=abc"):
+            response = self.client.get(
+                f"/api/companies/cyberdyne/commitments/1/series?{query}"
+            )
+            self.assertEqual(response.status_code, 400)
+
+    @patch("backend.app.commitment_series")
+    @patch("backend.app.commitment_catalog")
+    def test_series_route_returns_series_and_maps_unknown_checkin(
+        self, commitment_catalog_mock, commitment_series_mock
+    ) -> None:
+        commitment_catalog_mock.return_value = CommitmentCatalog([COMMITMENT])
+        commitment_series_mock.return_value = {"id": 1, "points": []}
+
+        response = self.client.get(
+            "/api/companies/cyberdyne/commitments/1/series?points=50&checkin=1"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["series"], {"id": 1, "points": []})
+        self.assertEqual(commitment_series_mock.call_args.kwargs["points"], 50)
+        self.assertEqual(commitment_series_mock.call_args.kwargs["checkin_index"], 1)
+
+        commitment_series_mock.side_effect = IndexError(9)
+        response = self.client.get(
+            "/api/companies/cyberdyne/commitments/1/series?checkin=9"
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
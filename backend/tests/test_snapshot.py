@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from array import array
+from pathlib import Path
+
+from backend.app.columnar import ColumnarSpendEngine, LazySpendEngine, np
+from backend.app.config import Settings
+from backend.app.snapshot import InvalidSnapshot, open_snapshot
+from backend.scripts.load_billing_data import sort_series, write_snapshot
+from backend.tests.helpers import epoch, utc
+
+
+ROWS = [
+    ("cyberdyne", "s3", epoch(2024, 1, 31, 23), 10_000),
+    ("cyberdyne", "s3", epoch(2024, 1, 1), 25_050),
+    ("cyberdyne", "s3", epoch(2024, 2, 1), 99),
+    ("cyberdyne", "ec2", epoch(2024, 1, 15), 500_000),
+    ("ingen", "s3", epoch(2024, 1, 15), 7),
+    ("ingen", "lambda", epoch(2023, 12, 31), 3),
+]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class BillingSnapshotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "billing.snapshot"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_mapped_snapshot_answers_like_an_engine_built_from_rows(self) -> None:
+        self.assertEqual(write_snapshot(self.path, ROWS, data_version=7), (4, 6))
+        snapshot = open_snapshot(self.path)
+        mapped = ColumnarSpendEngine.from_snapshot(snapshot)
+        built = ColumnarSpendEngine.from_rows(ROWS)
+
+        windows = [
+            (company, service, start, end)
+            for company in ("cyberdyne", "ingen", "acme")
+            for service in ("s3", "ec2", "lambda")
+            for start, end in (
+                (utc(2023, 1, 1), utc(2025, 1, 1)),
+                (utc(2024, 1, 1), utc(2024, 2, 1)),
+                (utc(2024, 2, 1), utc(2024, 3, 1)),
+            )
+        ]
+        self.assertEqual(
+            mapped.sum_cents_for_company_windows(windows),
+            built.sum_cents_for_company_windows(windows),
+        )
+        self.assertEqual(snapshot.header.data_version, 7)
+        self.assertTrue(snapshot.signature.startswith("7:"))
+        self.assertFalse(snapshot.series[("cyberdyne", "s3")][0].flags.writeable)
+
+    def test_truncated_or_foreign_files_are_rejected(self) -> None:
+        write_snapshot(self.path, ROWS)
+        data = self.path.read_bytes()
+
+        self.path.write_bytes(data[:-8])
+        with self.assertRaises(InvalidSnapshot):
+            open_snapshot(self.path)
+
+        self.path.write_bytes(b"company,aws_service" + data[19:])
+        with self.assertRaises(InvalidSnapshot):
+            open_snapshot(self.path)
+
+    def test_lazy_engine_prefers_the_snapshot(self) -> None:
+        write_snapshot(self.path, ROWS, data_version=3)
+        engine = LazySpendEngine(
+            Settings(spend_engine_snapshot=str(self.path), database_url="")
+        )
+
+        self.assertTrue(engine.version().startswith("snapshot:3:"))
+        self.assertEqual(
+            engine.get().sum_cents_for_windows(
+                "cyberdyne", [("s3", utc(2024, 1, 1), utc(2024, 2, 1))]
+            ),
+            [35_050],
+        )
+
+    def test_only_unordered_series_are_sorted(self) -> None:
+        timestamps, costs = array("q", [1, 2, 2, 5]), array("q", [10, 20, 30, 40])
+        self.assertIs(sort_series(timestamps, costs)[0], timestamps)
+
+        resorted = sort_series(array("q", [5, 1, 2, 1]), array("q", [1, 2, 3, 4]))
+        self.assertEqual(
+            [list(column) for column in resorted], [[1, 1, 2, 5], [2, 4, 3, 1]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
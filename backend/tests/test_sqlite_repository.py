@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import patch
+
+from backend.app import create_app
+from backend.app.asgi import AsyncCommitmentsApp
+from backend.app.backends import (
+    check_backend_settings,
+    list_companies_from_db,
+    open_repository,
+)
+from backend.app.columnar import ColumnarSpendEngine, np
+from backend.app.config import Settings
+from backend.app.evaluation import evaluate_commitments
+from backend.app.series import commitment_series
+from backend.scripts.load_billing_data import SQLITE_SCHEMA_PATH, upsert_sqlite_rows
+from backend.tests.helpers import utc
+
+
+ROWS = [
+    ("cyberdyne", "s3", utc(2024, 1, 1, 0), 1050),
+    ("cyberdyne", "s3", utc(2024, 1, 31, 23), 200),
+    ("cyberdyne", "s3", utc(2024, 2, 1, 0), 7),
+    ("cyberdyne", "ec2", utc(2024, 1, 5), 999),
+    ("acme", "s3", utc(2024, 1, 5), 1),
+]
+
+COMMITMENT = {
+    "id": 1,
+    "name": "S3 commitment",
+    "company": "cyberdyne",
+    "service": "s3",
+    "checkins": [
+        {
+            "start": "2024-01-01 00:00:00",
+            "end": "2024-02-01 00:00:00",
+            "amount": 10,
+        }
+    ],
+}
+
+
+class SqliteRepositoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        path = Path(self.tmp.name) / "billing.db"
+        conn = sqlite3.connect(path)
+        conn.executescript(SQLITE_SCHEMA_PATH.read_text(encoding="utf-8"))
+        upsert_sqlite_rows(conn, ROWS, batch_size=2)
+        # Re-loading a row updates it in place instead of duplicating it.
+        upsert_sqlite_rows(conn, [("cyberdyne", "s3", utc(2024, 1, 1, 0), 1000)])
+        conn.close()
+        self.db_url = f"sqlite:///{path}"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_window_sums_use_half_open_periods(self) -> None:
+        with open_repository(self.db_url) as repository:
+            totals = repository.sum_spend_for_company_windows(
+                [
+                    ("cyberdyne", "s3", utc(2024, 1, 1), utc(2024, 2, 1)),
+                    ("cyberdyne", "s3", utc(2024, 2, 1), utc(2024, 3, 1)),
+                    ("cyberdyne", "rds", utc(2024, 1, 1), utc(2024, 2, 1)),
+                ]
+            )
+            period = repository.sum_spend_for_period(
+                "cyberdyne", "ec2", utc(2024, 1, 1), utc(2024, 2, 1)
+            )
+            known = repository.has_series("cyberdyne", "s3")
+            unknown = repository.has_series("cyberdyne", "rds")
+
+        self.assertEqual(totals, [Decimal("12.00"), Decimal("0.07"), Decimal("0.00")])
+        self.assertEqual(period, Decimal("9.99"))
+        self.assertTrue(known)
+        self.assertFalse(unknown)
+        self.assertEqual(list_companies_from_db(self.db_url), ["acme", "cyberdyne"])
+
+    def test_evaluation_reads_sqlite_backend(self) -> None:
+        for cents in (False, True):
+            evaluated = evaluate_commitments(
+                [COMMITMENT], self.db_url, utc(2024, 6, 1), cents=cents
+            )[0]
+            self.assertEqual(evaluated["total_actual"], 12.0)
+            self.assertTrue(evaluated["met"])
+
+    def test_series_buckets_match_window_sums(self) -> None:
+        step = timedelta(days=10)
+        with open_repository(self.db_url) as repository:
+            rows = repository.spend_series(
+                "cyberdyne", "s3", utc(2024, 1, 1), utc(2024, 2, 1), step, cents=True
+            )
+            windows = repository.sum_cents_for_company_windows(
+                [
+                    ("cyberdyne", "s3", start, min(start + step, utc(2024, 2, 1)))
+                    for start, _, _ in rows
+                ]
+            )
+
+        self.assertEqual([row[0] for row in rows][-1], utc(2024, 1, 31))
+        self.assertEqual([row[1] for row in rows], windows)
+        self.assertEqual([row[2] for row in rows], [1000, 1000, 1000, 1200])
+
+        series = commitment_series(COMMITMENT, self.db_url, points=4, checkin_index=0)
+        self.assertEqual(series["points"][-1]["cumulative"], 12.0)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_columnar_engine_builds_from_sqlite(self) -> None:
+        engine = ColumnarSpendEngine.from_database(self.db_url)
+
+        self.assertEqual(
+            engine.sum_cents_for_company_windows(
+                [("cyberdyne", "s3", utc(2024, 1, 1), utc(2024, 2, 1))]
+            ),
+            [1200],
+        )
+
+    def test_asgi_app_evaluates_sqlite_without_a_pool(self) -> None:
+        app = AsyncCommitmentsApp(Settings(database_url=self.db_url))
+        self.assertIsNone(app.pool)
+
+        evaluated = asyncio.run(app.evaluate([COMMITMENT]))
+
+        self.assertEqual(evaluated[0]["total_actual"], 12.0)
+
+    def test_stored_commitments_are_rejected_at_startup(self) -> None:
+        settings = Settings(database_url=self.db_url, commitments_source="database")
+
+        with self.assertRaisesRegex(RuntimeError, "COMMITMENTS_SOURCE=database"):
+            check_backend_settings(settings)
+        with patch("backend.app.Settings", return_value=settings):
+            with self.assertRaises(RuntimeError):
+                create_app()
+        with self.assertRaises(RuntimeError):
+            AsyncCommitmentsApp(settings)
+
+    def test_missing_database_file_is_not_created(self) -> None:
+        missing = Path(self.tmp.name) / "missing.db"
+        with self.assertRaises(sqlite3.OperationalError):
+            with open_repository(f"sqlite:///{missing}"):
+                pass
+        self.assertFalse(missing.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()